@@ -0,0 +1,117 @@
+"""
+Benchmark: serial per-file import vs the parallel, resumable backfill importer.
+
+Builds a synthetic data/DD-MM-YYYY/SYMBOL/ tree of per-snapshot Excel files
+(plus one day of Parquet archives) and imports it three ways:
+
+1. legacy: pd.read_excel + save_option_data per file, as
+   process_existing_files used to do (Excel only);
+2. backfill with one worker;
+3. backfill with a process pool.
+
+Checks that every imported snapshot reads back identically from the legacy
+and backfill databases, and that a rerun skips every file.
+
+Usage:
+    python -m benchmarks.backfill [--days 3] [--files 40] [--strikes 95] [--workers N]
+"""
+import os
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from benchmarks.common import make_payload, temp_db_path, timed
+from config.settings import PATHS
+from data_collection.backfill import EXCEL_ENGINE, backfill, discover_files
+from data_collection.sinks import ExcelSnapshotSink, ParquetSnapshotSink
+from database.db_manager import DatabaseManager
+
+SYMBOL = 'NIFTY'
+EXPIRY = '29-05-2025'
+
+def build_tree(data_dir, days, files_per_day, n_strikes):
+    """Write Excel snapshots for `days` days and one more day as a Parquet archive."""
+    excel, parquet = ExcelSnapshotSink(data_dir), ParquetSnapshotSink(data_dir)
+    start = datetime(2025, 5, 19, 9, 15)
+    
+    for day in range(days + 1):
+        for i in range(files_per_day):
+            timestamp = start + timedelta(days=day, minutes=5 * i)
+            data = make_payload(n_strikes, seed=day * 1000 + i, symbol=SYMBOL, expiry=EXPIRY)
+            if day < days:
+                excel.write(data, SYMBOL, EXPIRY, timestamp)
+            else:
+                parquet.write(data, SYMBOL, EXPIRY, timestamp)
+    parquet.close()
+
+def legacy_import(data_dir, db):
+    """The original loop: one read_excel and one transaction per file."""
+    count = 0
+    for date_dir in sorted(os.listdir(data_dir)):
+        symbol_dir = os.path.join(data_dir, date_dir, SYMBOL)
+        date = datetime.strptime(date_dir, PATHS["date_format"]).date()
+        for file in sorted(f for f in os.listdir(symbol_dir) if f.endswith('.xlsx')):
+            time_str = file.split('_')[-1].split('.')[0]
+            timestamp = datetime.combine(date, datetime.strptime(time_str, '%H%M').time())
+            data = pd.read_excel(os.path.join(symbol_dir, file))
+            count += bool(db.save_option_data(data, SYMBOL, EXPIRY, timestamp))
+    return count
+
+def check_parity(legacy_db, backfill_db):
+    """Every legacy snapshot must read back identically from the backfill database."""
+    timestamps = legacy_db.get_timestamps(SYMBOL, EXPIRY)
+    for timestamp in timestamps:
+        pd.testing.assert_frame_equal(
+            legacy_db.get_option_data_by_timestamp(SYMBOL, EXPIRY, timestamp),
+            backfill_db.get_option_data_by_timestamp(SYMBOL, EXPIRY, timestamp)
+        )
+    return len(timestamps)
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill importer benchmark")
+    parser.add_argument('--days', type=int, default=3, help="Days of Excel snapshots")
+    parser.add_argument('--files', type=int, default=40, help="Snapshots per day")
+    parser.add_argument('--strikes', type=int, default=95)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    
+    data_dir = tempfile.mkdtemp(prefix='oc_backfill_')
+    try:
+        _, build_seconds = timed(build_tree, data_dir, args.days, args.files, args.strikes)
+        files = discover_files(data_dir)
+        print(f"{len(files)} files ({args.days} days x {args.files} xlsx + 1 parquet day), "
+              f"{args.strikes} strikes, built in {build_seconds:.1f}s; {EXCEL_ENGINE} reader")
+        
+        legacy_db = DatabaseManager(temp_db_path('backfill_legacy'))
+        legacy_count, legacy_seconds = timed(legacy_import, data_dir, legacy_db)
+        
+        results = {}
+        for workers in sorted({1, args.workers}):
+            db = DatabaseManager(temp_db_path(f'backfill_{workers}'))
+            stats, seconds = timed(backfill, data_dir, db, workers)
+            assert stats['failed'] == 0 and stats['imported'] == len(files)
+            results[workers] = (db, stats, seconds)
+        
+        db, stats, _ = results[args.workers]
+        checked = check_parity(legacy_db, db)
+        assert len(db.get_timestamps(SYMBOL, EXPIRY)) == checked + args.files
+        print(f"parity: ok ({checked} Excel snapshots identical, {args.files} Parquet snapshots imported)")
+        
+        rerun, rerun_seconds = timed(backfill, data_dir, db, args.workers)
+        assert rerun['skipped'] == len(files) and rerun['snapshots'] == 0
+        
+        print(f"{'import':<22}{'seconds':>10}{'files/s':>10}{'snapshots':>11}")
+        print(f"{'legacy (xlsx only)':<22}{legacy_seconds:>10.2f}{legacy_count / legacy_seconds:>10.1f}"
+              f"{legacy_count:>11}")
+        for workers, (_, stats, seconds) in results.items():
+            print(f"{f'backfill x{workers}':<22}{seconds:>10.2f}{stats['imported'] / seconds:>10.1f}"
+                  f"{stats['snapshots']:>11}")
+        print(f"{'rerun (manifest)':<22}{rerun_seconds:>10.2f}{'':>10}{rerun['snapshots']:>11}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Shared helpers for the NIFTY Options Dashboard benchmarks.
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Allow running as `python -m benchmarks.<name>` from the project folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collection.decoder import PAYLOAD_COLUMNS  # noqa: E402 -- needs the path above
+
+def make_chain(n_strikes, seed=0, base_strike=22000, step=50):
+    """
+    Build a synthetic option chain with the OI columns the collector persists.
+    
+    Args:
+        n_strikes (int): Number of strikes in the chain
+        seed (int): Random seed
+        base_strike (int): Lowest strike
+        step (int): Strike spacing
+    
+    Returns:
+        pandas.DataFrame: Synthetic option chain
+    """
+    rng = np.random.default_rng(seed)
+    strikes = base_strike + step * np.arange(n_strikes)
+    
+    return pd.DataFrame({
+        'strike': strikes,
+        'callOI': rng.integers(0, 5_000_000, n_strikes),
+        'callpOI': rng.integers(0, 5_000_000, n_strikes),
+        'putOI': rng.integers(0, 5_000_000, n_strikes).astype('float64'),
+        'putPOI': rng.integers(0, 5_000_000, n_strikes).astype('float64'),
+    })
+
+def make_payload(n_strikes, seed=0, symbol='NIFTY', expiry='30-01-2025', base_strike=22000, step=50):
+    """
+    Build a synthetic option chain with the full 35-column API payload.
+    
+    Like the real feed, call columns are integers, put quantities are floats
+    and illiquid strikes have missing greeks and trade timestamps.
+    
+    Args:
+        n_strikes (int): Number of strikes in the chain
+        seed (int): Random seed
+        symbol (str): Symbol name
+        expiry (str): Expiry date
+        base_strike (int): Lowest strike
+        step (int): Strike spacing
+    
+    Returns:
+        pandas.DataFrame: Synthetic payload in PAYLOAD_COLUMNS order
+    """
+    rng = np.random.default_rng(seed)
+    chain = make_chain(n_strikes, seed, base_strike, step)
+    
+    def prices():
+        return np.round(rng.uniform(0.05, 3000, n_strikes), 2)
+    
+    def greeks():
+        values = np.round(rng.normal(0, 1, n_strikes), 4)
+        values[rng.random(n_strikes) < 0.1] = np.nan
+        return values
+    
+    def trade_times():
+        times = pd.Series(pd.Timestamp('2025-01-02 15:29:00') + pd.to_timedelta(rng.integers(0, 60, n_strikes), unit='s'))
+        times = times.dt.strftime('%d-%m-%Y %H:%M:%S').astype(object)
+        times[rng.random(n_strikes) < 0.1] = np.nan
+        return times.to_numpy()
+    
+    payload = {
+        'symbol': symbol,
+        'expiry': expiry,
+        'calltimestamp': trade_times(),
+        'callVol': rng.integers(0, 10_000_000, n_strikes),
+        'callltp': prices(),
+        'callPClose': prices(),
+        'callbid': prices(),
+        'callbidqty': rng.integers(0, 100_000, n_strikes),
+        'callask': prices(),
+        'callaskqty': rng.integers(0, 100_000, n_strikes),
+        'callOI': chain['callOI'].to_numpy(),
+        'callpOI': chain['callpOI'].to_numpy(),
+    }
+    for name in ('cdelta', 'ctheta', 'cvega', 'cgamma', 'crho', 'civ'):
+        payload[name] = greeks()
+    payload['strike'] = chain['strike'].to_numpy()
+    for name in ('pdelta', 'ptheta', 'pvega', 'pgamma', 'prho', 'piv'):
+        payload[name] = greeks()
+    payload.update({
+        'putbid': prices(),
+        'putbidqty': rng.integers(0, 5_000_000, n_strikes).astype('float64'),
+        'putask': prices(),
+        'putaskqty': rng.integers(0, 5_000_000, n_strikes).astype('float64'),
+        'putOI': chain['putOI'].to_numpy(),
+        'putPOI': chain['putPOI'].to_numpy(),
+        'putLTP': prices(),
+        'putPClose': prices(),
+        'putVol': rng.integers(0, 100_000_000, n_strikes).astype('float64'),
+        'puttimestamp': trade_times(),
+    })
+    
+    return pd.DataFrame(payload, columns=PAYLOAD_COLUMNS)
+
+def temp_db_path(name):
+    """Return a fresh database path inside a temporary directory."""
+    return os.path.join(tempfile.mkdtemp(prefix='oc_bench_'), f"{name}.db")
+
+def timed(func, *args, **kwargs):
+    """
+    Run a callable once and time it.
+    
+    Returns:
+        tuple: (result, elapsed seconds)
+    """
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
@@ -0,0 +1,110 @@
+"""
+Benchmark: the work a Streamlit rerun of the dashboard does, before and after caching.
+
+- legacy: every rerun builds DatabaseManager, OptionMetricsCalculator and
+  DataCollectionConnector (three schema checks) and reads the user settings;
+  a refresh also recomputes the payload from the database;
+- cached: components come from st.cache_resource, settings are read once per
+  session, and a refresh with no new snapshot is a result cache hit behind
+  one MAX(epoch_ms) query.
+
+Checks that the cached payload equals a fresh computation, both before and
+after a new snapshot is stored.
+
+Usage:
+    python -m benchmarks.dashboard_rerun [--strikes 95] [--history 30] [--reruns 50]
+"""
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks.common import make_chain, temp_db_path, timed
+from config.settings import DATABASE
+from data_collection.connector import DataCollectionConnector
+from database.db_manager import DatabaseManager
+from processing.calculator import OptionMetricsCalculator
+from ui.resources import get_components, get_dashboard_payload
+from utils.helpers import IST
+
+SYMBOL, EXPIRY = 'NIFTY', '29-05-2025'
+VIEW = (22000 + 50 * 47, 1000, 400)
+
+def seed(db, strikes, history):
+    """Store one snapshot a minute; return the time of the latest."""
+    start = IST.localize(datetime(2025, 5, 22, 10, 0))
+    for minute in range(history):
+        db.save_option_data(make_chain(strikes, seed=minute), SYMBOL, EXPIRY, start + timedelta(minutes=minute))
+    return start + timedelta(minutes=history - 1)
+
+def legacy_rerun(refresh):
+    """Module-level setup of the old dashboard script, plus a payload refresh."""
+    db = DatabaseManager()
+    calculator = OptionMetricsCalculator()
+    connector = DataCollectionConnector()
+    # Each of the three managers used to run the DDL and migration check
+    for manager in (db, calculator.db, connector.db):
+        manager._ensure_db_exists()
+    db.get_latest_user_settings()
+    if refresh:
+        return calculator.process_latest_data(SYMBOL, EXPIRY, *VIEW)
+
+def cached_rerun(refresh):
+    """Setup of the dashboard script with cached resources (settings live in session state)."""
+    get_components()
+    if refresh:
+        return get_dashboard_payload(SYMBOL, EXPIRY, *VIEW)
+
+def check_parity(db, latest, strikes):
+    """The cached payload equals a fresh computation, also once a new snapshot arrives."""
+    calculator = OptionMetricsCalculator(db)
+    for _ in range(2):
+        expected = calculator.process_latest_data(SYMBOL, EXPIRY, *VIEW)
+        assert expected['success'], expected['message']
+        assert get_dashboard_payload(SYMBOL, EXPIRY, *VIEW) == expected
+        assert get_dashboard_payload(SYMBOL, EXPIRY, *VIEW) == expected
+        
+        latest += timedelta(minutes=1)
+        db.save_option_data(make_chain(strikes, seed=999), SYMBOL, EXPIRY, latest)
+    return latest
+
+def time_reruns(func, reruns, refresh):
+    return np.array([timed(func, refresh)[1] for _ in range(reruns)])
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard rerun latency benchmark")
+    parser.add_argument('--strikes', type=int, default=95)
+    parser.add_argument('--history', type=int, default=30, help="Stored snapshots (one a minute)")
+    parser.add_argument('--reruns', type=int, default=50)
+    args = parser.parse_args()
+    
+    # Streamlit warns that caches run without a server
+    logging.getLogger('streamlit.runtime.caching.cache_data_api').setLevel(logging.ERROR)
+    logging.getLogger().setLevel(logging.ERROR)
+    
+    DATABASE['filename'] = temp_db_path('dashboard_rerun')
+    db, _, _ = get_components()
+    latest = seed(db, args.strikes, args.history)
+    latest = check_parity(db, latest, args.strikes)
+    
+    # A rerun right after a collection computes the payload once
+    db.save_option_data(make_chain(args.strikes, seed=1000), SYMBOL, EXPIRY, latest + timedelta(minutes=1))
+    _, new_snapshot = timed(cached_rerun, True)
+    
+    rows = [
+        ('legacy', 'countdown', time_reruns(legacy_rerun, args.reruns, False)),
+        ('legacy', 'refresh', time_reruns(legacy_rerun, args.reruns, True)),
+        ('cached', 'countdown', time_reruns(cached_rerun, args.reruns, False)),
+        ('cached', 'refresh', time_reruns(cached_rerun, args.reruns, True)),
+    ]
+    
+    print(f"{args.strikes} strikes, {args.history} stored snapshots, {args.reruns} reruns each")
+    print("parity: ok (cached payload equals a fresh computation before and after a new snapshot)")
+    print(f"{'mode':<8}{'rerun':<11}{'p50 ms':>10}{'p99 ms':>10}")
+    for mode, kind, seconds in rows:
+        print(f"{mode:<8}{kind:<11}{np.percentile(seconds, 50) * 1000:>10.2f}{np.percentile(seconds, 99) * 1000:>10.2f}")
+    print(f"cached refresh after a new snapshot (cache miss): {new_snapshot * 1000:.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: row-by-row option_data inserts vs the bulk ingest path.
+
+Usage:
+    python -m benchmarks.db_ingest [--strikes 100 500 1000] [--snapshots 500]
+"""
+import argparse
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from benchmarks.common import make_chain, temp_db_path, timed
+from database.db_manager import DatabaseManager
+
+def create_legacy_db():
+    """Create a database with the original flat option_data table."""
+    db_file = temp_db_path('legacy')
+    conn = sqlite3.connect(db_file)
+    conn.execute('''
+    CREATE TABLE option_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME NOT NULL,
+        symbol TEXT NOT NULL,
+        expiry TEXT NOT NULL,
+        strike REAL NOT NULL,
+        call_oi INTEGER,
+        call_prev_oi INTEGER,
+        put_oi INTEGER,
+        put_prev_oi INTEGER,
+        UNIQUE(timestamp, symbol, expiry, strike)
+    )
+    ''')
+    conn.close()
+    return db_file
+
+def legacy_save_option_data(db_file, data, symbol, expiry, timestamp):
+    """The original per-row save_option_data loop, kept as the baseline."""
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+    ts_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    for _, row in data.iterrows():
+        cursor.execute('''
+        INSERT OR REPLACE INTO option_data 
+        (timestamp, symbol, expiry, strike, call_oi, call_prev_oi, put_oi, put_prev_oi)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            ts_str,
+            symbol,
+            expiry,
+            float(row['strike']),
+            int(row['callOI']) if 'callOI' in row and pd.notna(row['callOI']) else None,
+            int(row['callpOI']) if 'callpOI' in row and pd.notna(row['callpOI']) else None,
+            int(row['putOI']) if 'putOI' in row and pd.notna(row['putOI']) else None,
+            int(row['putPOI']) if 'putPOI' in row and pd.notna(row['putPOI']) else None
+        ))
+    conn.commit()
+    conn.close()
+
+def legacy_contents(db_file):
+    """Return all rows of the original option_data table, for parity checks."""
+    conn = sqlite3.connect(db_file)
+    rows = conn.execute('''
+    SELECT timestamp, symbol, expiry, strike, call_oi, call_prev_oi, put_oi, put_prev_oi
+    FROM option_data ORDER BY timestamp, strike
+    ''').fetchall()
+    conn.close()
+    return rows
+
+def table_contents(db, symbol, expiry):
+    """Return all stored snapshots in the original option_data row layout."""
+    rows = []
+    for ts in reversed(db.get_timestamps(symbol, expiry)):
+        rows.extend(db.get_option_data_by_timestamp(symbol, expiry, ts).itertuples(index=False, name=None))
+    return [tuple(None if pd.isna(v) else v for v in row) for row in rows]
+
+def run(strike_counts, n_snapshots):
+    """Run the benchmark and print a results table."""
+    start = datetime(2025, 5, 22, 9, 15)
+    results = []
+    
+    for n_strikes in strike_counts:
+        chain = make_chain(n_strikes)
+        snapshots = [
+            (chain, 'NIFTY', '29-05-2025', start + timedelta(minutes=5 * i))
+            for i in range(n_snapshots)
+        ]
+        
+        legacy_db_file = create_legacy_db()
+        _, legacy_time = timed(
+            lambda: [legacy_save_option_data(legacy_db_file, *snapshot) for snapshot in snapshots]
+        )
+        
+        per_snapshot_db = DatabaseManager(temp_db_path('per_snapshot'))
+        _, per_snapshot_time = timed(
+            lambda: [per_snapshot_db.save_option_data(*snapshot) for snapshot in snapshots]
+        )
+        
+        bulk_db = DatabaseManager(temp_db_path('bulk'))
+        stats, bulk_time = timed(bulk_db.bulk_save_option_data, snapshots)
+        
+        expected = legacy_contents(legacy_db_file)
+        assert table_contents(per_snapshot_db, 'NIFTY', '29-05-2025') == expected, "per-snapshot path differs from legacy"
+        assert table_contents(bulk_db, 'NIFTY', '29-05-2025') == expected, "bulk path differs from legacy"
+        
+        rows = n_strikes * n_snapshots
+        results.append({
+            'strikes': n_strikes,
+            'rows': rows,
+            'legacy_s': legacy_time,
+            'save_option_data_s': per_snapshot_time,
+            'bulk_s': bulk_time,
+            'bulk_rows_per_sec': stats['rows_per_sec'],
+            'speedup_per_snapshot': legacy_time / per_snapshot_time,
+            'speedup_bulk': legacy_time / bulk_time,
+        })
+    
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+def main():
+    parser = argparse.ArgumentParser(description="option_data ingest benchmark")
+    parser.add_argument("--strikes", type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument("--snapshots", type=int, default=500)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    run(args.strikes, args.snapshots)
+
+if __name__ == "__main__":
+    main()
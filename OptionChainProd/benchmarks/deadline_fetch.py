@@ -0,0 +1,126 @@
+"""
+Benchmark: unbounded requests vs deadline-bounded, hedged fetches.
+
+A mock API answers quickly but lets a few responses stall (a hung TCP
+connection). Each cycle fetches several targets concurrently:
+
+- legacy: session.get with no timeout, as collect_data used to do; a cycle
+  lasts as long as its worst stall.
+- fetcher: per-attempt timeouts, jittered retries, a hedged copy past the
+  recent p95 and an overall cycle deadline.
+
+A second run stalls every response to show that cycles still end at the
+deadline. Fetched bodies are checked against the mock's payload.
+
+Usage:
+    python -m benchmarks.deadline_fetch [--cycles 40] [--targets 4] [--stall 0.05] [--stall-seconds 5]
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.common import timed
+from benchmarks.mock_truedata import MockTrueData
+from data_collection.fetch import Deadline, DeadlineExceeded, Fetcher
+from data_collection.http_client import get_http_session
+from utils.rate_limit import RateLimiter
+
+def make_targets(n):
+    return [('NIFTY', f"{day:02d}-01-2025") for day in range(1, n + 1)]
+
+def legacy_cycle(mock, targets, executor):
+    """Fetch every target with no timeout at all."""
+    session = get_http_session()
+    
+    def fetch(target):
+        symbol, expiry = target
+        response = session.get(mock.endpoints['option_chain'], params={'symbol': symbol, 'expiry': expiry})
+        return response.content
+    
+    return list(executor.map(fetch, targets))
+
+def fetcher_cycle(mock, targets, executor, fetcher, deadline_seconds):
+    """Fetch every target through the fetcher under one cycle deadline."""
+    deadline = Deadline(deadline_seconds)
+    
+    def fetch(target):
+        symbol, expiry = target
+        try:
+            return fetcher.get(mock.endpoints['option_chain'], params={'symbol': symbol, 'expiry': expiry},
+                               deadline=deadline).content
+        except DeadlineExceeded:
+            return None
+    
+    return list(executor.map(fetch, targets))
+
+def run(cycle, mock, targets, cycles):
+    """Run cycles and return their durations and the fetched bodies."""
+    durations, ok = [], 0
+    for _ in range(cycles):
+        bodies, elapsed = timed(cycle)
+        durations.append(elapsed)
+        for (symbol, expiry), body in zip(targets, bodies):
+            if body is None:
+                continue
+            assert body == mock.payload(symbol, expiry), "fetched body differs from the served payload"
+            ok += 1
+    return np.array(durations), ok
+
+def report(name, durations, ok, total):
+    p50, p99 = np.percentile(durations, [50, 99]) * 1000
+    print(f"{name:<18}{p50:>10.0f}{p99:>10.0f}{durations.max() * 1000:>10.0f}{ok:>8}/{total}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Deadline-bounded fetch benchmark")
+    parser.add_argument('--cycles', type=int, default=40)
+    parser.add_argument('--targets', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--stall', type=float, default=0.05, help="Chance a response stalls")
+    parser.add_argument('--stall-seconds', type=float, default=5.0)
+    parser.add_argument('--deadline', type=float, default=2.0, help="Cycle deadline (s)")
+    args = parser.parse_args()
+    
+    targets = make_targets(args.targets)
+    total = args.cycles * len(targets)
+    executor = ThreadPoolExecutor(max_workers=len(targets))
+    # A limiter that never throttles, so only the fetch strategy is measured
+    fetcher = Fetcher(limiter=RateLimiter(rate=1000, burst=1000))
+    
+    print(f"{args.cycles} cycles x {len(targets)} targets, {args.latency * 1000:.0f}ms responses, "
+          f"{args.stall:.0%} stall for {args.stall_seconds:.0f}s, {args.deadline:.1f}s cycle deadline")
+    print(f"{'cycle time':<18}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'fetched':>12}")
+    
+    with MockTrueData(latency=args.latency, jitter=args.latency / 2, stall_probability=args.stall,
+                      stall_seconds=args.stall_seconds, seed=1) as mock:
+        durations, ok = run(lambda: legacy_cycle(mock, targets, executor), mock, targets, args.cycles)
+        report('no timeout', durations, ok, total)
+        
+        # Warm up the latency history the hedge delay is based on
+        mock.stall_probability = 0.0
+        run(lambda: fetcher_cycle(mock, targets, executor, fetcher, args.deadline), mock, targets, 10)
+        mock.stall_probability = args.stall
+        
+        durations, ok = run(lambda: fetcher_cycle(mock, targets, executor, fetcher, args.deadline),
+                            mock, targets, args.cycles)
+        report('deadline + hedge', durations, ok, total)
+        
+        # Every response stalls: cycles must still end at the deadline
+        mock.stall_probability = 1.0
+        cycles = 3
+        durations, ok = run(lambda: fetcher_cycle(mock, targets, executor, fetcher, args.deadline),
+                            mock, targets, cycles)
+        report('all stalled', durations, ok, cycles * len(targets))
+        assert durations.max() < args.deadline + 0.5, "cycle overran its deadline"
+        
+        m = fetcher.metrics()
+        print(f"fetcher: {m['attempts']} attempts, {m['hedges']} hedges ({m['hedge_wins']} won), "
+              f"{m['retries']} retries, {m['timeouts']} timeouts, {m['deadline_exceeded']} past deadline, "
+              f"hedge delay {m['hedge_delay'] * 1000:.0f}ms")
+        print(fetcher.request_latency.to_prometheus(
+            'truedata_request_duration_seconds', "Option chain fetch time").rstrip())
+    
+    executor.shutdown(wait=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: option chain response decoding.
+
+Decodes the same synthetic payloads several ways:
+
+- legacy: pd.read_csv(StringIO(response.text)) with dtype inference, as
+  collect_data used to do;
+- typed CSV with the pandas C parser and with pyarrow, on the whole payload
+  and projected to STORED_COLUMNS;
+- the JSON response (response=json) through decode_json.
+
+Every decoder must return the legacy values, and the typed ones must agree
+exactly with each other. Also checks that a renamed column and a text value
+in a numeric column are reported as schema drift.
+
+Usage:
+    python -m benchmarks.decode [--strikes 95 500] [--repeat 200]
+"""
+import argparse
+import timeit
+from io import StringIO
+
+import pandas as pd
+import requests
+
+from benchmarks.common import make_payload
+from benchmarks.mock_truedata import MockTrueData
+from data_collection.decoder import (
+    PAYLOAD_COLUMNS, OptionChainDecoder, SchemaDriftError, STORED_COLUMNS, orjson, pa_csv
+)
+
+def make_response(body, content_type):
+    """A requests Response holding body, as the fetcher returns it."""
+    response = requests.models.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = content_type
+    response._content = body
+    return response
+
+def legacy_decode(response):
+    return pd.read_csv(StringIO(response.text))
+
+def build_decoders():
+    """(name, response format, projected, decode callable) for every variant."""
+    engines = ['pandas'] + (['pyarrow'] if pa_csv is not None else [])
+    variants = []
+    for engine in engines:
+        for usecols in (None, STORED_COLUMNS):
+            decoder = OptionChainDecoder(usecols=usecols, engine=engine)
+            name = f"{engine} typed" + (" (stored cols)" if usecols else "")
+            variants.append((name, 'csv', usecols, decoder.decode_csv))
+    for usecols in (None, STORED_COLUMNS):
+        decoder = OptionChainDecoder(usecols=usecols)
+        name = f"json ({'orjson' if orjson else 'json'})" + (" (stored cols)" if usecols else "")
+        variants.append((name, 'json', usecols, decoder.decode_json))
+    return variants
+
+def check_parity(bodies, variants):
+    """Typed decoders agree exactly with each other and on values with the legacy parse."""
+    legacy = legacy_decode(make_response(bodies['csv'], 'text/csv'))
+    reference = {}
+    for name, response_format, usecols, decode in variants:
+        data = decode(bodies[response_format])
+        key = tuple(usecols or ())
+        pd.testing.assert_frame_equal(data, legacy[data.columns], check_dtype=False)
+        if key in reference:
+            pd.testing.assert_frame_equal(data, reference[key])
+        reference.setdefault(key, data)
+
+def check_drift(body):
+    """A renamed column and a text value in a float column must both be rejected."""
+    renamed = body.replace(b'putOI', b'putOpenInterest', 1)
+    header, first, rest = body.split(b'\n', 2)
+    fields = first.split(b',')
+    fields[PAYLOAD_COLUMNS.index('callOI')] = b'12k'
+    retyped = b'\n'.join([header, b','.join(fields), rest])
+    
+    for engine in ['pandas'] + (['pyarrow'] if pa_csv is not None else []):
+        decoder = OptionChainDecoder(engine=engine)
+        for bad in (renamed, retyped):
+            try:
+                decoder.decode_csv(bad)
+            except SchemaDriftError:
+                continue
+            raise AssertionError(f"{engine} decoder accepted a drifted payload")
+    
+    # Inference silently turns the column into text instead
+    assert legacy_decode(make_response(retyped, 'text/csv'))['callOI'].dtype.kind not in 'fi'
+
+def main():
+    parser = argparse.ArgumentParser(description="Option chain decoding benchmark")
+    parser.add_argument('--strikes', type=int, nargs='+', default=[95, 500])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    
+    variants = build_decoders()
+    print(f"{'decoder':<32}{'strikes':>8}{'us/call':>10}{'MB/s':>8}{'vs legacy':>11}")
+    
+    for strikes in args.strikes:
+        mock = MockTrueData(strikes=strikes)
+        bodies = {fmt: mock.payload('NIFTY', '29-05-2025', fmt) for fmt in ('csv', 'json')}
+        check_parity(bodies, variants)
+        
+        def run(func, arg, size):
+            seconds = min(timeit.repeat(lambda: func(arg), number=args.repeat, repeat=3)) / args.repeat
+            return seconds, size / seconds / 1e6
+        
+        response = make_response(bodies['csv'], 'text/csv')
+        legacy_seconds, legacy_mbs = run(legacy_decode, response, len(bodies['csv']))
+        print(f"{'legacy read_csv(StringIO(text))':<32}{strikes:>8}{legacy_seconds * 1e6:>10.0f}"
+              f"{legacy_mbs:>8.1f}{1.0:>10.1f}x")
+        for name, response_format, _, decode in variants:
+            body = bodies[response_format]
+            seconds, mbs = run(decode, body, len(body))
+            print(f"{name:<32}{strikes:>8}{seconds * 1e6:>10.0f}{mbs:>8.1f}{legacy_seconds / seconds:>10.1f}x")
+    
+    check_drift(make_payload(5).to_csv(index=False).encode())
+    print("parity: ok; drift: renamed and retyped columns rejected by every engine")
+
+if __name__ == '__main__':
+    main()
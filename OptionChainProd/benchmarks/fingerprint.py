@@ -0,0 +1,113 @@
+"""
+Benchmark: payload fingerprinting for unchanged option chains.
+
+Replays a session where the chain often does not move between collections
+(as in quiet markets or after hours).
+
+1. Parity: a marker row for an unchanged snapshot must read back exactly
+   like a full copy of the chain, at the marker's own timestamp.
+2. Database: rows written and time for full writes vs markers.
+3. Parsing: read_csv on every body vs reusing the frame for identical bodies.
+
+Usage:
+    python -m benchmarks.fingerprint [--strikes 95] [--snapshots 60] [--repeat 0.7]
+"""
+import argparse
+import sqlite3
+from datetime import datetime, timedelta
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_payload, temp_db_path, timed
+from data_collection.fingerprint import SnapshotFingerprinter, body_digest
+from database.db_manager import DatabaseManager
+
+SYMBOL = 'NIFTY'
+EXPIRY = '30-01-2025'
+
+def make_bodies(n_strikes, n_snapshots, repeat, seed=0):
+    """CSV bodies where each one repeats the previous with probability `repeat`."""
+    rng = np.random.default_rng(seed)
+    bodies = []
+    for i in range(n_snapshots):
+        if bodies and rng.random() < repeat:
+            bodies.append(bodies[-1])
+        else:
+            bodies.append(make_payload(n_strikes, seed=i).to_csv(index=False).encode())
+    return bodies
+
+def parse_all(bodies, fingerprints=None):
+    """Parse each body, reusing the previous frame for identical bodies if fingerprinting."""
+    frames = []
+    for body in bodies:
+        data = None
+        if fingerprints is not None:
+            digest = body_digest(body)
+            data = fingerprints.cached_frame(SYMBOL, EXPIRY, digest)
+        if data is None:
+            data = pd.read_csv(StringIO(body.decode()))
+        changes = fingerprints.update(SYMBOL, EXPIRY, digest, data) if fingerprints is not None else None
+        frames.append((data, changes))
+    return frames
+
+def row_count(db):
+    conn = sqlite3.connect(db.db_file)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM snapshot_strikes").fetchone()[0]
+    finally:
+        conn.close()
+
+def load(frames, use_markers, name):
+    """Bulk-load snapshots one minute apart, optionally as markers when unchanged."""
+    db = DatabaseManager(temp_db_path(name))
+    start = datetime(2025, 1, 2, 9, 15)
+    snapshots = [
+        (data, SYMBOL, EXPIRY, start + timedelta(minutes=i),
+         start + timedelta(minutes=i - 1) if use_markers and changes.unchanged else None)
+        for i, (data, changes) in enumerate(frames)
+    ]
+    stats, elapsed = timed(lambda: db.bulk_save_option_data(snapshots))
+    return db, snapshots, stats, elapsed
+
+def check_parity(full_db, marker_db, snapshots):
+    """Every snapshot, marker or not, must read back identically from both databases."""
+    for _, _, _, timestamp, _ in snapshots:
+        key = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        expected = full_db.get_option_data_by_timestamp(SYMBOL, EXPIRY, key)
+        actual = marker_db.get_option_data_by_timestamp(SYMBOL, EXPIRY, key)
+        pd.testing.assert_frame_equal(expected, actual)
+    
+    pd.testing.assert_frame_equal(full_db.get_latest_option_data(SYMBOL, EXPIRY),
+                                  marker_db.get_latest_option_data(SYMBOL, EXPIRY))
+    assert full_db.get_timestamps(SYMBOL, EXPIRY) == marker_db.get_timestamps(SYMBOL, EXPIRY)
+
+def main():
+    parser = argparse.ArgumentParser(description="Payload fingerprinting benchmark")
+    parser.add_argument('--strikes', type=int, default=95)
+    parser.add_argument('--snapshots', type=int, default=60)
+    parser.add_argument('--repeat', type=float, default=0.7, help="Chance a payload repeats the previous one")
+    args = parser.parse_args()
+    
+    bodies = make_bodies(args.strikes, args.snapshots, args.repeat)
+    
+    _, plain_seconds = timed(lambda: parse_all(bodies))
+    frames, cached_seconds = timed(lambda: parse_all(bodies, SnapshotFingerprinter()))
+    unchanged = sum(changes.unchanged for _, changes in frames)
+    
+    full_db, snapshots, full_stats, full_seconds = load(frames, False, 'fingerprint_full')
+    marker_db, _, marker_stats, marker_seconds = load(frames, True, 'fingerprint_marker')
+    check_parity(full_db, marker_db, snapshots)
+    
+    print(f"parity: ok ({args.snapshots} snapshots read back identically, {unchanged} stored as markers)")
+    print(f"{args.snapshots} payloads x {args.strikes} strikes, {unchanged} unchanged")
+    print(f"{'path':<16}{'seconds':>10}{'strike rows':>14}")
+    print(f"{'full writes':<16}{full_seconds:>10.3f}{row_count(full_db):>14,}")
+    print(f"{'markers':<16}{marker_seconds:>10.3f}{row_count(marker_db):>14,}")
+    print(f"parse: read_csv every body {plain_seconds:.3f}s, fingerprinted {cached_seconds:.3f}s "
+          f"({plain_seconds / cached_seconds:.1f}x)")
+    assert marker_stats['unchanged'] == unchanged
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark: high-frequency collection building blocks.
+
+1. Downsampling: 30 minutes of 10-second snapshots are collected; only the
+   first of each 5-minute bucket is saved and buffered, as in the connector.
+   OI changes from the buffer and from the database must match at every
+   saved snapshot.
+2. Rate limiting: measured request rate through the token bucket.
+3. Adaptive throttle: slow-down factor while API latency rises and recovers.
+
+Usage:
+    python -m benchmarks.high_frequency [--interval 10] [--strikes 100]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from benchmarks.common import make_chain, temp_db_path, timed
+from config.settings import DATA_COLLECTION
+from database.db_manager import DatabaseManager
+from processing.calculator import OptionMetricsCalculator
+from processing.downsampler import Downsampler
+from processing.snapshot_buffer import SnapshotRingBuffer, default_capacity
+from utils.rate_limit import AdaptiveThrottle, TokenBucket
+
+SYMBOL = 'NIFTY'
+EXPIRY = '30-01-2025'
+
+def check_downsampling(interval_seconds, n_strikes):
+    """Downsample dense snapshots into the database and buffer and compare both OI change paths."""
+    longest = max(DATA_COLLECTION["analysis_intervals"]) * 60
+    downsampler = Downsampler(DATA_COLLECTION["interval_minutes"] * 60)
+    buffer = SnapshotRingBuffer(default_capacity(downsampler.bucket_seconds))
+    db = DatabaseManager(temp_db_path('high_frequency'))
+    buffer.warm(db, SYMBOL, EXPIRY)
+    
+    start = datetime(2025, 1, 2, 9, 15)
+    persisted = []
+    n_snapshots = longest // interval_seconds + 1
+    
+    for i in range(n_snapshots):
+        timestamp = start + timedelta(seconds=i * interval_seconds)
+        chain = make_chain(n_strikes, seed=i)
+        if downsampler.should_persist(SYMBOL, EXPIRY, timestamp):
+            buffer.push(SYMBOL, EXPIRY, timestamp, chain)
+            persisted.append((chain, SYMBOL, EXPIRY, timestamp))
+    
+    db.bulk_save_option_data(persisted)
+    
+    # Database path: a calculator whose buffer is cold
+    calculator = OptionMetricsCalculator(db)
+    calculator.buffer = SnapshotRingBuffer()
+    
+    for _, _, _, timestamp in persisted[1:]:
+        current = db.get_option_data_by_timestamp(SYMBOL, EXPIRY, timestamp.strftime('%Y-%m-%d %H:%M:%S'))
+        from_db = calculator.calculate_oi_changes(SYMBOL, EXPIRY, current)
+        from_buffer = buffer.oi_changes(SYMBOL, EXPIRY, timestamp)
+        pd.testing.assert_frame_equal(
+            from_db.sort_values(['interval', 'strike']).reset_index(drop=True),
+            from_buffer.sort_values(['interval', 'strike']).reset_index(drop=True)
+        )
+    
+    return n_snapshots, len(persisted), buffer.capacity
+
+def measure_rate(rate, burst, requests):
+    """Time a burst of acquisitions through a token bucket."""
+    bucket = TokenBucket(rate, burst)
+    _, elapsed = timed(lambda: [bucket.acquire() for _ in range(requests)])
+    return elapsed
+
+def throttle_trace():
+    """Slow-down factor as latency rises past the threshold and recovers."""
+    throttle = AdaptiveThrottle(latency_threshold=1.0, error_rate_threshold=0.2, window=10, max_factor=8)
+    latencies = [0.3] * 10 + [1.5] * 20 + [0.3] * 40
+    trace = []
+    for i, latency in enumerate(latencies):
+        throttle.record(latency, ok=True)
+        if i % 10 == 9:
+            trace.append((latency, throttle.factor))
+    return trace
+
+def main():
+    parser = argparse.ArgumentParser(description="High-frequency mode benchmark")
+    parser.add_argument('--interval', type=int, default=10, help="Collection interval (s)")
+    parser.add_argument('--strikes', type=int, default=100)
+    args = parser.parse_args()
+    
+    collected, persisted, capacity = check_downsampling(args.interval, args.strikes)
+    print(f"parity: ok (buffer vs database OI changes at {persisted - 1} saved snapshots)")
+    print(f"{collected} snapshots at {args.interval}s -> {persisted} saved; buffer capacity {capacity}")
+    
+    requests, rate, burst = 60, 50, 10
+    elapsed = measure_rate(rate, burst, requests)
+    print(f"token bucket {rate}/s burst {burst}: {requests} requests in {elapsed:.2f}s "
+          f"(expected {(requests - burst) / rate:.2f}s)")
+    
+    print("throttle (latency -> slow-down factor, every 10 requests):")
+    print("  " + ", ".join(f"{latency:.1f}s->{factor}x" for latency, factor in throttle_trace()))
+
+if __name__ == '__main__':
+    main()
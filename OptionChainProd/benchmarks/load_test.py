@@ -0,0 +1,107 @@
+"""
+Load test: collector throughput and tail latency against the mock TrueData API.
+
+Starts a local MockTrueData server (tokens enforced, optional errors, early
+token revocation and stalls), points the collector at it and runs
+back-to-back collection cycles with OptionChainCollector.collect_many. The
+first cycle's frames are checked against the served payloads.
+
+Reports collected snapshots/s, parsed rows/s, per-target latency
+percentiles and what the server and fetch layer saw (token requests, 401s,
+retries, hedges).
+
+Usage:
+    python -m benchmarks.load_test [--targets 8] [--cycles 20] [--latency 0.1]
+        [--error-rate 0.05] [--revoke-rate 0.02] [--strikes 95] [--rate 0]
+"""
+import argparse
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timed
+from benchmarks.mock_truedata import MockTrueData
+from data_collection.collector import OptionChainCollector
+from data_collection.fetch import Fetcher
+from utils.rate_limit import RateLimiter
+
+SYMBOLS = ['NIFTY', 'BANKNIFTY', 'FINNIFTY', 'MIDCPNIFTY']
+EXPIRIES = ['29-05-2025', '05-06-2025', '12-06-2025', '19-06-2025', '26-06-2025']
+
+def make_targets(n):
+    return [(symbol, expiry) for expiry in EXPIRIES for symbol in SYMBOLS][:n]
+
+def check_parity(mock, results):
+    """Collected frames must equal the CSV the server sent."""
+    for (symbol, expiry), data in results.items():
+        if data is not None:
+            expected = pd.read_csv(StringIO(mock.payload(symbol, expiry).decode()))
+            pd.testing.assert_frame_equal(data, expected[data.columns], check_dtype=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Collector load test against the mock API")
+    parser.add_argument('--targets', type=int, default=8, help="Symbol/expiry pairs per cycle")
+    parser.add_argument('--cycles', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None, help="Concurrent requests (default: HTTP_CLIENT)")
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--strikes', type=int, default=95, help="Strikes per chain (payload size)")
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--revoke-rate', type=float, default=0.02, help="Chance a token is revoked early")
+    parser.add_argument('--stall', type=float, default=0.0, help="Chance a response stalls")
+    parser.add_argument('--chain-file', help="Replay a saved snapshot instead of synthetic chains")
+    parser.add_argument('--rate', type=float, default=0, help="Client rate limit (req/s); 0 = unlimited")
+    args = parser.parse_args()
+    
+    targets = make_targets(args.targets)
+    mock = MockTrueData(
+        latency=args.latency, jitter=args.jitter, strikes=args.strikes, error_rate=args.error_rate,
+        error_status=args.error_status, require_auth=True, revoke_rate=args.revoke_rate,
+        stall_probability=args.stall, stall_seconds=10, chain_file=args.chain_file
+    )
+    
+    with mock, mock.patch_endpoints():
+        collector = OptionChainCollector()
+        if args.rate:
+            collector.limiter = RateLimiter(rate=args.rate, burst=len(targets))
+        else:
+            collector.limiter = RateLimiter(rate=1e6, burst=1e6)
+        collector.fetcher = Fetcher(limiter=collector.limiter)
+        assert collector.refresh_token()
+        
+        check_parity(mock, collector.collect_many(targets, args.workers))
+        mock.reset_stats()
+        
+        latencies, cycle_times, collected, rows = [], [], 0, 0
+        for _ in range(args.cycles):
+            results, elapsed = timed(lambda: collector.collect_many(targets, args.workers))
+            cycle_times.append(elapsed)
+            latencies.extend(collector.last_cycle_stats['fetch_times'].values())
+            collected += sum(data is not None for data in results.values())
+            rows += sum(len(data) for data in results.values() if data is not None)
+        
+        server = dict(mock.stats)
+        fetch = collector.fetcher.metrics()
+    
+    total_time = sum(cycle_times)
+    requests = args.cycles * len(targets)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    
+    print(f"{args.cycles} cycles x {len(targets)} targets, {args.strikes} strikes, "
+          f"{args.latency * 1000:.0f}+{args.jitter * 1000:.0f}ms latency, "
+          f"{args.error_rate:.0%} HTTP {args.error_status}, {args.revoke_rate:.0%} early token revocation")
+    print("parity: ok")
+    print(f"collected      {collected}/{requests} ({collected / requests:.1%})")
+    print(f"throughput     {collected / total_time:.1f} snapshots/s, {rows / total_time:,.0f} rows/s")
+    print(f"cycle time     mean {np.mean(cycle_times) * 1000:.0f}ms, max {np.max(cycle_times) * 1000:.0f}ms")
+    print(f"target latency p50 {p50:.0f}ms  p95 {p95:.0f}ms  p99 {p99:.0f}ms  max {max(latencies) * 1000:.0f}ms")
+    print(f"server         {server['chain_requests']} chain requests, {server['token_requests']} token requests, "
+          f"{server['errors']} errors, {server['unauthorized']} 401s, {server['revoked']} revoked, "
+          f"{server['connections']} new connections")
+    print(f"fetch layer    {fetch['attempts']} attempts, {fetch['retries']} retries, {fetch['hedges']} hedges "
+          f"({fetch['hedge_wins']} won), {fetch['failed']} failed")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+Local fake of a streaming option chain feed, for benchmarks and testing.
+
+A WebSocket server speaking the protocol in data_collection/streaming.py:
+a full chain on subscribe, then per-strike tick updates (OI, volume, LTP
+and trade time) at a configurable rate, with sequence numbers. Updates can
+be dropped on purpose to exercise gap recovery, and the feed can be paused
+so a client's state can be compared with the server's.
+
+Usage:
+    with MockStreamFeed(tick_rate=50) as feed:
+        stream = StreamingCollector(targets, url=feed.url).start()
+
+    # Standalone (TRUEDATA_STREAM_URL points main.py --source stream at it):
+    python -m benchmarks.mock_stream --port 8766 --tick-rate 50
+"""
+import json
+import time
+import random
+import argparse
+import threading
+
+from benchmarks.common import make_payload
+from data_collection.decoder import OptionChainDecoder, PAYLOAD_COLUMNS
+
+try:
+    from websockets.datastructures import Headers
+    from websockets.exceptions import ConnectionClosed
+    from websockets.http11 import Response
+    from websockets.sync.server import serve
+except ImportError:
+    serve = None
+
+# Columns a tick changes on the call or put side of a strike
+TICK_FIELDS = {
+    'call': ('callOI', 'callVol', 'callltp', 'calltimestamp'),
+    'put': ('putOI', 'putVol', 'putLTP', 'puttimestamp'),
+}
+
+class MockStreamFeed:
+    """
+    Threaded WebSocket server publishing chains and per-strike ticks.
+    """
+    
+    def __init__(self, strikes=95, tick_rate=50, seed=0, drop_rate=0.0, require_auth=False, port=0):
+        """
+        Initialize the feed (call start() or use it as a context manager).
+        
+        Args:
+            strikes (int): Strikes per chain
+            tick_rate (float): Updates per second across all subscribed targets
+            seed (int): Seed for chains and ticks
+            drop_rate (float): Chance that an update is not sent (its seq is still used)
+            require_auth (bool): Reject connections without a Bearer token (HTTP 401)
+            port (int): Port to listen on; 0 picks a free one
+        """
+        self.strikes = strikes
+        self.tick_rate = tick_rate
+        self.seed = seed
+        self.drop_rate = drop_rate
+        self.require_auth = require_auth
+        self.port = port
+        self.stats = {'connections': 0, 'subscriptions': 0, 'updates': 0, 'dropped': 0, 'messages': 0, 'bytes': 0}
+        self._chains = {}
+        self._seq = {}
+        self._subscribers = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._stop = threading.Event()
+        self._server = None
+        self._threads = []
+    
+    def _chain(self, key):
+        """Server-side chain for a target, created on first use (call with the lock held)."""
+        if key not in self._chains:
+            symbol, expiry = key
+            seed = self.seed + sum(map(ord, f"{symbol}{expiry}"))
+            frame = make_payload(self.strikes, seed=seed, symbol=symbol, expiry=expiry)
+            self._chains[key] = json.loads(frame.to_json(orient='values'))
+            self._seq[key] = 0
+        return self._chains[key]
+    
+    def _send(self, connection, message):
+        """
+        Send a message to one client.
+        
+        Returns:
+            int: Bytes sent, 0 if the client is gone
+        """
+        body = json.dumps(message)
+        try:
+            with connection.send_lock:
+                connection.send(body)
+        except ConnectionClosed:
+            return 0
+        return len(body)
+    
+    def _sent(self, size):
+        """Count a sent message (call with the lock held)."""
+        if size:
+            self.stats['messages'] += 1
+            self.stats['bytes'] += size
+    
+    def _process_request(self, connection, request):
+        if self.require_auth and not request.headers.get('Authorization', '').startswith('Bearer '):
+            return Response(401, 'Unauthorized', Headers(), b'missing token')
+        return None
+    
+    def _handler(self, connection):
+        connection.send_lock = threading.Lock()
+        with self._lock:
+            self.stats['connections'] += 1
+        try:
+            for raw in connection:
+                request = json.loads(raw)
+                if request.get('action') != 'subscribe':
+                    size = self._send(connection, {'type': 'error', 'message': f"unknown action {request.get('action')}"})
+                    with self._lock:
+                        self._sent(size)
+                    continue
+                
+                key = (request['symbol'], request['expiry'])
+                # Chain and subscription together, so no tick falls between them
+                with self._lock:
+                    rows = self._chain(key)
+                    chain = {
+                        'type': 'chain', 'symbol': key[0], 'expiry': key[1], 'seq': self._seq[key],
+                        'columns': PAYLOAD_COLUMNS, 'data': rows,
+                    }
+                    self._subscribers.setdefault(key, set()).add(connection)
+                    self.stats['subscriptions'] += 1
+                    self._sent(self._send(connection, chain))
+        except ConnectionClosed:
+            pass
+        finally:
+            with self._lock:
+                for subscribers in self._subscribers.values():
+                    subscribers.discard(connection)
+    
+    def _tick(self):
+        """Move one random strike of one subscribed target and publish the update."""
+        with self._lock:
+            targets = [key for key, subscribers in self._subscribers.items() if subscribers]
+            if not targets:
+                return
+            key = self._random.choice(targets)
+            rows = self._chains[key]
+            row = self._random.randrange(len(rows))
+            side = self._random.choice(('call', 'put'))
+            oi, volume, ltp, trade_time = (PAYLOAD_COLUMNS.index(c) for c in TICK_FIELDS[side])
+            
+            rows[row][oi] = max(0, (rows[row][oi] or 0) + self._random.randint(-5000, 5000))
+            rows[row][volume] = (rows[row][volume] or 0) + self._random.randint(1, 500)
+            rows[row][ltp] = round(max(0.05, (rows[row][ltp] or 1) * self._random.uniform(0.99, 1.01)), 2)
+            rows[row][trade_time] = time.strftime('%d-%m-%Y %H:%M:%S')
+            
+            self._seq[key] += 1
+            self.stats['updates'] += 1
+            message = {
+                'type': 'update', 'symbol': key[0], 'expiry': key[1], 'seq': self._seq[key],
+                'strike': rows[row][PAYLOAD_COLUMNS.index('strike')],
+                'fields': {PAYLOAD_COLUMNS[i]: rows[row][i] for i in (oi, volume, ltp, trade_time)},
+            }
+            if self.drop_rate and self._random.random() < self.drop_rate:
+                self.stats['dropped'] += 1
+                return
+            subscribers = list(self._subscribers[key])
+        
+        for connection in subscribers:
+            size = self._send(connection, message)
+            with self._lock:
+                self._sent(size)
+    
+    def _ticker(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            self._running.wait()
+            if self._stop.is_set():
+                break
+            self._tick()
+            next_tick = max(next_tick + 1 / self.tick_rate, time.monotonic() - 1)
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+    
+    def truth(self, symbol, expiry):
+        """
+        The server's current chain for a target, decoded like a client would.
+        
+        Returns:
+            tuple: (DataFrame, seq)
+        """
+        with self._lock:
+            key = (symbol, expiry)
+            payload = {'columns': PAYLOAD_COLUMNS, 'data': [list(row) for row in self._chain(key)]}
+            seq = self._seq[key]
+        return OptionChainDecoder().decode_records(payload), seq
+    
+    def pause(self):
+        """Stop publishing ticks (subscriptions still work)."""
+        self._running.clear()
+        # Let a tick that is being sent finish
+        time.sleep(0.05)
+    
+    def resume(self):
+        """Publish ticks again."""
+        self._running.set()
+    
+    def reset_stats(self):
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+    
+    @property
+    def url(self):
+        host, port = self._server.socket.getsockname()[:2]
+        return f"ws://{host}:{port}"
+    
+    def start(self):
+        """Start serving and ticking."""
+        if serve is None:
+            raise RuntimeError("The mock feed needs the websockets package (pip install websockets)")
+        self._server = serve(self._handler, '127.0.0.1', self.port, process_request=self._process_request,
+                             compression=None, max_size=None)
+        self._stop.clear()
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name='mock-stream', daemon=True),
+            threading.Thread(target=self._ticker, name='mock-stream-ticks', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+    
+    def stop(self):
+        """Stop ticking and close every connection."""
+        self._stop.set()
+        self._running.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        for thread in self._threads:
+            thread.join(5)
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local streaming option chain feed")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--strikes', type=int, default=95)
+    parser.add_argument('--tick-rate', type=float, default=50, help="Updates per second")
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--require-auth', action='store_true')
+    args = parser.parse_args()
+    
+    feed = MockStreamFeed(strikes=args.strikes, tick_rate=args.tick_rate, drop_rate=args.drop_rate,
+                          require_auth=args.require_auth, port=args.port)
+    with feed:
+        print(f"Serving mock option chain feed on {feed.url}")
+        print(f"  TRUEDATA_STREAM_URL={feed.url}")
+        try:
+            while True:
+                time.sleep(60)
+                print(f"  {feed.stats}")
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+"""
+Local stand-in for the TrueData REST API, for benchmarks and load tests.
+
+Serves POST /token and GET /api/getOptionChainwithGreeks (the 35-column
+payload as CSV, or as JSON with response=json) over HTTP/1.1 keep-alive. Chains are synthetic or replayed from a
+saved snapshot file. Latency, stalls, error responses, token expiry (401)
+and payload size are configurable, and requests and TCP connections are
+counted so connection reuse can be checked.
+
+Usage:
+    with MockTrueData(latency=0.2) as server, server.patch_endpoints():
+        ...  # code using API_ENDPOINTS now talks to the mock
+    
+    # Standalone, for the dashboard or tester.py
+    # (TRUEDATA_AUTH_URL / TRUEDATA_OPTION_CHAIN_URL point the app at it):
+    python -m benchmarks.mock_truedata --port 8765 --latency 0.2 --require-auth
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from benchmarks.common import PAYLOAD_COLUMNS, make_payload
+from config.settings import API_ENDPOINTS, AUTH
+from data_collection import auth
+
+OPTION_CHAIN_PATH = '/api/getOptionChainwithGreeks'
+TOKEN_PATH = '/token'
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler; server state lives on self.server.mock."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def setup(self):
+        super().setup()
+        self.server.mock._count('connections')
+    
+    def log_message(self, format, *args):
+        """Keep benchmark output quiet."""
+    
+    def _send(self, status, body, content_type):
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting (timed out or hedged elsewhere)
+            self.close_connection = True
+    
+    def do_POST(self):
+        mock = self.server.mock
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        
+        if urlparse(self.path).path != TOKEN_PATH:
+            self._send(404, b'not found', 'text/plain')
+            return
+        
+        mock._count('token_requests')
+        body = json.dumps({'access_token': mock.issue_token(), 'expires_in': mock.token_ttl})
+        self._send(200, body.encode(), 'application/json')
+    
+    def do_GET(self):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        
+        if url.path != OPTION_CHAIN_PATH:
+            self._send(404, b'not found', 'text/plain')
+            return
+        
+        mock._count('chain_requests')
+        params = parse_qs(url.query)
+        symbol = params.get('symbol', ['NIFTY'])[0]
+        expiry = params.get('expiry', [''])[0]
+        response_format = params.get('response', ['csv'])[0]
+        
+        mock._sleep()
+        
+        token = self.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not mock.check_token(token):
+            mock._count('unauthorized')
+            self._send(401, b'{"error": "invalid_token"}', 'application/json')
+        elif mock._roll('error_rate'):
+            mock._count('errors')
+            self._send(mock.error_status, b'upstream error', 'text/plain')
+        elif response_format == 'json':
+            self._send(200, mock.payload(symbol, expiry, 'json'), 'application/json')
+        else:
+            self._send(200, mock.payload(symbol, expiry), 'text/csv')
+
+class MockTrueData:
+    """
+    Threaded local HTTP server imitating the TrueData token and option chain endpoints.
+    """
+    
+    def __init__(self, latency=0.1, jitter=0.0, strikes=95, token_ttl=3600, seed=0,
+                 stall_probability=0.0, stall_seconds=30.0, error_rate=0.0, error_status=503,
+                 require_auth=False, revoke_rate=0.0, chain_file=None, port=0):
+        """
+        Initialize the mock (call start() or use it as a context manager).
+        
+        Args:
+            latency (float): Seconds each option chain response is delayed
+            jitter (float): Extra uniform random delay of up to this many seconds
+            strikes (int): Strikes per synthetic option chain (payload size)
+            token_ttl (int): Token lifetime; returned as expires_in and enforced if require_auth
+            seed (int): Seed for payloads and randomness
+            stall_probability (float): Chance that a response hangs (a stalled connection)
+            stall_seconds (float): How long a stalled response hangs before it is sent
+            error_rate (float): Chance that a chain request fails with error_status
+            error_status (int): Status code of injected errors (e.g. 500, 503, 429)
+            require_auth (bool): Answer 401 to chain requests without a live token
+            revoke_rate (float): Chance that a live token is revoked early (the next
+                request with it gets a 401), imitating server-side expiry
+            chain_file (str, optional): Saved snapshot (.xlsx, .csv or .parquet) served
+                for every symbol and expiry instead of synthetic chains
+            port (int): Port to listen on; 0 picks a free one
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.strikes = strikes
+        self.token_ttl = token_ttl
+        self.seed = seed
+        self.stall_probability = stall_probability
+        self.stall_seconds = stall_seconds
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.require_auth = require_auth
+        self.revoke_rate = revoke_rate
+        self.chain_file = chain_file
+        self.port = port
+        self.stats = {
+            'connections': 0, 'token_requests': 0, 'chain_requests': 0,
+            'stalls': 0, 'errors': 0, 'unauthorized': 0, 'revoked': 0,
+        }
+        self._tokens = {}
+        self._payloads = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+    
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+    
+    def _roll(self, name):
+        """Draw against one of the configured probabilities."""
+        with self._lock:
+            probability = getattr(self, name)
+            return bool(probability) and self._random.random() < probability
+    
+    def _sleep(self):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            if self.stall_probability and self._random.random() < self.stall_probability:
+                self.stats['stalls'] += 1
+                delay = self.stall_seconds
+        if delay > 0:
+            time.sleep(delay)
+    
+    def issue_token(self):
+        """Create a token valid for token_ttl seconds."""
+        with self._lock:
+            token = f"mock-token-{self.stats['token_requests']}-{self._random.getrandbits(32):08x}"
+            self._tokens[token] = time.monotonic() + self.token_ttl
+            return token
+    
+    def check_token(self, token):
+        """Whether a chain request with this token is authorized (always, unless require_auth)."""
+        if not self.require_auth:
+            return True
+        
+        with self._lock:
+            expires = self._tokens.get(token)
+            if expires is None or expires <= time.monotonic():
+                return False
+            if self.revoke_rate and self._random.random() < self.revoke_rate:
+                # This request still succeeds; the token is dead from the next one
+                del self._tokens[token]
+                self.stats['revoked'] += 1
+        return True
+    
+    def _load_chain_file(self, symbol, expiry):
+        """Read a recorded snapshot into the API's column order."""
+        extension = os.path.splitext(self.chain_file)[1].lower()
+        if extension == '.parquet':
+            frame = pd.read_parquet(self.chain_file)
+        elif extension == '.csv':
+            frame = pd.read_csv(self.chain_file)
+        else:
+            frame = pd.read_excel(self.chain_file)
+        
+        # A daily Parquet archive holds many snapshots: serve the latest one
+        if 'snapshot_time' in frame.columns:
+            frame = frame[frame['snapshot_time'] == frame['snapshot_time'].max()]
+        
+        frame = frame.reindex(columns=PAYLOAD_COLUMNS)
+        frame['symbol'] = symbol
+        frame['expiry'] = expiry
+        return frame
+    
+    def payload(self, symbol, expiry, response_format='csv'):
+        """
+        Body served for a symbol and expiry (built once, then cached).
+        
+        JSON bodies are {"status": "Success", "Records": [[...], ...]}, one
+        array per strike in API column order.
+        """
+        key = (symbol, expiry)
+        with self._lock:
+            if key not in self._payloads:
+                if self.chain_file:
+                    frame = self._load_chain_file(symbol, expiry)
+                else:
+                    seed = self.seed + sum(map(ord, f"{symbol}{expiry}"))
+                    frame = make_payload(self.strikes, seed=seed, symbol=symbol, expiry=expiry)
+                records = json.loads(frame.to_json(orient='values'))
+                self._payloads[key] = {
+                    'csv': frame.to_csv(index=False).encode(),
+                    'json': json.dumps({'status': 'Success', 'Records': records}).encode(),
+                }
+            return self._payloads[key][response_format]
+    
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    @property
+    def endpoints(self):
+        """API_ENDPOINTS values pointing at this server."""
+        return {
+            'auth': self.base_url + TOKEN_PATH,
+            'option_chain': self.base_url + OPTION_CHAIN_PATH,
+        }
+    
+    def start(self):
+        """Start serving (on a free local port unless one was given)."""
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-truedata', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def reset_stats(self):
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+    
+    @contextmanager
+    def patch_endpoints(self):
+        """
+        Point API_ENDPOINTS at this server for the duration of the block.
+        
+        Mock tokens are cached in a temporary file by a fresh token manager,
+        so they never end up in the real token cache.
+        """
+        original = dict(API_ENDPOINTS)
+        original_cache = AUTH["token_cache_file"]
+        original_manager = auth._manager
+        
+        with tempfile.TemporaryDirectory(prefix='mock_truedata_') as cache_dir:
+            API_ENDPOINTS.update(self.endpoints)
+            AUTH["token_cache_file"] = os.path.join(cache_dir, 'token_cache.json')
+            auth._manager = None
+            try:
+                yield self
+            finally:
+                API_ENDPOINTS.clear()
+                API_ENDPOINTS.update(original)
+                AUTH["token_cache_file"] = original_cache
+                auth._manager = original_manager
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local TrueData mock server")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--strikes', type=int, default=95)
+    parser.add_argument('--token-ttl', type=int, default=3600)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--require-auth', action='store_true')
+    parser.add_argument('--revoke-rate', type=float, default=0.0)
+    parser.add_argument('--chain-file', help="Saved snapshot to serve (.xlsx, .csv or .parquet)")
+    args = parser.parse_args()
+    
+    mock = MockTrueData(
+        latency=args.latency, jitter=args.jitter, strikes=args.strikes, token_ttl=args.token_ttl,
+        error_rate=args.error_rate, error_status=args.error_status, require_auth=args.require_auth,
+        revoke_rate=args.revoke_rate, chain_file=args.chain_file, port=args.port
+    )
+    with mock:
+        print(f"Serving mock TrueData API on {mock.base_url}")
+        print(f"  TRUEDATA_AUTH_URL={mock.endpoints['auth']}")
+        print(f"  TRUEDATA_OPTION_CHAIN_URL={mock.endpoints['option_chain']}")
+        try:
+            while True:
+                time.sleep(60)
+                print(f"  {mock.stats}")
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == '__main__':
+    main()
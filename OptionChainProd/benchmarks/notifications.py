@@ -0,0 +1,195 @@
+"""
+Benchmark: dashboard sessions polling for new snapshots vs the snapshot notifier.
+
+A writer commits --commits snapshots, one every --every seconds, while
+--sessions dashboard sessions wait for them:
+
+- polling: every session runs the latest-timestamp query on its own timer
+  (--poll seconds, the table fragment's refresh interval);
+- notifier, other process: the writer is a separate process, as with
+  `main.py --mode collection`; one watcher thread per dashboard process
+  polls PRAGMA data_version and wakes the sessions;
+- notifier, same process: the writer's DatabaseManager publishes on commit.
+
+Reports snapshot queries, PRAGMA data_version checks, the delay from commit
+to session wake-up and how many snapshots a session never saw. Checks that
+sessions saw snapshots in commit order and ended on the last one, and that
+notified sessions saw every one.
+
+Usage:
+    python -m benchmarks.notifications [--sessions 20] [--commits 8] [--every 2] [--poll 5]
+"""
+import sys
+import time
+import argparse
+import threading
+import subprocess
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from benchmarks.common import make_chain, temp_db_path
+from database.db_manager import DatabaseManager
+from database.notifications import SnapshotNotifier
+from database.timestamp_index import format_epoch, to_epoch
+from utils.helpers import IST
+
+SYMBOL, EXPIRY = 'NIFTY', '29-05-2025'
+START = IST.localize(datetime(2025, 5, 22, 10, 0))
+
+def snapshot_time(i):
+    return START + timedelta(minutes=i)
+
+def write_snapshots(db, commits, every, first=1):
+    """Commit snapshots on a schedule; return {timestamp: commit wall time}."""
+    committed = {}
+    for i in range(first, first + commits):
+        time.sleep(every)
+        db.save_option_data(make_chain(95, seed=i), SYMBOL, EXPIRY, snapshot_time(i))
+        committed[format_epoch(to_epoch(snapshot_time(i)))] = time.time()
+    return committed
+
+def writer_process(db_file, commits, every, first):
+    """Entry point of the separate writer process: print each commit's timestamp and time."""
+    db = DatabaseManager(db_file)
+    for timestamp, committed_at in write_snapshots(db, commits, every, first).items():
+        print(f"{timestamp}|{committed_at}", flush=True)
+
+def run_sessions(n_sessions, watch):
+    """Start sessions; each records (timestamp, wall time) when it sees a new snapshot."""
+    seen = [[] for _ in range(n_sessions)]
+    threads = [threading.Thread(target=watch, args=(seen[i],)) for i in range(n_sessions)]
+    for thread in threads:
+        thread.start()
+    return seen, threads
+
+def polling_watch(db, poll, stop):
+    """A session checking the latest timestamp on its own timer."""
+    queries = [0]
+    lock = threading.Lock()
+    
+    def watch(seen):
+        last = None
+        # Sessions start out of phase, like independently opened tabs
+        stop.wait(np.random.uniform(0, poll))
+        while not stop.is_set():
+            latest = db.get_latest_timestamp(SYMBOL, EXPIRY)
+            with lock:
+                queries[0] += 1
+            if latest != last:
+                seen.append((latest, time.time()))
+                last = latest
+            stop.wait(poll)
+    return watch, queries
+
+def notifier_watch(notifier, stop):
+    """A session woken by the notifier."""
+    def watch(seen):
+        sequence = 0
+        while not stop.is_set():
+            event = notifier.wait(SYMBOL, EXPIRY, after=sequence, timeout=0.2)
+            if event is not None:
+                seen.append((event.timestamp, time.time()))
+                sequence = event.sequence
+    return watch
+
+def collect(seen, committed, initial):
+    """
+    Check parity: every session saw snapshots in commit order and ended on the last.
+    
+    Returns:
+        tuple: (wake-up delays in seconds, snapshots missed per session)
+    """
+    expected = [initial] + sorted(committed)
+    delays, missed = [], []
+    for session in seen:
+        timestamps = [timestamp for timestamp, _ in session]
+        assert timestamps == sorted(set(timestamps)) and set(timestamps) <= set(expected), timestamps
+        assert timestamps[-1] == expected[-1], f"session ended on {timestamps[-1]}, expected {expected[-1]}"
+        delays.extend(at - committed[timestamp] for timestamp, at in session if timestamp in committed)
+        missed.append(len(expected) - len(timestamps))
+    return np.array(delays), np.array(missed)
+
+def run_mode(name, db_file, args, first):
+    """Run one mode; return (queries, version checks, delays, missed)."""
+    db = DatabaseManager(db_file)
+    initial = db.get_latest_timestamp(SYMBOL, EXPIRY)
+    stop = threading.Event()
+    
+    if name == 'polling':
+        watch, queries = polling_watch(db, args.poll, stop)
+    else:
+        notifier = SnapshotNotifier(db_file).start()
+        if name == 'notifier, same process':
+            # Let the in-process writer publish to this notifier
+            db.notifier = notifier
+        watch = notifier_watch(notifier, stop)
+    
+    seen, threads = run_sessions(args.sessions, watch)
+    
+    if name == 'notifier, other process':
+        writer = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.notifications', '--writer', db_file,
+             '--commits', str(args.commits), '--every', str(args.every), '--first', str(first)],
+            capture_output=True, text=True, check=True
+        )
+        committed = {}
+        for line in writer.stdout.splitlines():
+            timestamp, committed_at = line.split('|')
+            committed[timestamp] = float(committed_at)
+    else:
+        committed = write_snapshots(db, args.commits, args.every, first)
+    
+    # Give the slowest session one more poll to catch up
+    time.sleep(args.poll + 0.5 if name == 'polling' else 1)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    
+    checks = 0
+    if name != 'polling':
+        notifier.stop()
+        # One snapshot query at start and one per detected change
+        queries = [1 + notifier.stats['changes']]
+        checks = notifier.stats['polls']
+    return (queries[0], checks, *collect(seen, committed, initial))
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot notification benchmark")
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--commits', type=int, default=8)
+    parser.add_argument('--every', type=float, default=2.0, help="Seconds between commits")
+    parser.add_argument('--poll', type=float, default=5.0, help="Polling interval of a session")
+    parser.add_argument('--writer', help=argparse.SUPPRESS)
+    parser.add_argument('--first', type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.writer:
+        writer_process(args.writer, args.commits, args.every, args.first)
+        return
+    
+    db_file = temp_db_path('notifications')
+    DatabaseManager(db_file).save_option_data(make_chain(95), SYMBOL, EXPIRY, snapshot_time(0))
+    
+    rows = []
+    modes = ('polling', 'notifier, other process', 'notifier, same process')
+    for i, name in enumerate(modes):
+        queries, checks, delays, missed = run_mode(name, db_file, args, first=1 + i * args.commits)
+        if name != 'polling':
+            assert not missed.any(), f"{name}: sessions missed snapshots"
+        rows.append((name, queries, checks, delays, missed))
+    
+    seconds = args.commits * args.every
+    print(f"{args.sessions} sessions, {args.commits} commits every {args.every:.1f}s, "
+          f"session polling every {args.poll:.1f}s")
+    print("parity: ok (sessions saw snapshots in commit order and ended on the last; "
+          "notified sessions saw every one)")
+    print(f"{'mode':<26}{'queries/min':>13}{'checks/min':>12}{'wake p50 ms':>13}{'wake p99 ms':>13}"
+          f"{'missed/session':>16}")
+    for name, queries, checks, delays, missed in rows:
+        print(f"{name:<26}{queries / seconds * 60:>13,.0f}{checks / seconds * 60:>12,.0f}"
+              f"{np.percentile(delays, 50) * 1000:>13.1f}"
+              f"{np.percentile(delays, 99) * 1000:>13.1f}{missed.mean():>16.1f}")
+
+if __name__ == '__main__':
+    main()
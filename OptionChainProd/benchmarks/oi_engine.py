@@ -0,0 +1,110 @@
+"""
+Benchmark: merge + iterrows OI changes vs the vectorized OI change engine.
+
+Timing only; parity with the original loop is checked by tests/test_oi_engine.py.
+
+Usage:
+    python -m benchmarks.oi_engine [--strikes 100 500 2000] [--repeat 5]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+import pytz
+
+from benchmarks.common import make_chain, timed
+from processing.oi_engine import compute_oi_changes
+
+def legacy_oi_changes(current_data, past_snapshots, current_timestamp, symbol, expiry):
+    """The original merge + iterrows loop from calculate_oi_changes, kept as the baseline."""
+    results = []
+    for actual_interval, past_data in past_snapshots:
+        merged = pd.merge(
+            current_data, 
+            past_data,
+            on='strike', 
+            suffixes=('_current', '_past')
+        )
+        for _, row in merged.iterrows():
+            try:
+                ce_oi_change = row['call_oi_current'] - row['call_oi_past']
+                if pd.isna(ce_oi_change):
+                    ce_oi_change = 0
+            except (KeyError, TypeError):
+                ce_oi_change = 0
+            
+            try:
+                pe_oi_change = row['put_oi_current'] - row['put_oi_past']
+                if pd.isna(pe_oi_change):
+                    pe_oi_change = 0
+            except (KeyError, TypeError):
+                pe_oi_change = 0
+            
+            results.append({
+                'timestamp': current_timestamp,
+                'symbol': symbol,
+                'expiry': expiry,
+                'strike': row['strike'],
+                'interval': actual_interval,
+                'ce_oi_change': ce_oi_change,
+                'pe_oi_change': pe_oi_change
+            })
+    return pd.DataFrame(results)
+
+def db_snapshot(n_strikes, seed, timestamp, with_nans=False, drop_every=None):
+    """Build an option_data frame shaped like DatabaseManager query results."""
+    chain = make_chain(n_strikes, seed=seed)
+    df = pd.DataFrame({
+        'timestamp': timestamp,
+        'symbol': 'NIFTY',
+        'expiry': '29-05-2025',
+        'strike': chain['strike'].astype('float64'),
+        'call_oi': chain['callOI'],
+        'call_prev_oi': chain['callpOI'],
+        'put_oi': chain['putOI'].astype('int64'),
+        'put_prev_oi': chain['putPOI'].astype('int64'),
+    })
+    if with_nans:
+        df['call_oi'] = df['call_oi'].astype('float64')
+        df.loc[df.index[::7], 'call_oi'] = np.nan
+    if drop_every:
+        df = df.drop(df.index[::drop_every]).reset_index(drop=True)
+    return df
+
+def run(strike_counts, repeat):
+    """Time both implementations on a snapshot and four past snapshots."""
+    ts = pytz.timezone('Asia/Kolkata').localize(pd.Timestamp('2025-05-22 10:30:00'))
+    
+    results = []
+    for n_strikes in strike_counts:
+        current = db_snapshot(n_strikes, 0, '2025-05-22 10:30:00')
+        pasts = [
+            (interval, db_snapshot(n_strikes, seed, (ts - pd.Timedelta(minutes=interval)).strftime('%Y-%m-%d %H:%M:%S')))
+            for seed, interval in enumerate([5, 10, 15, 30], start=1)
+        ]
+        legacy_time = min(
+            timed(legacy_oi_changes, current, pasts, ts, 'NIFTY', '29-05-2025')[1]
+            for _ in range(repeat)
+        )
+        engine_time = min(
+            timed(compute_oi_changes, current, pasts, ts, 'NIFTY', '29-05-2025')[1]
+            for _ in range(repeat)
+        )
+        results.append({
+            'strikes': n_strikes,
+            'intervals': len(pasts),
+            'legacy_ms': legacy_time * 1000,
+            'engine_ms': engine_time * 1000,
+            'speedup': legacy_time / engine_time,
+        })
+    
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+def main():
+    parser = argparse.ArgumentParser(description="OI change engine benchmark")
+    parser.add_argument("--strikes", type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.strikes, args.repeat)
+
+if __name__ == "__main__":
+    main()
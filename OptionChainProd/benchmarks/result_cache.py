@@ -0,0 +1,133 @@
+"""
+Benchmark: per-session process_latest_data vs the shared, snapshot-keyed result cache.
+
+--viewers dashboard sessions refresh at the same moment on the same
+snapshot, each with its own range and highlight:
+
+- legacy: every session calls process_latest_data, so each one computes the
+  OI changes and queues them for saving;
+- shared: every session asks ResultCache.view; one computation per snapshot
+  is shared (single-flight) and each view filters the full-chain table.
+
+Reports OI change computations, OI change rows queued for saving and wall
+time per refresh round. Checks that every view
+equals process_latest_data for the same settings.
+
+Usage:
+    python -m benchmarks.result_cache [--viewers 1 5 10 20] [--strikes 95] [--history 30] [--rounds 3]
+"""
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_chain, temp_db_path, timed
+from database.db_manager import DatabaseManager
+from processing.calculator import OptionMetricsCalculator
+from processing.result_cache import ResultCache
+from utils.helpers import IST
+
+SYMBOL, EXPIRY = 'NIFTY', '29-05-2025'
+START = IST.localize(datetime(2025, 5, 22, 10, 0))
+
+class CountingCalculator(OptionMetricsCalculator):
+    """Calculator that counts OI change computations."""
+    
+    def __init__(self, db):
+        super().__init__(db)
+        self.computations = 0
+        self._count_lock = threading.Lock()
+    
+    def calculate_oi_changes(self, symbol, expiry, current_data=None):
+        with self._count_lock:
+            self.computations += 1
+        return super().calculate_oi_changes(symbol, expiry, current_data)
+
+def views(n_viewers, strikes):
+    """Distinct (currently_trading, range_limit, highlight_limit) per viewer."""
+    middle = 22000 + 50 * (strikes // 2)
+    return [(middle + 50 * (i % 7 - 3), 600 + 100 * (i % 5), 150 + 50 * (i % 4)) for i in range(n_viewers)]
+
+def run_viewers(func, viewer_views):
+    """Run one refresh per viewer concurrently; return results in viewer order."""
+    results = [None] * len(viewer_views)
+    barrier = threading.Barrier(len(viewer_views))
+    
+    def viewer(i):
+        barrier.wait()
+        results[i] = func(*viewer_views[i])
+    
+    threads = [threading.Thread(target=viewer, args=(i,)) for i in range(len(viewer_views))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def measure(db, calculator, refresh, viewer_views, strikes, snapshot):
+    """Store a new snapshot, run one refresh round and return its counters."""
+    db.save_option_data(make_chain(strikes, seed=snapshot), SYMBOL, EXPIRY,
+                        START + timedelta(minutes=snapshot))
+    calculator.writer.flush()
+    computations = calculator.computations
+    oi_rows = calculator.writer.metrics()['oi_change_rows']
+    
+    results, seconds = timed(run_viewers, refresh, viewer_views)
+    
+    calculator.writer.flush()
+    return results, {
+        'computations': calculator.computations - computations,
+        'oi_rows': calculator.writer.metrics()['oi_change_rows'] - oi_rows,
+        'seconds': seconds,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared result cache benchmark")
+    parser.add_argument('--viewers', type=int, nargs='+', default=[1, 5, 10, 20])
+    parser.add_argument('--strikes', type=int, default=95)
+    parser.add_argument('--history', type=int, default=30, help="Stored snapshots (one a minute)")
+    parser.add_argument('--rounds', type=int, default=3, help="Refresh rounds (new snapshots) per viewer count")
+    args = parser.parse_args()
+    
+    logging.getLogger().setLevel(logging.ERROR)
+    
+    db = DatabaseManager(temp_db_path('result_cache'))
+    for minute in range(args.history):
+        db.save_option_data(make_chain(args.strikes, seed=minute), SYMBOL, EXPIRY, START + timedelta(minutes=minute))
+    calculator = CountingCalculator(db)
+    snapshot = args.history
+    
+    def legacy(currently_trading, range_limit, highlight_limit):
+        return calculator.process_latest_data(SYMBOL, EXPIRY, currently_trading, range_limit, highlight_limit)
+    
+    rows = []
+    for n_viewers in args.viewers:
+        viewer_views = views(n_viewers, args.strikes)
+        cache = ResultCache(calculator)
+        
+        def shared(currently_trading, range_limit, highlight_limit):
+            return cache.view(SYMBOL, EXPIRY, currently_trading, range_limit, highlight_limit)
+        
+        for mode, refresh in (('legacy', legacy), ('shared', shared)):
+            totals = {'computations': 0, 'oi_rows': 0, 'seconds': 0.0}
+            for _ in range(args.rounds):
+                results, counters = measure(db, calculator, refresh, viewer_views, args.strikes, snapshot)
+                snapshot += 1
+                
+                # Parity: each viewer got what process_latest_data gives for its settings
+                for result, view in zip(results, viewer_views):
+                    assert result['success'], result['message']
+                    assert result == legacy(*view), f"{mode}: view {view} differs from process_latest_data"
+                for key in totals:
+                    totals[key] += counters[key]
+            rows.append((n_viewers, mode, {key: value / args.rounds for key, value in totals.items()}))
+    
+    print(f"{args.strikes} strikes, {args.history} stored snapshots, {args.rounds} refresh rounds per row")
+    print("parity: ok (every view equals process_latest_data with the same settings)")
+    print(f"{'viewers':>7}  {'mode':<8}{'computations':>14}{'OI rows queued':>16}{'round ms':>10}")
+    for n_viewers, mode, avg in rows:
+        print(f"{n_viewers:>7}  {mode:<8}{avg['computations']:>14.1f}{avg['oi_rows']:>16,.0f}"
+              f"{avg['seconds'] * 1000:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: sleep-after-work loop vs the wall-clock-aligned CollectionScheduler.
+
+Runs a job that takes a fixed amount of time on a short interval with both
+loops and reports how far each run started from its interval boundary.
+The old loop drifts by the job time every cycle; the scheduler's lateness
+stays flat.
+
+Usage:
+    python -m benchmarks.scheduler_drift [--interval 1.0] [--work 0.3] [--cycles 10]
+"""
+import time
+import argparse
+
+import numpy as np
+
+from benchmarks.common import make_chain
+from utils.schedule import CollectionScheduler, MarketCalendar
+
+def legacy_loop(job, interval, cycles):
+    """The original loop: do the work, then sleep a full interval."""
+    for _ in range(cycles):
+        job()
+        time.sleep(interval)
+
+def boundary_offsets(starts, interval):
+    """Seconds each start is past the interval boundary it belongs to."""
+    first = np.round(starts[0] / interval) * interval
+    boundaries = first + interval * np.arange(len(starts))
+    return np.array(starts) - boundaries
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduler drift benchmark")
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--work', type=float, default=0.3, help="Job duration (s)")
+    parser.add_argument('--cycles', type=int, default=10)
+    args = parser.parse_args()
+    
+    def work():
+        make_chain(100)
+        time.sleep(args.work)
+    
+    # Legacy: starts wherever the previous cycle left off
+    legacy_starts = []
+    time.sleep(np.ceil(time.time() / args.interval) * args.interval - time.time())
+    legacy_loop(lambda: (legacy_starts.append(time.time()), work()), args.interval, args.cycles)
+    
+    # Scheduler on an always-open calendar
+    calendar = MarketCalendar({"start": "00:00", "end": "23:59"}, holidays=[])
+    calendar.is_trading_day = lambda day: True
+    scheduler = CollectionScheduler(args.interval, calendar)
+    starts = []
+    
+    def job(fire_time):
+        starts.append(time.time())
+        work()
+        if len(starts) == args.cycles:
+            scheduler.stop()
+    
+    scheduler.run(job)
+    
+    legacy = boundary_offsets(legacy_starts, args.interval)
+    aligned = boundary_offsets(starts, args.interval)
+    
+    print(f"{args.cycles} cycles, {args.interval}s interval, {args.work}s of work per cycle")
+    print(f"{'loop':<12}{'first ms':>10}{'last ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, offsets in (('sleep-after', legacy), ('scheduler', aligned)):
+        p50, p99 = np.percentile(offsets, [50, 99]) * 1000
+        print(f"{name:<12}{offsets[0] * 1000:>10.1f}{offsets[-1] * 1000:>10.1f}{p50:>10.1f}{p99:>10.1f}")
+    
+    lateness = scheduler.metrics()['lateness']
+    print(f"scheduler recorded lateness: p50={lateness['p50'] * 1000:.1f}ms p99={lateness['p99'] * 1000:.1f}ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark: background and manual collections of the same target, with and without single-flight.
+
+Imitates `main.py --mode both`: each round the background thread runs a
+collection cycle while the dashboard fires "Start Collection", "Collect
+Data Now" and the auto-collection rerun for the same target at the same
+moment, then the user clicks "Collect Data Now" once more.
+
+- uncoalesced: every call fetches and stores on its own;
+- single-flight: concurrent calls share one fetch and one result, and the
+  last click reuses the fresh snapshot.
+
+Reports API requests, archive writes and database saves per round and
+the latency of the late click, and checks that every caller got the same
+frame as the fetch it shared.
+
+Usage:
+    python -m benchmarks.single_flight [--rounds 5] [--latency 0.3] [--clicks 3]
+"""
+import shutil
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import temp_db_path, timed
+from benchmarks.mock_truedata import MockTrueData
+from data_collection.connector import DataCollectionConnector
+from data_collection.fetch import Fetcher
+from data_collection.fingerprint import ChangeSet, SnapshotFingerprinter
+from data_collection.sinks import ExcelSnapshotSink
+from database.db_manager import DatabaseManager
+from utils.rate_limit import RateLimiter
+from utils.single_flight import SingleFlight, _Call
+
+TARGET = ('NIFTY', '29-05-2025')
+OTHER = ('BANKNIFTY', '29-05-2025')
+
+class Uncoalesced(SingleFlight):
+    """Every caller leads its own call: the behaviour before single-flight."""
+    
+    def begin(self, key, fresh_for=0):
+        return _Call(), True
+
+class LiveFingerprinter(SnapshotFingerprinter):
+    """Treat every payload as new, as on a live feed (the mock serves one fixed payload)."""
+    
+    def cached_frame(self, symbol, expiry, digest):
+        return None
+    
+    def update(self, symbol, expiry, digest, data):
+        return ChangeSet(False, None, len(data), False)
+
+class CountingSink(ExcelSnapshotSink):
+    """Excel sink that counts writes (same-minute files overwrite each other)."""
+    
+    def __init__(self, base_dir):
+        super().__init__(base_dir)
+        self.writes = 0
+        self._lock = threading.Lock()
+    
+    def write(self, data, symbol, expiry, timestamp):
+        with self._lock:
+            self.writes += 1
+        return super().write(data, symbol, expiry, timestamp)
+
+class CountingDatabase(DatabaseManager):
+    """Counts snapshot saves (saves in the same second replace each other)."""
+    
+    def __init__(self, db_file):
+        super().__init__(db_file)
+        self.saves = 0
+        self._lock = threading.Lock()
+    
+    def bulk_save_option_data(self, snapshots, manifest=None):
+        # save_option_data goes through here too
+        with self._lock:
+            self.saves += len(snapshots)
+        return super().bulk_save_option_data(snapshots, manifest=manifest)
+
+def make_connector(db, sink, fetcher):
+    connector = DataCollectionConnector(db=db)
+    connector.collector.sink = sink
+    connector.collector.limiter = fetcher.limiter
+    connector.collector.fetcher = fetcher
+    connector.collector.fingerprints = LiveFingerprinter()
+    return connector
+
+def run_round(background, dashboard, clicks):
+    """One background cycle and `clicks` simultaneous dashboard collections, then a late click."""
+    results = {}
+    start = threading.Barrier(clicks + 1)
+    
+    def cycle():
+        start.wait()
+        results['background'] = background.collect_and_store_many([TARGET, OTHER])[TARGET]
+    
+    def click(i):
+        start.wait()
+        results[f"click {i}"] = dashboard.collect_and_store(*TARGET, wait=True)
+    
+    threads = [threading.Thread(target=cycle)] + [
+        threading.Thread(target=click, args=(i,)) for i in range(clicks)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    late, late_seconds = timed(dashboard.collect_and_store, *TARGET, True)
+    return results, late, late_seconds
+
+def run(mock, flights_factory, rounds, clicks):
+    """Run all rounds in one mode; return per-round counts, late click times and frames."""
+    data_dir = tempfile.mkdtemp(prefix='oc_single_flight_')
+    try:
+        db = CountingDatabase(temp_db_path('single_flight'))
+        sink = CountingSink(data_dir)
+        fetcher = Fetcher(limiter=RateLimiter(rate=1e6, burst=1e6))
+        background, dashboard = make_connector(db, sink, fetcher), make_connector(db, sink, fetcher)
+        assert background.collector.refresh_token()
+        
+        mock.reset_stats()
+        late_times, outcomes = [], []
+        for _ in range(rounds):
+            # A new round is later than the freshness window
+            flights = flights_factory()
+            background.flights = dashboard.flights = flights
+            
+            results, late, late_seconds = run_round(background, dashboard, clicks)
+            late_times.append(late_seconds)
+            outcomes.append((results, late))
+        
+        background.writer.flush()
+        return {
+            'requests': mock.stats['chain_requests'] / rounds,
+            'writes': sink.writes / rounds,
+            'snapshots': db.saves / rounds,
+        }, np.array(late_times), outcomes
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+def check_parity(outcomes):
+    """With single-flight every caller of a round holds the background cycle's frame."""
+    for results, late in outcomes:
+        reference = results['background'][0]
+        assert reference is not None
+        for name, (data, _, success) in results.items():
+            assert success, f"{name} failed"
+            pd.testing.assert_frame_equal(data, reference)
+        pd.testing.assert_frame_equal(late[0], reference)
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-flight collection benchmark")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.3, help="Server latency per request (s)")
+    parser.add_argument('--clicks', type=int, default=3, help="Simultaneous dashboard collections")
+    args = parser.parse_args()
+    
+    with MockTrueData(latency=args.latency, jitter=args.latency / 5) as mock, mock.patch_endpoints():
+        legacy, legacy_late, _ = run(mock, Uncoalesced, args.rounds, args.clicks)
+        coalesced, coalesced_late, outcomes = run(mock, SingleFlight, args.rounds, args.clicks)
+    
+    check_parity(outcomes)
+    
+    print(f"{args.rounds} rounds: 1 background cycle (2 targets) + {args.clicks} simultaneous dashboard "
+          f"collections + 1 late click, {args.latency * 1000:.0f}ms server latency")
+    print("parity: ok (every caller got the shared fetch's frame)")
+    print(f"{'per round':<16}{'API requests':>14}{'archive writes':>16}{'DB saves':>14}{'late click ms':>15}")
+    for name, counts, late in (('uncoalesced', legacy, legacy_late), ('single-flight', coalesced, coalesced_late)):
+        print(f"{name:<16}{counts['requests']:>14.1f}{counts['writes']:>16.1f}{counts['snapshots']:>14.1f}"
+              f"{np.median(late) * 1000:>15.1f}")
+
+if __name__ == '__main__':
+    main()
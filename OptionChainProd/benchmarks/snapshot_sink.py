@@ -0,0 +1,103 @@
+"""
+Benchmark: per-snapshot Excel files vs the append-only Parquet snapshot sink.
+
+Writes a trading day of synthetic 35-column snapshots through each sink and
+reports write latency per snapshot, bytes on disk and the cost of reading
+one snapshot's OI columns back. Checks that the Parquet round trip returns
+the same payload before timing.
+
+Usage:
+    python -m benchmarks.snapshot_sink [--strikes 95] [--snapshots 75]
+"""
+import os
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_payload, timed
+from data_collection.sinks import ExcelSnapshotSink, ParquetSnapshotSink, SNAPSHOT_TIME_COLUMN
+
+SYMBOL = 'NIFTY'
+EXPIRY = '30-01-2025'
+
+def dir_size(path):
+    """Total bytes of all files under a directory."""
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+def check_parity(n_strikes):
+    """Round-trip snapshots through the Parquet sink and compare with the input."""
+    sink = ParquetSnapshotSink(tempfile.mkdtemp(prefix='oc_sink_'))
+    start = datetime(2025, 1, 2, 9, 15)
+    payloads = [make_payload(n_strikes, seed=i) for i in range(3)]
+    
+    for i, payload in enumerate(payloads):
+        sink.write(payload, SYMBOL, EXPIRY, start + timedelta(minutes=5 * i))
+    sink.close()
+    
+    # Reopening an existing day file keeps its row groups
+    sink.write(make_payload(n_strikes, seed=3), SYMBOL, EXPIRY, start + timedelta(minutes=15))
+    sink.close()
+    
+    stored = sink.read(SYMBOL, EXPIRY, start)
+    assert stored[SNAPSHOT_TIME_COLUMN].nunique() == 4, "reopened file lost snapshots"
+    
+    for i, payload in enumerate(payloads):
+        ts = start + timedelta(minutes=5 * i)
+        back = sink.read(SYMBOL, EXPIRY, start, start=ts, end=ts).drop(columns=SNAPSHOT_TIME_COLUMN)
+        assert list(back.columns) == list(payload.columns), "column order changed"
+        
+        for column in payload.columns:
+            expected, actual = payload[column], back[column]
+            if pd.api.types.is_numeric_dtype(expected):
+                assert np.allclose(expected.to_numpy(dtype='float64'), actual.to_numpy(dtype='float64'), equal_nan=True), column
+            else:
+                assert expected.isna().equals(actual.isna()), column
+                assert (expected.dropna().astype(str).to_numpy() == actual.dropna().to_numpy()).all(), column
+    
+    pruned = sink.read(SYMBOL, EXPIRY, start, columns=['strike', 'callOI', 'putOI'])
+    assert list(pruned.columns) == [SNAPSHOT_TIME_COLUMN, 'strike', 'callOI', 'putOI']
+
+def run_sink(sink, payloads, start):
+    """Write all snapshots through a sink and return per-snapshot latencies."""
+    latencies = []
+    for i, payload in enumerate(payloads):
+        _, elapsed = timed(sink.write, payload, SYMBOL, EXPIRY, start + timedelta(minutes=5 * i))
+        latencies.append(elapsed)
+    _, close_elapsed = timed(sink.close)
+    latencies[-1] += close_elapsed
+    return np.array(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot sink benchmark")
+    parser.add_argument('--strikes', type=int, default=95)
+    parser.add_argument('--snapshots', type=int, default=75, help="Snapshots per day (75 = 09:15-15:30 every 5 minutes)")
+    args = parser.parse_args()
+    
+    check_parity(args.strikes)
+    print("parity: ok")
+    
+    start = datetime(2025, 1, 2, 9, 15)
+    payloads = [make_payload(args.strikes, seed=i) for i in range(args.snapshots)]
+    
+    excel_dir = tempfile.mkdtemp(prefix='oc_excel_')
+    parquet_dir = tempfile.mkdtemp(prefix='oc_parquet_')
+    excel = run_sink(ExcelSnapshotSink(excel_dir), payloads, start)
+    parquet_sink = ParquetSnapshotSink(parquet_dir)
+    parquet = run_sink(parquet_sink, payloads, start)
+    
+    target = start + timedelta(minutes=5 * (args.snapshots // 2))
+    _, excel_read = timed(pd.read_excel, ExcelSnapshotSink(excel_dir).path(SYMBOL, EXPIRY, target), usecols=['strike', 'callOI', 'putOI'])
+    _, parquet_read = timed(parquet_sink.read, SYMBOL, EXPIRY, start, columns=['strike', 'callOI', 'putOI'], start=target, end=target)
+    
+    print(f"{args.snapshots} snapshots x {args.strikes} strikes")
+    print(f"{'sink':<10}{'mean ms':>10}{'p95 ms':>10}{'total s':>10}{'disk KB':>10}{'read 1 ms':>12}")
+    for name, latencies, path, read in (('excel', excel, excel_dir, excel_read), ('parquet', parquet, parquet_dir, parquet_read)):
+        print(f"{name:<10}{latencies.mean() * 1000:>10.2f}{np.percentile(latencies, 95) * 1000:>10.2f}"
+              f"{latencies.sum():>10.2f}{dir_size(path) / 1024:>10.1f}{read * 1000:>12.2f}")
+    print(f"write speedup: {excel.sum() / parquet.sum():.1f}x, size ratio: {dir_size(excel_dir) / dir_size(parquet_dir):.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: polling the option chain API vs snapshotting a streaming feed.
+
+Takes a snapshot of the same targets every --interval seconds two ways:
+
+- poll: OptionChainCollector.collect_data against the mock REST API; every
+  snapshot transfers the whole chain and waits for the server;
+- stream: StreamingCollector against the mock WebSocket feed ticking at
+  --tick-rate updates/s; snapshots are cut from the live state and stored
+  through DataCollectionConnector.collect_from_stream.
+
+Reports transferred bytes and latency per snapshot, the interval above which
+the stream would transfer more than polling, and how many intra-interval
+updates each mode saw. Checks that the stream's state equals the feed's
+after a pause and that the stored snapshot reads back from the database.
+
+Usage:
+    python -m benchmarks.streaming [--snapshots 10] [--interval 1] [--tick-rate 20] [--strikes 95]
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import temp_db_path, timed
+from benchmarks.mock_stream import MockStreamFeed
+from benchmarks.mock_truedata import MockTrueData
+from data_collection.collector import OptionChainCollector
+from data_collection.connector import DataCollectionConnector
+from data_collection.fetch import Fetcher
+from data_collection.streaming import StreamingCollector
+from database.db_manager import DatabaseManager, OI_COLUMNS
+from utils.rate_limit import RateLimiter
+
+TARGETS = [('NIFTY', '29-05-2025'), ('BANKNIFTY', '29-05-2025')]
+
+def run_poll(mock, snapshots, interval):
+    """Poll every target each interval; return per-snapshot bytes and latencies."""
+    collector = OptionChainCollector()
+    collector.limiter = RateLimiter(rate=1e6, burst=1e6)
+    collector.fetcher = Fetcher(limiter=collector.limiter)
+    assert collector.refresh_token()
+    
+    sizes, latencies = [], []
+    for _ in range(snapshots):
+        started = time.monotonic()
+        for symbol, expiry in TARGETS:
+            data, seconds = timed(collector.collect_data, symbol, expiry)
+            assert data is not None
+            latencies.append(seconds)
+            sizes.append(len(mock.payload(symbol, expiry)))
+        time.sleep(max(0, interval - (time.monotonic() - started)))
+    return np.array(sizes), np.array(latencies)
+
+def run_stream(feed, snapshots, interval):
+    """Snapshot the live state each interval; return bytes, latencies, the connector and stream."""
+    stream = StreamingCollector(TARGETS, url=feed.url).start()
+    assert stream.wait_ready(10), "stream did not receive its chains"
+    
+    connector = DataCollectionConnector(db=DatabaseManager(temp_db_path('streaming')))
+    connector.collector.sink = None
+    
+    sizes, latencies = [], []
+    received = stream.metrics()['bytes']
+    for _ in range(snapshots):
+        time.sleep(interval)
+        for symbol, expiry in TARGETS:
+            (data, _), seconds = timed(stream.snapshot, symbol, expiry)
+            assert data is not None
+            latencies.append(seconds)
+        total = stream.metrics()['bytes']
+        sizes.extend([(total - received) / len(TARGETS)] * len(TARGETS))
+        received = total
+        results = connector.collect_from_stream(stream, wait=True)
+        assert all(success for _, _, success in results.values())
+    
+    return np.array(sizes), np.array(latencies), connector, stream
+
+def check_parity(feed, stream, connector):
+    """After a pause the live state equals the feed's chain, and the stored snapshot reads back."""
+    feed.pause()
+    for symbol, expiry in TARGETS:
+        truth, seq = feed.truth(symbol, expiry)
+        deadline = time.monotonic() + 5
+        while stream.states[(symbol, expiry)].seq != seq:
+            assert time.monotonic() < deadline, "stream did not catch up with the feed"
+            time.sleep(0.01)
+        data, _ = stream.snapshot(symbol, expiry)
+        pd.testing.assert_frame_equal(data, truth)
+    
+    results = connector.collect_from_stream(stream, wait=True)
+    for (symbol, expiry), (data, _, success) in results.items():
+        assert success
+        stored = connector.db.get_latest_option_data(symbol, expiry)
+        for api_column, db_column in OI_COLUMNS.items():
+            np.testing.assert_array_equal(stored[db_column].to_numpy(dtype='float64'),
+                                          data[api_column].to_numpy(dtype='float64'))
+    feed.resume()
+
+def main():
+    parser = argparse.ArgumentParser(description="Polling vs streaming ingestion benchmark")
+    parser.add_argument('--snapshots', type=int, default=10, help="Snapshots per target")
+    parser.add_argument('--interval', type=float, default=1.0, help="Seconds between snapshots")
+    parser.add_argument('--tick-rate', type=float, default=20, help="Feed updates per second (all targets)")
+    parser.add_argument('--strikes', type=int, default=95)
+    parser.add_argument('--latency', type=float, default=0.1, help="REST API response time (s)")
+    args = parser.parse_args()
+    
+    with MockTrueData(latency=args.latency, jitter=args.latency / 5, strikes=args.strikes) as mock, \
+            mock.patch_endpoints():
+        poll_sizes, poll_latencies = run_poll(mock, args.snapshots, args.interval)
+        
+        with MockStreamFeed(strikes=args.strikes, tick_rate=args.tick_rate) as feed:
+            stream_sizes, stream_latencies, connector, stream = run_stream(feed, args.snapshots, args.interval)
+            check_parity(feed, stream, connector)
+            metrics = stream.metrics()
+            stream.stop()
+    
+    # Bytes per second and target the stream costs, against one full chain per poll
+    stream_rate = stream_sizes.mean() / args.interval
+    crossover = poll_sizes.mean() / stream_rate if stream_rate else float('inf')
+    
+    print(f"{len(TARGETS)} targets x {args.snapshots} snapshots every {args.interval:.1f}s, {args.strikes} strikes, "
+          f"feed {args.tick_rate:.0f} updates/s, REST latency {args.latency * 1000:.0f}ms")
+    print("parity: ok (live state equals the feed; stored snapshot reads back)")
+    print(f"{'mode':<8}{'bytes/snapshot':>16}{'p50 ms':>10}{'p99 ms':>10}{'updates seen':>14}")
+    print(f"{'poll':<8}{poll_sizes.mean():>16,.0f}{np.percentile(poll_latencies, 50) * 1000:>10.1f}"
+          f"{np.percentile(poll_latencies, 99) * 1000:>10.1f}{'net only':>14}")
+    print(f"{'stream':<8}{stream_sizes.mean():>16,.0f}{np.percentile(stream_latencies, 50) * 1000:>10.2f}"
+          f"{np.percentile(stream_latencies, 99) * 1000:>10.2f}{metrics['updates']:>14}")
+    print(f"stream uses less bandwidth than polling for snapshot intervals up to {crossover:.0f}s "
+          f"at {args.tick_rate:.0f} updates/s ({stream_rate:,.0f} B/s per target)")
+
+if __name__ == '__main__':
+    main()
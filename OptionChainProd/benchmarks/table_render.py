@@ -0,0 +1,149 @@
+"""
+Benchmark: iterrows + string concatenation vs the column-wise OI table renderer.
+
+Checks that both produce the same HTML (with N/A and missing changes,
+floats, zero changes, OI columns and no highlight column) before timing.
+
+Usage:
+    python -m benchmarks.table_render [--strikes 50 100 250 500] [--repeat 5]
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timed
+from config.settings import DATA_COLLECTION
+from ui.table_render import render_oi_table
+
+def legacy_format_oi_change(val, is_ce=True):
+    """The original per-cell formatter from ui/dashboard.py, kept as the baseline."""
+    if pd.isna(val) or val == "N/A":
+        return "N/A"
+    
+    try:
+        val = int(val)
+    except (ValueError, TypeError):
+        return "N/A"
+    
+    if is_ce:
+        if val < 0:
+            color = "cell-dark-green"
+        elif val > 0:
+            color = "cell-red"
+        else:
+            color = ""
+    else:
+        if val < 0:
+            color = "cell-dark-red"
+        elif val > 0:
+            color = "cell-green"
+        else:
+            color = ""
+    
+    formatted_val = f"{val:,}"
+    if val > 0:
+        formatted_val = f"+{formatted_val}"
+    
+    return f'<div class="{color}">{formatted_val}</div>'
+
+def legacy_render(df):
+    """The original HTML building loop from display_oi_table, kept as the baseline."""
+    cols = df.columns.tolist()
+    display_cols = [col for col in cols if col != 'highlight']
+    
+    html_output = "<div class='table-container'><table class='dataframe'>"
+    html_output += "<thead><tr>"
+    for col in display_cols:
+        html_output += f"<th>{col}</th>"
+    html_output += "</tr></thead>"
+    
+    html_output += "<tbody>"
+    for idx, row in df.iterrows():
+        row_class = "highlight" if row.get('highlight', False) else ""
+        html_output += f"<tr class='{row_class}'>"
+        
+        for col in display_cols:
+            value = row[col]
+            if col.startswith('CE ') and col != 'CE OI':
+                cell_content = legacy_format_oi_change(value, is_ce=True)
+            elif col.startswith('PE ') and col != 'PE OI':
+                cell_content = legacy_format_oi_change(value, is_ce=False)
+            elif col == 'Strike':
+                cell_content = f"{value:,.0f}"
+            elif col in ['CE OI', 'PE OI']:
+                cell_content = f"{int(value):,}" if pd.notna(value) else ""
+            else:
+                cell_content = str(value)
+            html_output += f"<td>{cell_content}</td>"
+        
+        html_output += "</tr>"
+    
+    html_output += "</tbody></table></div>"
+    return html_output
+
+def make_table(n_strikes, intervals, seed=0, missing=0.1):
+    """Build a display table shaped like create_oi_change_table output."""
+    rng = np.random.default_rng(seed)
+    strikes = 22000 + 50 * np.arange(n_strikes)
+    middle = strikes[n_strikes // 2]
+    
+    table = {'Strike': strikes.astype('float64')}
+    for side in ('CE', 'PE'):
+        for interval in intervals:
+            values = rng.integers(-200_000, 200_000, n_strikes).astype(object)
+            values[rng.random(n_strikes) < 0.05] = 0
+            values[rng.random(n_strikes) < missing] = "N/A"
+            table[f'{side} {interval}min'] = values
+    table['highlight'] = np.abs(strikes - middle) <= 400
+    return pd.DataFrame(table)
+
+def scenarios(n_strikes, intervals):
+    """Yield (name, table) parity scenarios."""
+    table = make_table(n_strikes, intervals)
+    yield 'ints and N/A', table
+    
+    odd = table.copy()
+    odd['CE 5min'] = np.where(np.arange(n_strikes) % 3 == 0, np.nan, np.arange(n_strikes) * -1.5)
+    odd['PE 5min'] = np.where(np.arange(n_strikes) % 4 == 0, None, np.arange(n_strikes))
+    odd.insert(1, 'CE OI', np.where(np.arange(n_strikes) % 5 == 0, np.nan, np.arange(n_strikes) * 12345.0))
+    odd.insert(2, 'PE OI', np.arange(n_strikes) * 1000)
+    odd.insert(3, 'Note', [f"row {i}" for i in range(n_strikes)])
+    yield 'floats, missing values and OI columns', odd
+    
+    yield 'no highlight column', table.drop(columns=['highlight'])
+    yield 'no rows', table.iloc[:0]
+
+def run(strike_counts, intervals, repeat):
+    """Check parity, then time both renderers."""
+    for n_strikes in strike_counts:
+        for name, table in scenarios(n_strikes, intervals):
+            assert render_oi_table(table) == legacy_render(table), f"HTML differs: {name}, {n_strikes} strikes"
+    print("Parity: OK (identical HTML)")
+    
+    results = []
+    for n_strikes in strike_counts:
+        table = make_table(n_strikes, intervals)
+        html, _ = timed(render_oi_table, table)
+        legacy_time = min(timed(legacy_render, table)[1] for _ in range(repeat))
+        render_time = min(timed(render_oi_table, table)[1] for _ in range(repeat))
+        results.append({
+            'strikes': n_strikes,
+            'cells': n_strikes * (len(table.columns) - 1),
+            'html_kb': len(html.encode()) / 1024,
+            'legacy_ms': legacy_time * 1000,
+            'columnwise_ms': render_time * 1000,
+            'speedup': legacy_time / render_time,
+        })
+    
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+def main():
+    parser = argparse.ArgumentParser(description="OI table renderer benchmark")
+    parser.add_argument("--strikes", type=int, nargs='+', default=[50, 100, 250, 500])
+    parser.add_argument("--intervals", type=int, nargs='+', default=DATA_COLLECTION["analysis_intervals"])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.strikes, args.intervals, args.repeat)
+
+if __name__ == "__main__":
+    main()
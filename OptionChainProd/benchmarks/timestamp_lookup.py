@@ -0,0 +1,97 @@
+"""
+Benchmark: per-refresh OI change cost as stored history grows.
+
+Compares the original parse-everything + min() lookup with the bisect-based
+timestamp index, for databases holding an increasing number of trading days.
+
+Usage:
+    python -m benchmarks.timestamp_lookup [--days 1 10 50] [--strikes 100]
+"""
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from benchmarks.common import make_chain, temp_db_path, timed
+from database.db_manager import DatabaseManager
+from processing.calculator import OptionMetricsCalculator
+from processing.oi_engine import compute_oi_changes
+from utils.helpers import to_ist
+from config.settings import DATA_COLLECTION
+
+SNAPSHOTS_PER_DAY = 75
+
+def legacy_past_snapshots(db, symbol, expiry, current_timestamp):
+    """The original timestamp lookup from calculate_oi_changes, kept as the baseline."""
+    all_timestamps = [to_ist(ts_str) for ts_str in db.get_timestamps(symbol, expiry)]
+    past_snapshots = []
+    for interval_minutes in DATA_COLLECTION["analysis_intervals"]:
+        target_timestamp = current_timestamp - timedelta(minutes=interval_minutes)
+        past_timestamps = [ts for ts in all_timestamps if ts < current_timestamp]
+        if not past_timestamps:
+            continue
+        closest_timestamp = min(
+            past_timestamps,
+            key=lambda x: abs((x - target_timestamp).total_seconds())
+        )
+        past_data = db.get_option_data_by_timestamp(symbol, expiry, closest_timestamp)
+        actual_interval = round((current_timestamp - closest_timestamp).total_seconds() / 60)
+        past_snapshots.append((actual_interval, past_data))
+    return past_snapshots
+
+def legacy_calculate(db, symbol, expiry):
+    """Baseline calculate_oi_changes using the legacy lookup."""
+    current = db.get_latest_option_data(symbol, expiry)
+    current_timestamp = to_ist(current['timestamp'].iloc[0])
+    pasts = legacy_past_snapshots(db, symbol, expiry, current_timestamp)
+    return compute_oi_changes(current, pasts, current_timestamp, symbol, expiry)
+
+def build_db(n_days, n_strikes):
+    """Create a database holding n_days of 5-minute snapshots."""
+    db = DatabaseManager(temp_db_path(f'history_{n_days}'))
+    snapshots = []
+    for day in range(n_days):
+        open_time = datetime(2025, 1, 1, 9, 15) + timedelta(days=day)
+        for i in range(SNAPSHOTS_PER_DAY):
+            snapshots.append((make_chain(n_strikes, seed=i), 'NIFTY', '29-05-2025', open_time + timedelta(minutes=5 * i)))
+    db.bulk_save_option_data(snapshots)
+    return db
+
+def run(day_counts, n_strikes, repeat):
+    """Check parity, then time a refresh for each history size."""
+    results = []
+    for n_days in day_counts:
+        db = build_db(n_days, n_strikes)
+        calculator = OptionMetricsCalculator(db)
+        
+        expected = legacy_calculate(db, 'NIFTY', '29-05-2025')
+        pd.testing.assert_frame_equal(calculator.calculate_oi_changes('NIFTY', '29-05-2025'), expected)
+        
+        legacy_time = min(timed(legacy_calculate, db, 'NIFTY', '29-05-2025')[1] for _ in range(repeat))
+        indexed_time = min(
+            timed(calculator.calculate_oi_changes, 'NIFTY', '29-05-2025')[1] for _ in range(repeat)
+        )
+        results.append({
+            'days': n_days,
+            'snapshots': n_days * SNAPSHOTS_PER_DAY,
+            'legacy_ms': legacy_time * 1000,
+            'indexed_ms': indexed_time * 1000,
+            'speedup': legacy_time / indexed_time,
+        })
+    
+    print("Parity: OK")
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Timestamp lookup benchmark")
+    parser.add_argument("--days", type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument("--strikes", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    run(args.days, args.strikes, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """
 Configuration settings for the NIFTY Options Dashboard application.
 """
+import os
 
 # API credentials
 API_CREDENTIALS = {
@@ -8,20 +9,71 @@ API_CREDENTIALS = {
     "password": "niraj@681",
 }
 
-# API endpoints
+# API endpoints (overridable from the environment, e.g. to use benchmarks/mock_truedata.py)
 API_ENDPOINTS = {
-    "auth": "https://auth.truedata.in/token",
-    "option_chain": "https://greeks.truedata.in/api/getOptionChainwithGreeks"
+    "auth": os.environ.get("TRUEDATA_AUTH_URL", "https://auth.truedata.in/token"),
+    "option_chain": os.environ.get("TRUEDATA_OPTION_CHAIN_URL",
+                                   "https://greeks.truedata.in/api/getOptionChainwithGreeks")
+}
+
+# Token cache settings (shared by all processes through the cache file)
+AUTH = {
+    "token_cache_file": ".token_cache.json",
+    "refresh_margin_seconds": 300,  # Refresh this long before the token expires
+    "default_ttl_seconds": 3600,  # Assumed lifetime if the API omits expires_in
+    "retry_seconds": 30  # Wait between failed background refreshes
+}
+
+# HTTP client settings (one pooled keep-alive session per process)
+HTTP_CLIENT = {
+    "pool_connections": 4,  # Hosts kept in the pool
+    "pool_maxsize": 16,  # Keep-alive connections per host
+    "max_workers": 8,  # Targets fetched concurrently in one collection cycle
+    "connect_timeout": 3.05,  # Seconds to establish a connection
+    "read_timeout": 10,  # Seconds to wait for response data
+    "cycle_deadline_seconds": 30,  # A collection cycle finishes or fails within this (at most 80% of the interval)
+    "max_attempts": 3,  # Tries per request on timeouts, connection errors, 429 and 5xx
+    "retry_backoff": 0.5,  # Base of the jittered exponential backoff (s)
+    "retry_backoff_cap": 4,  # Longest backoff between attempts (s)
+    "hedge": True,  # Send a second request when the first is slower than the recent p95
+    "hedge_min_seconds": 0.25,  # Never hedge sooner than this
+    "hedge_min_samples": 20,  # Successful requests needed before hedging starts
+    "latency_buckets": [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],  # Histogram bucket bounds (s)
+    "metrics_file": None  # Write request latency histograms here (Prometheus text format) after each cycle
+}
+
+# Streaming ingestion (main.py --source stream): a WebSocket feed of full chains and per-strike updates
+STREAMING = {
+    "url": os.environ.get("TRUEDATA_STREAM_URL"),  # e.g. ws://127.0.0.1:8766 for benchmarks/mock_stream.py
+    "open_timeout": 10,  # Seconds to connect and authenticate
+    "ping_interval": 20,  # Seconds between keepalive pings
+    "reconnect_backoff": 1,  # Base of the jittered exponential backoff between reconnects (s)
+    "reconnect_backoff_cap": 30,  # Longest wait between reconnects (s)
+    "stale_seconds": 120  # Keep snapshotting a target's last state for this long after the feed drops
 }
 
 # Data collection settings
 DATA_COLLECTION = {
-    "interval_minutes": 5,  # Data collection interval in minutes
+    "interval_minutes": 5,  # Data collection interval in minutes (database granularity)
+    "interval_seconds": None,  # High-frequency mode: collect every 10-30 s, persist every interval_minutes
+    "freshness_seconds": 30,  # Reuse a target's snapshot this recent instead of fetching it again (at most half the interval)
     "trading_hours": {
         "start": "09:15",  # Trading day start time (24h format)
         "end": "15:30"      # Trading day end time (24h format)
     },
-    "analysis_intervals": [5, 10, 15, 30]  # Time intervals for OI change analysis (in minutes)
+    "analysis_intervals": [5, 10, 15, 30],  # Time intervals for OI change analysis (in minutes)
+    "holidays": []  # Exchange holidays as "YYYY-MM-DD"; weekends are always closed
+}
+
+# TrueData API rate limits and adaptive slow-down
+RATE_LIMIT = {
+    "requests_per_second": 5,  # Sustained request rate allowed by the vendor
+    "burst": 10,  # Requests that may go out at once (one multi-target cycle)
+    "acquire_timeout": 10,  # Seconds a request waits for the limiter before it is dropped
+    "latency_threshold_seconds": 2.0,  # p95 response time that triggers a slow-down
+    "error_rate_threshold": 0.2,  # Error fraction that triggers a slow-down
+    "window": 20,  # Requests per evaluation window
+    "max_slowdown": 8  # Largest interval multiplier
 }
 
 # File paths and naming
@@ -31,10 +83,47 @@ PATHS = {
     "time_format": "%H%M"
 }
 
+# Snapshot archive settings
+STORAGE = {
+    "snapshot_format": "parquet",  # "parquet" (one file per day), "excel" (one file per snapshot) or "none"
+    "compression": "zstd"
+}
+
+# Option chain response decoding
+DECODER = {
+    "response_format": "csv",  # "csv" or "json"; CSV decodes faster (python -m benchmarks.decode)
+    "engine": "auto",  # CSV parser: "pyarrow", "pandas" or "auto" (pyarrow when installed)
+    "strict": True  # Fail on columns the schema does not know instead of ignoring them
+}
+
+# Dashboard settings
+DASHBOARD = {
+    "result_cache_entries": 16,  # Snapshots whose computed dashboard results are kept per server process
+    "countdown_refresh_seconds": 1,  # Collection countdown timer while collection is running
+    "table_refresh_seconds": 5  # How often the table checks for a new snapshot
+}
+
 # Database settings
 DATABASE = {
     "filename": "option_metrics.db",
-    "backup_interval_hours": 24  # How often to backup the database
+    "backup_interval_hours": 24,  # How often to backup the database
+    "pool_size": 8,  # Idle connections kept open per database file
+    "statement_cache_size": 256,  # Prepared statements cached per connection
+    "change_poll_ms": 500,  # How often the snapshot notifier checks for commits by other processes
+    "pragmas": {
+        "journal_mode": "WAL",  # Readers do not block the collector's writes
+        "synchronous": "NORMAL",  # Safe with WAL, avoids an fsync per commit
+        "cache_size": -65536,  # Page cache in KiB (negative) or pages (positive)
+        "mmap_size": 268435456,  # 256 MB memory-mapped I/O
+        "busy_timeout": 5000,  # Milliseconds to wait on a locked database
+        "temp_store": "MEMORY"
+    },
+    "writer": {
+        "max_queue": 64,  # Pending writes before submitters block (back-pressure)
+        "batch_size": 32,  # Most writes grouped into one commit
+        "max_wait_ms": 50,  # How long to wait for more writes to join a batch
+        "put_timeout": 10  # Seconds a submitter blocks on a full queue before the write is dropped
+    }
 }
 
 # Logging settings
@@ -1,18 +1,32 @@
 """
 Authentication module for TrueData API.
 """
-import requests
+import os
+import json
+import time
 import logging
-from config.settings import API_CREDENTIALS, API_ENDPOINTS
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import requests
+
+from config.settings import API_CREDENTIALS, API_ENDPOINTS, AUTH, HTTP_CLIENT
+from data_collection.http_client import get_http_session
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
-def get_auth_token():
+def request_token():
     """
-    Authenticate with the TrueData API and get a bearer token.
+    Authenticate with the TrueData API using the password grant.
     
     Returns:
-        str: Bearer token if successful, None otherwise
+        dict or None: {'access_token', 'expires_at'} if successful, None otherwise
     """
     auth_data = {
         "username": API_CREDENTIALS["username"],
@@ -21,17 +35,210 @@ def get_auth_token():
     }
     
     try:
-        response = requests.post(API_ENDPOINTS["auth"], data=auth_data)
+        response = get_http_session().post(
+            API_ENDPOINTS["auth"],
+            data=auth_data,
+            timeout=(HTTP_CLIENT["connect_timeout"], HTTP_CLIENT["read_timeout"])
+        )
         response.raise_for_status()  # Raise exception for HTTP errors
         
         token_data = response.json()
-        logger.info("Authentication successful, token expires in %s seconds", 
-                   token_data.get("expires_in", "unknown"))
+        expires_in = token_data.get("expires_in") or AUTH["default_ttl_seconds"]
+        logger.info("Authentication successful, token expires in %s seconds", expires_in)
         
-        return token_data["access_token"]
+        return {
+            'access_token': token_data["access_token"],
+            'expires_at': time.time() + float(expires_in)
+        }
     
     except requests.exceptions.RequestException as e:
         logger.error("Authentication failed: %s", str(e))
-        if hasattr(e, 'response') and e.response:
+        if getattr(e, 'response', None) is not None:
             logger.error("Response: %s", e.response.text)
-        return None
\ No newline at end of file
+        return None
+
+class TokenManager:
+    """
+    Caches the bearer token in memory and in a file shared by all processes.
+    
+    A background thread refreshes the token refresh_margin seconds before it
+    expires, so callers normally get a valid token without any network I/O.
+    Concurrent refreshes collapse into one: threads wait on a lock and
+    processes on a file lock, and whoever gets the lock second picks up the
+    token the first one stored.
+    """
+    
+    def __init__(self, cache_file=None, refresh_margin=None):
+        """
+        Initialize the token manager.
+        
+        Args:
+            cache_file (str, optional): Token cache path. If None, use AUTH["token_cache_file"].
+            refresh_margin (float, optional): Seconds before expiry to refresh.
+                If None, use AUTH["refresh_margin_seconds"].
+        """
+        self.cache_file = cache_file or AUTH["token_cache_file"]
+        self.refresh_margin = refresh_margin if refresh_margin is not None else AUTH["refresh_margin_seconds"]
+        
+        self._token = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._refresher = None
+    
+    def _is_fresh(self, token):
+        """Check whether a token is valid for longer than the refresh margin."""
+        return token is not None and token['expires_at'] - time.time() > self.refresh_margin
+    
+    @contextmanager
+    def _file_lock(self):
+        """Hold an exclusive lock shared with other processes using the same cache."""
+        if fcntl is None:
+            yield
+            return
+        
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+        with open(self.cache_file + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def _read_cache(self):
+        """Read the cached token, or None if missing or unreadable."""
+        try:
+            with open(self.cache_file) as f:
+                token = json.load(f)
+            return {'access_token': token['access_token'], 'expires_at': float(token['expires_at'])}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _write_cache(self, token):
+        """Write the token cache atomically, readable only by the current user."""
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.token_')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(token, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write token cache {self.cache_file}: {str(e)}")
+    
+    def get_token(self):
+        """
+        Get a valid bearer token, authenticating only when no fresh one is cached.
+        
+        Returns:
+            str or None: Bearer token or None if authentication failed
+        """
+        token = self._token
+        if not self._is_fresh(token):
+            token = self._refresh(stale=token)
+        
+        self._start_refresher()
+        return token['access_token'] if token else None
+    
+    def invalidate(self, access_token):
+        """
+        Discard a token the API rejected (HTTP 401) and get a new one.
+        
+        If another caller already replaced that token, its replacement is used.
+        
+        Args:
+            access_token (str): The rejected token
+        
+        Returns:
+            str or None: New bearer token or None if authentication failed
+        """
+        token = self._token
+        if token is None or token['access_token'] == access_token:
+            token = self._refresh(stale=token, rejected=access_token)
+        return token['access_token'] if token else None
+    
+    def _refresh(self, stale=None, rejected=None):
+        """
+        Get a new token, or the one another thread or process just fetched.
+        
+        Args:
+            stale (dict, optional): Token the caller found stale
+            rejected (str, optional): Access token the API rejected
+        
+        Returns:
+            dict or None: Token or None if authentication failed
+        """
+        with self._lock:
+            # Another thread refreshed while this one waited for the lock
+            if self._token is not stale and self._is_fresh(self._token):
+                return self._token
+            
+            with self._file_lock():
+                cached = self._read_cache()
+                if self._is_fresh(cached) and cached['access_token'] != rejected:
+                    self._token = cached
+                    return cached
+                
+                token = request_token()
+                if token is None:
+                    # Keep using the old token until it actually expires
+                    if stale is not None and stale['expires_at'] > time.time() and stale['access_token'] != rejected:
+                        return stale
+                    return None
+                
+                self._write_cache(token)
+                self._token = token
+            
+            self._wakeup.set()
+            return token
+    
+    def _start_refresher(self):
+        """Start the background refresh thread once a token exists."""
+        if self._refresher is not None or self._token is None:
+            return
+        
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_loop, name="token-refresh", daemon=True)
+                self._refresher.start()
+    
+    def _refresh_loop(self):
+        """Refresh the token shortly before it expires, for as long as the process runs."""
+        while True:
+            token = self._token
+            if token is None:
+                delay = AUTH["retry_seconds"]
+            else:
+                delay = token['expires_at'] - self.refresh_margin - time.time()
+            
+            # Woken early when a new token arrives, to reschedule
+            if delay > 0 and self._wakeup.wait(delay):
+                self._wakeup.clear()
+                continue
+            
+            if self._refresh(stale=token) is None or not self._is_fresh(self._token):
+                logger.warning(f"Background token refresh failed, retrying in {AUTH['retry_seconds']}s")
+                time.sleep(AUTH["retry_seconds"])
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def get_token_manager():
+    """
+    Get the process-wide token manager.
+    
+    Returns:
+        TokenManager: Shared token manager
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = TokenManager()
+        return _manager
+
+def get_auth_token():
+    """
+    Get a bearer token for the TrueData API.
+    
+    Returns:
+        str: Bearer token if successful, None otherwise
+    """
+    return get_token_manager().get_token()
@@ -0,0 +1,288 @@
+"""
+Parallel, resumable import of archived snapshot files into the database.
+
+Walks data/DD-MM-YYYY/SYMBOL/ for per-snapshot Excel files
+(SYMBOL_EXPIRY_HHMM.xlsx) and daily Parquet archives (SYMBOL_EXPIRY.parquet),
+parses them in a process pool and bulk-loads the snapshots. Every imported
+file is recorded in import_manifest, so reruns skip it unless it changed.
+
+Usage:
+    python -m data_collection.backfill [--data-dir data] [--workers N] [--symbol NIFTY] [--force]
+"""
+import os
+import time
+import logging
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config.settings import PATHS
+from data_collection.sinks import SNAPSHOT_TIME_COLUMN
+from database.db_manager import DatabaseManager, OI_COLUMNS
+from database.timestamp_index import to_epoch
+
+logger = logging.getLogger(__name__)
+
+# Only these columns are stored, so workers read and ship nothing else
+IMPORT_COLUMNS = ['strike', *OI_COLUMNS]
+
+# parsed: (symbol, expiry, timestamp or None); timestamp is None for day archives
+SnapshotFile = namedtuple('SnapshotFile', ['path', 'relpath', 'symbol', 'expiry', 'timestamp', 'size', 'mtime_ns'])
+
+try:
+    import python_calamine  # noqa: F401 -- Rust xlsx reader, several times faster than openpyxl
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+def parse_snapshot_path(relpath):
+    """
+    Work out symbol, expiry and time from an archived file's path.
+    
+    The date comes from the DD-MM-YYYY folder and the time from the HHMM
+    filename suffix; day archives have no time in their name.
+    
+    Args:
+        relpath (str): Path relative to the data folder
+    
+    Returns:
+        tuple or None: (symbol, expiry, timestamp or None), or None if the
+            path does not follow the archive layout
+    """
+    parts = relpath.replace(os.sep, '/').split('/')
+    if len(parts) != 3:
+        return None
+    
+    date_dir, symbol, filename = parts
+    stem, extension = os.path.splitext(filename)
+    
+    try:
+        date = datetime.strptime(date_dir, PATHS["date_format"]).date()
+        
+        if extension == '.xlsx':
+            file_symbol, expiry, time_str = stem.rsplit('_', 2)
+            timestamp = datetime.combine(date, datetime.strptime(time_str, PATHS["time_format"]).time())
+        elif extension == '.parquet':
+            file_symbol, expiry = stem.rsplit('_', 1)
+            timestamp = None
+        else:
+            return None
+    except ValueError:
+        return None
+    
+    if file_symbol != symbol:
+        return None
+    return symbol, expiry, timestamp
+
+def discover_files(data_dir, symbols=None, expiries=None, dates=None):
+    """
+    Find archived snapshot files.
+    
+    Args:
+        data_dir (str): Root data folder
+        symbols (list, optional): Only these symbols
+        expiries (list, optional): Only these expiries
+        dates (list, optional): Only these DD-MM-YYYY folders
+    
+    Returns:
+        list: SnapshotFile tuples, oldest folder first
+    """
+    files = []
+    if not os.path.isdir(data_dir):
+        logger.warning(f"Data folder not found: {data_dir}")
+        return files
+    
+    def folder_date(name):
+        try:
+            return datetime.strptime(name, PATHS["date_format"])
+        except ValueError:
+            return None
+    
+    date_dirs = sorted((d for d in os.listdir(data_dir) if folder_date(d)), key=folder_date)
+    
+    for date_dir in date_dirs:
+        if dates and date_dir not in dates:
+            continue
+        
+        for symbol in sorted(os.listdir(os.path.join(data_dir, date_dir))):
+            symbol_dir = os.path.join(data_dir, date_dir, symbol)
+            if not os.path.isdir(symbol_dir) or (symbols and symbol not in symbols):
+                continue
+            
+            for entry in sorted(os.scandir(symbol_dir), key=lambda e: e.name):
+                relpath = f"{date_dir}/{symbol}/{entry.name}"
+                parsed = parse_snapshot_path(relpath)
+                if parsed is None or not entry.is_file():
+                    continue
+                if expiries and parsed[1] not in expiries:
+                    continue
+                
+                stat = entry.stat()
+                files.append(SnapshotFile(entry.path, relpath, *parsed, stat.st_size, stat.st_mtime_ns))
+    
+    return files
+
+def read_snapshot_file(path, timestamp=None):
+    """
+    Read the snapshots stored in one archived file.
+    
+    Args:
+        path (str): File path
+        timestamp (datetime, optional): Snapshot time of an Excel file
+    
+    Returns:
+        list: (data, timestamp) pairs with IMPORT_COLUMNS only
+    """
+    if path.endswith('.parquet'):
+        frame = pd.read_parquet(path, columns=[SNAPSHOT_TIME_COLUMN, *IMPORT_COLUMNS])
+        return [
+            (group.drop(columns=SNAPSHOT_TIME_COLUMN).reset_index(drop=True), snapshot_time.to_pydatetime())
+            for snapshot_time, group in frame.groupby(SNAPSHOT_TIME_COLUMN, sort=True)
+        ]
+    
+    data = pd.read_excel(path, engine=EXCEL_ENGINE, usecols=lambda column: column in IMPORT_COLUMNS)
+    return [(data, timestamp)]
+
+def _read_task(task):
+    """Process pool entry point: read one file, never raise."""
+    path, timestamp = task
+    try:
+        return read_snapshot_file(path, timestamp), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def _existing_epochs(db, symbol, expiry):
+    """Sorted epoch seconds of snapshots already stored for a symbol and expiry."""
+    return np.array(sorted(to_epoch(ts) for ts in db.get_timestamps(symbol, expiry)), dtype='int64')
+
+def backfill(data_dir=None, db=None, workers=None, symbols=None, expiries=None, dates=None,
+             force=False, batch_size=64):
+    """
+    Import archived snapshot files into the database.
+    
+    Files are parsed in a process pool (one worker per core by default) and
+    loaded in batches of batch_size snapshots, each in one transaction that
+    also records the batch's files in import_manifest. Snapshots already in
+    the database are skipped; for Excel files, whose names only carry the
+    minute, any stored snapshot within that minute (the live collector saves
+    with second precision) counts as the same one.
+    
+    Args:
+        data_dir (str, optional): Root data folder. If None, use PATHS["data_folder"].
+        db (DatabaseManager, optional): Target database. If None, use the default database.
+        workers (int, optional): Parser processes. If None, use the number of CPUs.
+        symbols (list, optional): Only these symbols
+        expiries (list, optional): Only these expiries
+        dates (list, optional): Only these DD-MM-YYYY folders
+        force (bool): Re-import files already in the manifest, even if their
+            snapshots are stored
+        batch_size (int): Snapshots per transaction
+    
+    Returns:
+        dict: files, skipped, imported, failed, snapshots, duplicates, rows and seconds
+    """
+    data_dir = data_dir or PATHS["data_folder"]
+    db = db or DatabaseManager()
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    
+    files = discover_files(data_dir, symbols, expiries, dates)
+    manifest = {} if force else db.get_import_manifest()
+    pending = [f for f in files if manifest.get(f.relpath) != (f.size, f.mtime_ns)]
+    
+    stats = {'files': len(files), 'skipped': len(files) - len(pending), 'imported': 0, 'failed': 0,
+             'snapshots': 0, 'duplicates': 0, 'rows': 0, 'seconds': 0.0}
+    logger.info(f"Backfill: {len(files)} files in {data_dir}, {len(pending)} to import, "
+                f"{stats['skipped']} already imported, {workers} worker(s), {EXCEL_ENGINE} reader")
+    
+    existing = {}
+    batch, entries = [], []
+    
+    def flush():
+        if not batch and not entries:
+            return
+        result = db.bulk_save_option_data(batch, manifest=entries)
+        if result['success']:
+            stats['imported'] += len(entries)
+            stats['snapshots'] += result['snapshots']
+            stats['rows'] += result['rows']
+        else:
+            stats['failed'] += len(entries)
+        batch.clear()
+        entries.clear()
+    
+    tasks = [(f.path, f.timestamp) for f in pending]
+    if workers > 1 and len(tasks) > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_read_task, tasks, chunksize=max(1, len(tasks) // (workers * 8)))
+    else:
+        executor = None
+        results = map(_read_task, tasks)
+    
+    try:
+        for file, (snapshots, error) in zip(pending, results):
+            if error is not None:
+                logger.error(f"Error reading {file.relpath}: {error}")
+                stats['failed'] += 1
+                continue
+            
+            key = (file.symbol, file.expiry)
+            if key not in existing:
+                existing[key] = np.array([], dtype='int64') if force else _existing_epochs(db, *key)
+            
+            # Excel names only carry HHMM: a stored snapshot in the same minute is this one
+            window = 60 if file.timestamp is not None else 1
+            stored = existing[key]
+            
+            kept = 0
+            for data, timestamp in snapshots:
+                epoch = to_epoch(timestamp)
+                i = np.searchsorted(stored, epoch)
+                if i < len(stored) and stored[i] < epoch + window:
+                    stats['duplicates'] += 1
+                    continue
+                batch.append((data, file.symbol, file.expiry, timestamp))
+                kept += 1
+                # Later files of this run must see it too: a day archive
+                # (sorted before that day's Excel files) holds the same
+                # collections at the exact second
+                stored = np.insert(stored, i, epoch)
+            existing[key] = stored
+            
+            entries.append((file.relpath, file.size, file.mtime_ns, kept))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    
+    stats['seconds'] = time.perf_counter() - started
+    logger.info(f"Backfill: imported {stats['imported']} files ({stats['snapshots']} snapshots, "
+                f"{stats['rows']:,} rows) in {stats['seconds']:.1f}s; {stats['duplicates']} already stored, "
+                f"{stats['failed']} failed")
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Import archived snapshot files into the database")
+    parser.add_argument('--data-dir', default=PATHS["data_folder"])
+    parser.add_argument('--db', help="Database file (default: DATABASE['filename'])")
+    parser.add_argument('--workers', type=int, help="Parser processes (default: CPU count)")
+    parser.add_argument('--symbol', action='append', help="Only this symbol (repeatable)")
+    parser.add_argument('--expiry', action='append', help="Only this expiry (repeatable)")
+    parser.add_argument('--date', action='append', help="Only this DD-MM-YYYY folder (repeatable)")
+    parser.add_argument('--force', action='store_true', help="Re-import files already in the manifest")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    stats = backfill(args.data_dir, DatabaseManager(args.db), args.workers,
+                     args.symbol, args.expiry, args.date, args.force)
+    if stats['failed']:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,100 @@
 """
 Data collection module for option chain data.
 """
-import os
 import requests
-import pandas as pd
 import logging
 from datetime import datetime
-from io import StringIO
 import time
-from config.settings import API_ENDPOINTS, PATHS
-from data_collection.auth import get_auth_token
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import API_ENDPOINTS, HTTP_CLIENT, DECODER
+from data_collection.auth import get_token_manager
+from data_collection.decoder import OptionChainDecoder, SchemaDriftError, STORED_COLUMNS
+from data_collection.fetch import Deadline, cycle_deadline_seconds, get_fetcher
+from data_collection.fingerprint import SnapshotFingerprinter, body_digest
+from data_collection.http_client import get_http_session
+from utils.rate_limit import get_rate_limiter
+from data_collection.sinks import get_snapshot_sink
 
 logger = logging.getLogger(__name__)
 
 class OptionChainCollector:
     """
-    Collects option chain data from the TrueData API and saves it to Excel files.
+    Collects option chain data from the TrueData API and archives it through a snapshot sink.
     """
     
     def __init__(self):
         """Initialize the collector with default values."""
         self.token = None
+        self.tokens = get_token_manager()
         self.last_collection_time = None
+        self.last_cycle_stats = None
+        self.fingerprints = SnapshotFingerprinter()
+        self.last_changes = {}
+        self.session = get_http_session()
+        self.limiter = get_rate_limiter()
+        self.fetcher = get_fetcher()
+        self.sink = get_snapshot_sink()
+        # Without an archive only the stored and fingerprinted columns are used
+        self.decoder = OptionChainDecoder(usecols=None if self.sink else STORED_COLUMNS)
     
     def refresh_token(self):
-        """Refresh the authentication token."""
-        self.token = get_auth_token()
+        """Get a valid authentication token from the shared token manager."""
+        self.token = self.tokens.get_token()
         return self.token is not None
     
-    def collect_data(self, symbol, expiry):
+    def collect_data(self, symbol, expiry, retry_auth=True, deadline=None):
         """
         Collect option chain data for the specified symbol and expiry.
         
         Args:
             symbol (str): Symbol name (e.g., 'NIFTY')
             expiry (str): Expiry date in DD-MM-YYYY format
+            retry_auth (bool): Retry once with a new token if the API returns 401
+            deadline (Deadline, optional): Time by which the fetch must finish.
+                If None, the request gets a full cycle deadline of its own.
             
         Returns:
             pandas.DataFrame or None: Collected data or None if failed
         """
-        if not self.token and not self.refresh_token():
+        # Cached in memory and refreshed in the background, so normally no I/O
+        token = self.tokens.get_token()
+        if not token:
             logger.error("Cannot collect data: No valid authentication token")
             return None
+        self.token = token
         
         logger.info(f"Collecting data for {symbol} with expiry {expiry}")
         
         # Prepare request
-        headers = {"Authorization": f"Bearer {self.token}"}
+        headers = {"Authorization": f"Bearer {token}"}
         params = {
             "symbol": symbol,
             "expiry": expiry,
-            "response": "csv"
+            "response": DECODER["response_format"]
         }
         
+        deadline = deadline or Deadline(cycle_deadline_seconds())
+        
         try:
-            # Make API request
-            response = requests.get(
+            # Make API request (rate limited, retried and hedged within the deadline)
+            response = self.fetcher.get(
                 API_ENDPOINTS["option_chain"], 
                 headers=headers, 
-                params=params
+                params=params,
+                deadline=deadline
             )
             response.raise_for_status()
             
-            # Parse CSV response
-            data = pd.read_csv(StringIO(response.text))
+            # Decode the raw bytes, unless they are byte-for-byte the previous response
+            digest = body_digest(response.content)
+            data = self.fingerprints.cached_frame(symbol, expiry, digest)
+            if data is None:
+                data = self.decoder.decode(response.content, DECODER["response_format"])
+            
+            changes = self.fingerprints.update(symbol, expiry, digest, data)
+            self.last_changes[(symbol, expiry)] = changes
+            if changes.unchanged:
+                logger.info(f"Option chain for {symbol} {expiry} unchanged since last collection")
             
             # Save timestamp of collection
             import pytz
@@ -73,30 +104,107 @@ class OptionChainCollector:
             return data
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {str(e)}")
-            if hasattr(e, 'response') and e.response:
+            logger.error(f"API request failed for {symbol} {expiry}: {str(e)}")
+            # A 4xx/5xx Response is falsy, so compare with None
+            if getattr(e, 'response', None) is not None:
                 logger.error(f"Response: {e.response.text}")
                 
-                # If unauthorized, try refreshing token once
-                if e.response.status_code == 401:
+                # If unauthorized, replace the rejected token and retry once
+                if e.response.status_code == 401 and retry_auth:
                     logger.info("Trying to refresh token and retry")
-                    if self.refresh_token():
-                        # Recursive call with new token (just once)
-                        return self.collect_data(symbol, expiry)
+                    if self.tokens.invalidate(token):
+                        return self.collect_data(symbol, expiry, retry_auth=False, deadline=deadline)
+            return None
+        
+        except SchemaDriftError as e:
+            logger.error(f"Option chain for {symbol} {expiry} does not match the expected schema: {str(e)}")
             return None
         
         except Exception as e:
             logger.error(f"Error processing option chain data: {str(e)}")
             return None
     
-    def save_data(self, data, symbol, expiry):
+    def collect_many(self, targets, max_workers=None, deadline_seconds=None):
         """
-        Save the collected data to an Excel file.
+        Collect option chain data for several symbol/expiry pairs concurrently.
+        
+        Requests go out together over the shared keep-alive session, so a
+        cycle takes about as long as its slowest target instead of the sum.
+        All targets share one deadline, so a stalled request fails the cycle's
+        fetch for that target on time instead of holding up the next cycle.
+        
+        Args:
+            targets (list): (symbol, expiry) tuples
+            max_workers (int, optional): Concurrent requests. If None, use HTTP_CLIENT["max_workers"].
+            deadline_seconds (float, optional): Time budget for the cycle. If None, use cycle_deadline_seconds().
+            
+        Returns:
+            dict: {(symbol, expiry): DataFrame or None}, in target order
+        """
+        targets = list(dict.fromkeys(targets))
+        if not targets:
+            return {}
+        
+        # Authenticate once up front rather than in every worker
+        if not self.token and not self.refresh_token():
+            logger.error("Cannot collect data: No valid authentication token")
+            return {target: None for target in targets}
+        
+        deadline = Deadline(deadline_seconds or cycle_deadline_seconds())
+        
+        def fetch(target):
+            started = time.perf_counter()
+            data = self.collect_data(*target, deadline=deadline)
+            return data, time.perf_counter() - started
+        
+        started = time.perf_counter()
+        workers = min(max_workers or HTTP_CLIENT["max_workers"], len(targets))
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="collect") as executor:
+            outcomes = dict(zip(targets, executor.map(fetch, targets)))
+        
+        wall_time = time.perf_counter() - started
+        sequential_time = sum(elapsed for _, elapsed in outcomes.values())
+        collected = sum(data is not None for data, _ in outcomes.values())
+        
+        self.last_cycle_stats = {
+            'targets': len(targets),
+            'collected': collected,
+            'wall_time': wall_time,
+            'sequential_time': sequential_time,
+            'fetch_times': {target: elapsed for target, (_, elapsed) in outcomes.items()},
+            'deadline_seconds': deadline.seconds,
+        }
+        logger.info(f"Collected {collected}/{len(targets)} targets in {wall_time:.2f}s "
+                    f"(sequential cost {sequential_time:.2f}s, {sequential_time / max(wall_time, 1e-9):.1f}x)")
+        
+        return {target: data for target, (data, _) in outcomes.items()}
+    
+    def snapshot_path(self, symbol, expiry, timestamp=None):
+        """
+        Get the file a snapshot is saved to.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            timestamp (datetime, optional): Snapshot time. If None, use current time.
+            
+        Returns:
+            str or None: File path or None if snapshot archiving is off
+        """
+        if self.sink is None:
+            return None
+        return self.sink.path(symbol, expiry, timestamp or datetime.now())
+    
+    def save_data(self, data, symbol, expiry, timestamp=None):
+        """
+        Archive the collected data through the configured snapshot sink.
         
         Args:
             data (pandas.DataFrame): Data to save
             symbol (str): Symbol name
             expiry (str): Expiry date
+            timestamp (datetime, optional): Snapshot time. If None, use current time.
             
         Returns:
             str or None: Path to saved file or None if failed
@@ -105,21 +213,11 @@ class OptionChainCollector:
             logger.error("No data to save")
             return None
         
+        if self.sink is None:
+            return None
+        
         try:
-            # Create directory structure
-            current_date = datetime.now().strftime(PATHS["date_format"])
-            current_time = datetime.now().strftime(PATHS["time_format"])
-            
-            # data/DD-MM-YYYY/SYMBOL/SYMBOL_EXPIRY_TIME.xlsx
-            dir_path = os.path.join(PATHS["data_folder"], current_date, symbol)
-            os.makedirs(dir_path, exist_ok=True)
-            
-            # Format filename
-            filename = f"{symbol}_{expiry}_{current_time}.xlsx"
-            filepath = os.path.join(dir_path, filename)
-            
-            # Save to Excel
-            data.to_excel(filepath, index=False)
+            filepath = self.sink.write(data, symbol, expiry, timestamp or datetime.now())
             logger.info(f"Data saved to {filepath}")
             
             return filepath
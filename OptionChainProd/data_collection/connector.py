@@ -1,36 +1,118 @@
 """
 Connector for linking data collection with database storage.
 """
-import os
-import pandas as pd
 import logging
 from datetime import datetime
+from data_collection.backfill import backfill
 from data_collection.collector import OptionChainCollector
+from data_collection.fetch import Deadline, cycle_deadline_seconds
 from database.db_manager import DatabaseManager
+from database.writer import get_background_writer
+from processing.downsampler import Downsampler
+from processing.snapshot_buffer import default_capacity, get_snapshot_buffer
+from utils.helpers import collection_interval_seconds
+from utils.single_flight import SingleFlight
+from config.settings import DATA_COLLECTION, PATHS
 
 logger = logging.getLogger(__name__)
 
+# Shared by every connector in the process, e.g. the background collection
+# thread and the dashboard in --mode both
+_collection_flights = SingleFlight()
+
+def freshness_seconds(interval_seconds=None):
+    """
+    How long a collected snapshot is reused instead of fetching its target again.
+    
+    DATA_COLLECTION["freshness_seconds"], capped at half the collection
+    interval so consecutive scheduled cycles never reuse each other's snapshot.
+    
+    Args:
+        interval_seconds (float, optional): Collection interval in use. If None,
+            use collection_interval_seconds().
+    
+    Returns:
+        float: Freshness window in seconds
+    """
+    interval = interval_seconds or collection_interval_seconds()
+    return min(DATA_COLLECTION.get("freshness_seconds", 0), interval / 2)
+
 class DataCollectionConnector:
     """
     Connects the data collection with database storage.
     """
     
-    def __init__(self):
-        """Initialize the connector."""
+    def __init__(self, persist_interval_seconds=None, db=None, interval_seconds=None):
+        """
+        Initialize the connector.
+        
+        Args:
+            persist_interval_seconds (int, optional): Save at most one snapshot per
+                bucket of this size to the database. If None, every snapshot is saved,
+                except in high-frequency mode (DATA_COLLECTION["interval_seconds"]),
+                where interval_minutes buckets are used.
+            db (DatabaseManager, optional): Database to store snapshots in.
+                If None, use the default database.
+            interval_seconds (float, optional): Collection interval in use, which
+                sets the freshness window and the cycle deadline (and sizes the
+                snapshot buffer when every snapshot is saved). If None, use
+                collection_interval_seconds().
+        """
         self.collector = OptionChainCollector()
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager()
+        self.interval_seconds = interval_seconds or collection_interval_seconds()
+        self.writer = get_background_writer(self.db)
+        self.flights = _collection_flights
+        
+        if persist_interval_seconds is None and DATA_COLLECTION.get("interval_seconds"):
+            persist_interval_seconds = DATA_COLLECTION["interval_minutes"] * 60
+        self.downsampler = Downsampler(persist_interval_seconds) if persist_interval_seconds else None
+        
+        # The buffer holds the snapshots that go to the database, one per bucket when downsampling
+        self.buffer = get_snapshot_buffer()
+        self.buffer.ensure_capacity(default_capacity(
+            self.downsampler.bucket_seconds if self.downsampler is not None else self.interval_seconds
+        ))
+        # Timestamp of the last collected snapshot per (symbol, expiry) if it
+        # went to the database, else None
+        self._persisted = {}
+        # Whether the last result per (symbol, expiry) came from another caller's fetch
+        self.last_shared = {}
     
-    def collect_and_store(self, symbol, expiry):
+    def collect_and_store(self, symbol, expiry, wait=False):
         """
         Collect data and store in both file system and database.
         
+        Only the fetch and parse run on the caller's thread. A snapshot that is
+        saved to the database is pushed to the in-memory buffer straight away,
+        while the database and file writes are handed to the background writer.
+        
+        A collection of the same target that is already running, in this or
+        any other connector, is joined instead of fetching again, and one that
+        finished less than freshness_seconds(self.interval_seconds) ago is
+        returned straight away.
+        
         Args:
             symbol (str): Symbol name
             expiry (str): Expiry date
+            wait (bool): Write to the database before returning, so success
+                reflects the commit rather than the enqueue
             
         Returns:
             tuple: (data, filepath, success)
         """
+        key = (symbol, expiry)
+        result, shared = self.flights.do(
+            key,
+            lambda: self._collect_and_store(symbol, expiry, wait),
+            fresh_for=freshness_seconds(self.interval_seconds),
+            keep=lambda result: result[2]
+        )
+        self._joined(key, shared, wait)
+        return result
+    
+    def _collect_and_store(self, symbol, expiry, wait):
+        """Fetch one target and store it; runs once per single-flight call."""
         # Refresh token if needed
         if not self.collector.token:
             success = self.collector.refresh_token()
@@ -39,14 +121,165 @@ class DataCollectionConnector:
                 return None, None, False
         
         # Collect data
-        data, filepath = self.collector.collect_and_save(symbol, expiry)
+        data = self.collector.collect_data(
+            symbol, expiry, deadline=Deadline(cycle_deadline_seconds(self.interval_seconds))
+        )
         
         if data is None:
             return None, None, False
         
-        # Store in database
+        return self._store(data, symbol, expiry, datetime.now(), wait)
+    
+    def collect_and_store_many(self, targets, wait=False):
+        """
+        Collect several symbol/expiry pairs concurrently and store each of them.
+        
+        All snapshots of a cycle share one timestamp, so they line up in the
+        database and in OI change intervals.
+        
+        Args:
+            targets (list): (symbol, expiry) tuples
+            wait (bool): Write to the database before returning
+            
+        Targets that are being or were just collected elsewhere (see
+        collect_and_store) share that result; the rest are fetched together.
+        
+        Returns:
+            dict: {(symbol, expiry): (data, filepath, success)}
+        """
+        fresh_for = freshness_seconds(self.interval_seconds)
+        calls = {}
+        leading = []
+        for target in dict.fromkeys(targets):
+            calls[target], leader = self.flights.begin(target, fresh_for)
+            if leader:
+                leading.append(target)
+        
+        try:
+            results = (
+                self.collector.collect_many(leading, deadline_seconds=cycle_deadline_seconds(self.interval_seconds))
+                if leading else {}
+            )
+            timestamp = datetime.now()
+        
+            for symbol, expiry in leading:
+                data = results.get((symbol, expiry))
+                result = (
+                    self._store(data, symbol, expiry, timestamp, wait) if data is not None
+                    else (None, None, False)
+                )
+                self.flights.finish((symbol, expiry), calls[(symbol, expiry)], result, keep=result[2])
+        except BaseException as e:
+            # Release callers waiting on targets this cycle did not get to
+            for target in leading:
+                if not calls[target].done.is_set():
+                    self.flights.finish(target, calls[target], error=e)
+            raise
+        
+        output = {}
+        for target, call in calls.items():
+            shared = target not in leading
+            try:
+                output[target] = call.wait()
+            except Exception as e:
+                logger.error(f"Shared collection of {target[0]} {target[1]} failed: {str(e)}")
+                output[target] = (None, None, False)
+            self._joined(target, shared, wait)
+        return output
+    
+    def collect_from_stream(self, stream, targets=None, wait=False):
+        """
+        Snapshot the live chains of a streaming collector and store each of them.
+        
+        The streaming counterpart of collect_and_store_many: nothing is
+        fetched, the snapshots are cut from the stream's live state and share
+        one timestamp.
+        
+        Args:
+            stream (StreamingCollector): Running streaming collector
+            targets (list, optional): (symbol, expiry) tuples. If None, all of the stream's targets.
+            wait (bool): Write to the database before returning
+            
+        Returns:
+            dict: {(symbol, expiry): (data, filepath, success)}
+        """
         timestamp = datetime.now()
-        success = self.db.save_option_data(data, symbol, expiry, timestamp)
+        results = {}
+        
+        for symbol, expiry in targets or stream.targets:
+            data, digest = stream.snapshot(symbol, expiry)
+            if data is None:
+                logger.error(f"No live option chain for {symbol} {expiry} from the stream")
+                results[(symbol, expiry)] = (None, None, False)
+                continue
+            
+            # The digest only changes with the state, so an idle chain is stored as unchanged
+            self.collector.last_changes[(symbol, expiry)] = self.collector.fingerprints.update(
+                symbol, expiry, digest, data
+            )
+            results[(symbol, expiry)] = self._store(data, symbol, expiry, timestamp, wait)
+        
+        return results
+    
+    def _joined(self, key, shared, wait):
+        """Bookkeeping after a collection, whether this connector ran it or not."""
+        self.last_shared[key] = shared
+        if not shared:
+            return
+        
+        # Another connector saved this snapshot: the next unchanged payload
+        # seen here must not be stored as a marker pointing at it
+        self._persisted[key] = None
+        if wait:
+            # The leader may have only queued its database write
+            self.writer.flush()
+    
+    def _store(self, data, symbol, expiry, timestamp, wait):
+        """
+        Buffer a collected snapshot and hand its writes to the background writer.
+        
+        Returns:
+            tuple: (data, filepath, success)
+        """
+        # Load recent history into the snapshot buffer on cold start
+        if not self.buffer.is_warm(symbol, expiry):
+            self.buffer.warm(self.db, symbol, expiry)
+        
+        # What changed since the previous payload (None if it was not fingerprinted).
+        # A marker row points at exactly the previous payload's snapshot, so it
+        # is only possible if that payload was saved too; if its write fails,
+        # the database stores this one in full.
+        changes = self.collector.last_changes.get((symbol, expiry))
+        previous = self._persisted.get((symbol, expiry))
+        source_timestamp = previous if changes is not None and changes.unchanged else None
+        
+        # Hand the file and database writes to the background writer;
+        # an identical payload is already in the archive
+        filepath = self.collector.snapshot_path(symbol, expiry, timestamp)
+        if not (changes is not None and changes.body_match):
+            self.writer.submit_task(self.collector.save_data, data, symbol, expiry, timestamp)
+        
+        # In high-frequency mode only the first snapshot of each interval_minutes
+        # bucket goes to the database; manual collections are always saved
+        if (self.downsampler is not None and not self.downsampler.should_persist(symbol, expiry, timestamp)
+                and not wait):
+            self._persisted[(symbol, expiry)] = None
+            return data, filepath, True
+        
+        # Feed the snapshot buffer so OI changes need no database reads. It only
+        # gets saved snapshots, so it gives the same OI changes as the database;
+        # the change mask is relative to the previous payload, so it only
+        # applies if that one was buffered too.
+        self.buffer.push(symbol, expiry, timestamp, data,
+                         changed=changes.changed if changes is not None and previous is not None else None)
+        
+        self._persisted[(symbol, expiry)] = timestamp
+        if wait:
+            # Keep commit order: earlier queued snapshots go first
+            self.writer.flush()
+            success = self.db.save_option_data(data, symbol, expiry, timestamp, source_timestamp=source_timestamp)
+        else:
+            success = self.writer.submit_snapshot(data, symbol, expiry, timestamp, source_timestamp=source_timestamp)
         
         return data, filepath, success
     
@@ -54,6 +287,9 @@ class DataCollectionConnector:
         """
         Process existing data files and store in database.
         
+        Imports today's archived snapshots for the symbol and expiry through
+        the backfill importer, so files imported before are skipped.
+        
         Args:
             data_dir (str): Base directory for data files
             symbol (str): Symbol name
@@ -62,54 +298,7 @@ class DataCollectionConnector:
         Returns:
             int: Number of files processed
         """
-        # Get current date
-        current_date = datetime.now().strftime('%d-%m-%Y')
-        
-        # Construct symbol directory
-        symbol_dir = os.path.join(data_dir, current_date, symbol)
-        
-        if not os.path.exists(symbol_dir):
-            logger.warning(f"Directory not found: {symbol_dir}")
-            return 0
-        
-        # Get all Excel files
-        files = [f for f in os.listdir(symbol_dir) if f.endswith('.xlsx')]
-        
-        if not files:
-            logger.warning(f"No Excel files found in {symbol_dir}")
-            return 0
-        
-        # Process each file
-        processed_count = 0
-        
-        for file in files:
-            filepath = os.path.join(symbol_dir, file)
-            
-            try:
-                # Extract timestamp from filename
-                # Format: SYMBOL_EXPIRY_TIME.xlsx
-                time_str = file.split('_')[-1].split('.')[0]
-                
-                # Convert to datetime
-                file_time = datetime.strptime(time_str, '%H%M')
-                
-                # Add current date
-                timestamp = datetime.combine(
-                    datetime.now().date(),
-                    file_time.time()
-                )
-                
-                # Read data
-                data = pd.read_excel(filepath)
-                
-                # Store in database
-                success = self.db.save_option_data(data, symbol, expiry, timestamp)
-                
-                if success:
-                    processed_count += 1
-                    logger.info(f"Processed file: {file}")
-                
-            except Exception as e:
-                logger.error(f"Error processing file {file}: {str(e)}")
+        current_date = datetime.now().strftime(PATHS["date_format"])
         
-        return processed_count
\ No newline at end of file
+        stats = backfill(data_dir, self.db, symbols=[symbol], expiries=[expiry], dates=[current_date])
+        return stats['imported']
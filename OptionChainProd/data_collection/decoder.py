@@ -0,0 +1,253 @@
+"""
+Decoding of option chain responses into a fixed, typed schema.
+
+The API payload has a known set of 35 columns, so instead of letting
+pd.read_csv infer dtypes for every response the decoder reads the raw
+response bytes with a declared dtype map, optionally projected to the
+columns that are actually used. A header or value that does not fit the
+schema raises SchemaDriftError instead of being coerced.
+"""
+import io
+import json
+import logging
+
+import pandas as pd
+
+from config.settings import DECODER
+from data_collection.fingerprint import FINGERPRINT_COLUMNS
+from data_collection.sinks import TEXT_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+try:
+    import orjson  # several times faster than the json module on large arrays
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Columns of the getOptionChainwithGreeks response, in API order
+PAYLOAD_COLUMNS = [
+    'symbol', 'expiry', 'calltimestamp', 'callVol', 'callltp', 'callPClose',
+    'callbid', 'callbidqty', 'callask', 'callaskqty', 'callOI', 'callpOI',
+    'cdelta', 'ctheta', 'cvega', 'cgamma', 'crho', 'civ', 'strike',
+    'pdelta', 'ptheta', 'pvega', 'pgamma', 'prho', 'piv',
+    'putbid', 'putbidqty', 'putask', 'putaskqty', 'putOI', 'putPOI',
+    'putLTP', 'putPClose', 'putVol', 'puttimestamp',
+]
+
+# Declared dtypes: numeric columns are float64 because the API sends a column
+# as int or float depending on whether any strike has a gap. Text columns use
+# pandas' str dtype, which keeps missing trade timestamps as NaN (pandas >= 3;
+# before 3, astype(str) turned them into the text 'nan' or 'None')
+PAYLOAD_SCHEMA = {column: str if column in TEXT_COLUMNS else 'float64' for column in PAYLOAD_COLUMNS}
+
+# What persistence and change detection need when snapshots are not archived
+STORED_COLUMNS = ['strike', *FINGERPRINT_COLUMNS]
+
+# Values read as missing, the same set for every engine
+NULL_VALUES = ['', 'NA', 'NaN', 'nan', 'null', 'None']
+
+class SchemaDriftError(ValueError):
+    """The response does not match PAYLOAD_SCHEMA (columns added, missing or retyped)."""
+
+def _check_header(columns, usecols, strict):
+    """
+    Compare a response's column names with the schema.
+    
+    Args:
+        columns (list): Column names in the response
+        usecols (list, optional): Columns the caller needs
+        strict (bool): Treat columns that are not in the schema as drift
+    
+    Raises:
+        SchemaDriftError: If needed columns are missing, or unknown columns
+            appear and strict is set
+    """
+    present = set(columns)
+    missing = [c for c in (usecols or PAYLOAD_COLUMNS) if c not in present]
+    unexpected = [c for c in columns if c not in PAYLOAD_SCHEMA]
+    
+    if missing:
+        raise SchemaDriftError(f"Response is missing columns: {missing}")
+    if unexpected:
+        if strict:
+            raise SchemaDriftError(f"Response has unexpected columns: {unexpected}")
+        logger.warning(f"Ignoring unexpected response columns: {unexpected}")
+    if len(present) != len(columns):
+        raise SchemaDriftError("Response has duplicate column names")
+
+def csv_header(body):
+    """
+    Column names from the first line of a CSV body.
+    
+    Args:
+        body (bytes): Response body
+    
+    Returns:
+        list: Column names
+    """
+    end = body.find(b'\n')
+    line = body if end < 0 else body[:end]
+    return [name.strip().strip('"') for name in line.decode('utf-8-sig').rstrip('\r').split(',')]
+
+class OptionChainDecoder:
+    """
+    Turns response bodies into DataFrames with PAYLOAD_SCHEMA dtypes.
+    """
+    
+    def __init__(self, usecols=None, engine=None, strict=None):
+        """
+        Initialize the decoder.
+        
+        Args:
+            usecols (list, optional): Only decode these columns (e.g.
+                STORED_COLUMNS). If None, decode the whole payload.
+            engine (str, optional): CSV parser, "pyarrow" or "pandas". If None,
+                use DECODER["engine"]; "auto" picks pyarrow when installed.
+            strict (bool, optional): Reject columns that are not in the schema.
+                If None, use DECODER["strict"].
+        """
+        engine = engine or DECODER["engine"]
+        if engine == 'auto':
+            engine = 'pyarrow' if pa_csv is not None else 'pandas'
+        elif engine == 'pyarrow' and pa_csv is None:
+            logger.warning("pyarrow is not installed, decoding CSV with pandas")
+            engine = 'pandas'
+        
+        self.engine = engine
+        self.strict = DECODER["strict"] if strict is None else strict
+        # Output columns keep API order whatever order usecols was given in
+        self.columns = [c for c in PAYLOAD_COLUMNS if usecols is None or c in usecols]
+        self.usecols = None if usecols is None else self.columns
+        self.dtypes = {column: PAYLOAD_SCHEMA[column] for column in self.columns}
+        
+        if pa_csv is not None:
+            self._arrow_types = {
+                column: pa.string() if dtype is str else pa.float64()
+                for column, dtype in self.dtypes.items()
+            }
+    
+    def decode(self, body, response_format='csv'):
+        """
+        Decode a response body.
+        
+        Args:
+            body (bytes): Raw response body (response.content)
+            response_format (str): "csv" or "json"
+        
+        Returns:
+            pandas.DataFrame: Typed option chain with the decoder's columns
+        
+        Raises:
+            SchemaDriftError: If the body does not match the schema
+        """
+        if response_format == 'json':
+            return self.decode_json(body)
+        return self.decode_csv(body)
+    
+    def decode_csv(self, body):
+        """
+        Decode a CSV body without first turning it into a str.
+        
+        Args:
+            body (bytes): Raw CSV body
+        
+        Returns:
+            pandas.DataFrame: Typed option chain
+        
+        Raises:
+            SchemaDriftError: If the header or a value does not match the schema
+        """
+        _check_header(csv_header(body), self.usecols, self.strict)
+        
+        try:
+            if self.engine == 'pyarrow':
+                # A chain is a few hundred rows: parser threads cost more than they save
+                table = pa_csv.read_csv(
+                    pa.BufferReader(body),
+                    read_options=pa_csv.ReadOptions(use_threads=False),
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types=self._arrow_types,
+                        include_columns=self.columns,
+                        null_values=NULL_VALUES,
+                        strings_can_be_null=True,
+                        quoted_strings_can_be_null=True
+                    )
+                )
+                # One block per column skips consolidating 35 columns into 2D blocks
+                return table.to_pandas(split_blocks=True)
+            
+            data = pd.read_csv(
+                io.BytesIO(body),
+                usecols=self.usecols,
+                dtype=self.dtypes,
+                na_values=NULL_VALUES,
+                keep_default_na=False
+            )
+            return data if self.usecols is None else data[self.columns]
+        except (ValueError, TypeError) as e:
+            # A declared float column holding text (pyarrow's ArrowInvalid is
+            # a ValueError too): inference would have made it an object column
+            raise SchemaDriftError(f"Response values do not match the schema: {e}") from e
+    
+    def decode_json(self, body):
+        """
+        Decode a JSON body.
+        
+        Accepts a list of row objects, or an object whose "Records" (or
+        "data") entry holds row objects or row arrays in API column order.
+        
+        Args:
+            body (bytes): Raw JSON body
+        
+        Returns:
+            pandas.DataFrame: Typed option chain
+        
+        Raises:
+            SchemaDriftError: If the rows do not match the schema
+        """
+        return self.decode_records(orjson.loads(body) if orjson is not None else json.loads(body))
+        
+    def decode_records(self, payload):
+        """
+        Build a typed option chain from already parsed JSON (see decode_json).
+        
+        Args:
+            payload (list or dict): Parsed JSON payload
+        
+        Returns:
+            pandas.DataFrame: Typed option chain
+        
+        Raises:
+            SchemaDriftError: If the rows do not match the schema
+        """
+        rows = payload
+        columns = None
+        if isinstance(payload, dict):
+            rows = payload.get('Records', payload.get('data'))
+            columns = payload.get('columns')
+        if not isinstance(rows, list):
+            raise SchemaDriftError("JSON response has no list of records")
+        
+        if rows and isinstance(rows[0], dict):
+            columns = list(rows[0])
+            frame = pd.DataFrame.from_records(rows, columns=columns)
+        else:
+            columns = columns or PAYLOAD_COLUMNS
+            if rows and len(rows[0]) != len(columns):
+                raise SchemaDriftError(f"JSON rows have {len(rows[0])} values, expected {len(columns)}")
+            frame = pd.DataFrame(rows, columns=columns)
+        
+        _check_header(columns, self.usecols, self.strict)
+        
+        frame = frame[self.columns]
+        try:
+            return frame.astype(self.dtypes)
+        except (ValueError, TypeError) as e:
+            raise SchemaDriftError(f"Response values do not match the schema: {e}") from e
@@ -0,0 +1,352 @@
+"""
+Deadline-bounded HTTP fetches for TrueData API requests.
+"""
+import os
+import time
+import random
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+
+from config.settings import HTTP_CLIENT, RATE_LIMIT
+from data_collection.http_client import get_http_session
+from utils.helpers import collection_interval_seconds
+from utils.metrics import LatencyHistogram, LatencyRecorder, format_latency
+from utils.rate_limit import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The request did not complete before its deadline."""
+
+class RateLimitTimeout(requests.exceptions.RequestException):
+    """The rate limiter did not allow the request in time."""
+
+def cycle_deadline_seconds(interval_seconds=None):
+    """
+    Time budget for one collection cycle.
+    
+    Args:
+        interval_seconds (float, optional): Collection interval in use. If None,
+            use collection_interval_seconds().
+    
+    Returns:
+        float: HTTP_CLIENT["cycle_deadline_seconds"], capped at 80% of the
+            collection interval so a cycle ends before the next one is due
+    """
+    return min(HTTP_CLIENT["cycle_deadline_seconds"], 0.8 * (interval_seconds or collection_interval_seconds()))
+
+class Deadline:
+    """
+    A point in time by which an operation must finish.
+    """
+    
+    def __init__(self, seconds):
+        """
+        Start the clock.
+        
+        Args:
+            seconds (float): Time budget from now
+        """
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+    
+    def remaining(self):
+        """Seconds left, never negative."""
+        return max(0.0, self.expires - time.monotonic())
+    
+    @property
+    def expired(self):
+        return self.remaining() == 0.0
+
+def _retryable(response):
+    """Whether a response is worth another attempt."""
+    return response.status_code == 429 or response.status_code >= 500
+
+class Fetcher:
+    """
+    GETs with per-attempt timeouts, capped jittered retries and hedging, all within a deadline.
+    
+    Every attempt uses connect/read timeouts no longer than the time left.
+    Timeouts, connection errors, 429 and 5xx responses are retried after a
+    full-jitter exponential backoff. If an attempt is slower than the recent
+    p95, one hedged copy is sent (when the rate limiter has a spare token)
+    and whichever answers first wins. Attempts run on a small thread pool,
+    so the caller gets an answer or DeadlineExceeded on time even if a
+    connection stalls mid-response.
+    """
+    
+    def __init__(self, session=None, limiter=None, max_attempts=None, hedge=None):
+        """
+        Initialize the fetcher. Unset options use HTTP_CLIENT from settings.
+        
+        Args:
+            session (requests.Session, optional): HTTP session. If None, use the shared session.
+            limiter (RateLimiter, optional): Rate limiter. If None, use the shared limiter.
+            max_attempts (int, optional): Attempts per request, including the first
+            hedge (bool, optional): Whether to send hedged requests
+        """
+        self.session = session or get_http_session()
+        self.limiter = limiter or get_rate_limiter()
+        self.max_attempts = max_attempts or HTTP_CLIENT["max_attempts"]
+        self.hedge = HTTP_CLIENT["hedge"] if hedge is None else hedge
+        self.connect_timeout = HTTP_CLIENT["connect_timeout"]
+        self.read_timeout = HTTP_CLIENT["read_timeout"]
+        
+        buckets = HTTP_CLIENT["latency_buckets"]
+        self.request_latency = LatencyHistogram(buckets)  # Whole fetch, including retries
+        self.attempt_latency = LatencyHistogram(buckets)  # Each HTTP attempt
+        self.recent = LatencyRecorder(window=200)  # Successful attempts, for the hedge delay
+        self._counters = {
+            'requests': 0, 'attempts': 0, 'retries': 0, 'timeouts': 0,
+            'hedges': 0, 'hedge_wins': 0, 'deadline_exceeded': 0, 'failed': 0,
+        }
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=HTTP_CLIENT["pool_maxsize"], thread_name_prefix="fetch")
+    
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+    
+    def hedge_delay(self):
+        """
+        How long to wait for an attempt before hedging it.
+        
+        Returns:
+            float or None: Seconds, or None if hedging is off or there is not enough history
+        """
+        if not self.hedge:
+            return None
+        summary = self.recent.snapshot()
+        if summary['count'] < HTTP_CLIENT["hedge_min_samples"]:
+            return None
+        return max(HTTP_CLIENT["hedge_min_seconds"], summary['p95'])
+    
+    def backoff(self, attempt):
+        """
+        Full-jitter exponential backoff before a retry.
+        
+        Args:
+            attempt (int): Number of the attempt that just failed (1-based)
+        
+        Returns:
+            float: Seconds to sleep
+        """
+        ceiling = min(HTTP_CLIENT["retry_backoff_cap"], HTTP_CLIENT["retry_backoff"] * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+    
+    def _send(self, url, headers, params, deadline):
+        """Send one HTTP attempt with timeouts bounded by the deadline."""
+        remaining = deadline.remaining()
+        if remaining == 0:
+            raise DeadlineExceeded(f"Deadline of {deadline.seconds:.1f}s exceeded before sending")
+        
+        timeout = (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+        self._count('attempts')
+        started = time.perf_counter()
+        
+        try:
+            response = self.session.get(url, headers=headers, params=params, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            elapsed = time.perf_counter() - started
+            self.attempt_latency.observe(elapsed)
+            self.limiter.record(elapsed, False)
+            if isinstance(e, requests.exceptions.Timeout):
+                self._count('timeouts')
+            raise
+        
+        elapsed = time.perf_counter() - started
+        self.attempt_latency.observe(elapsed)
+        self.limiter.record(elapsed, not _retryable(response))
+        if response.ok:
+            self.recent.record(elapsed)
+        return response
+    
+    def _attempt(self, url, headers, params, deadline):
+        """
+        Run one attempt, hedged if it is slower than usual.
+        
+        Returns:
+            requests.Response: First response to arrive
+        
+        Raises:
+            requests.exceptions.RequestException: If every copy failed
+            DeadlineExceeded: If no copy answered before the deadline
+        """
+        primary = self._executor.submit(self._send, url, headers, params, deadline)
+        pending = {primary}
+        
+        delay = self.hedge_delay()
+        if delay is not None and delay < deadline.remaining():
+            done, _ = wait(pending, timeout=delay)
+            # Hedge only with a spare token, never by waiting for one
+            if not done and self.limiter.acquire(timeout=0):
+                self._count('hedges')
+                logger.debug(f"Hedging request after {delay:.2f}s")
+                pending.add(self._executor.submit(self._send, url, headers, params, deadline))
+        
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                # Stalled copies finish in the background, bounded by their own timeouts
+                raise DeadlineExceeded(f"No response within the {deadline.seconds:.1f}s deadline")
+            
+            for future in done:
+                try:
+                    response = future.result()
+                except requests.exceptions.RequestException as e:
+                    error = e
+                    continue
+                if future is not primary:
+                    self._count('hedge_wins')
+                return response
+        
+        raise error
+    
+    def get(self, url, headers=None, params=None, deadline=None):
+        """
+        GET a URL within a deadline.
+        
+        4xx responses other than 429 are returned as they are, so the caller
+        can handle them (e.g. a 401 with a new token).
+        
+        Args:
+            url (str): URL to fetch
+            headers (dict, optional): Request headers
+            params (dict, optional): Query parameters
+            deadline (Deadline, optional): Overall deadline. If None, use cycle_deadline_seconds().
+        
+        Returns:
+            requests.Response: Final response
+        
+        Raises:
+            requests.exceptions.RequestException: On failure after all attempts,
+                including DeadlineExceeded and RateLimitTimeout
+        """
+        deadline = deadline or Deadline(cycle_deadline_seconds())
+        self._count('requests')
+        started = time.perf_counter()
+        
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                # Stay within the vendor's rate limit (slowed down while the API is degraded)
+                if not self.limiter.acquire(timeout=min(RATE_LIMIT["acquire_timeout"], deadline.remaining())):
+                    raise RateLimitTimeout("Rate limiter timed out")
+                
+                try:
+                    response = self._attempt(url, headers, params, deadline)
+                    if not _retryable(response) or attempt == self.max_attempts:
+                        return response
+                    reason = f"HTTP {response.status_code}"
+                except DeadlineExceeded:
+                    raise
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    if attempt == self.max_attempts:
+                        raise
+                    reason = type(e).__name__
+                
+                pause = self.backoff(attempt)
+                if pause >= deadline.remaining():
+                    raise DeadlineExceeded(f"No time left to retry after {reason}")
+                
+                logger.warning(f"Attempt {attempt}/{self.max_attempts} failed ({reason}), retrying in {pause:.2f}s")
+                self._count('retries')
+                time.sleep(pause)
+        
+        except DeadlineExceeded:
+            self._count('deadline_exceeded')
+            self._count('failed')
+            raise
+        except requests.exceptions.RequestException:
+            self._count('failed')
+            raise
+        finally:
+            self.request_latency.observe(time.perf_counter() - started)
+    
+    def metrics(self):
+        """
+        Current fetch metrics.
+        
+        Returns:
+            dict: counters, request/attempt latency histograms and the hedge delay
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            'hedge_delay': self.hedge_delay(),
+            'recent_latency': self.recent.snapshot(),
+            'request_latency': self.request_latency.snapshot(),
+            'attempt_latency': self.attempt_latency.snapshot(),
+        }
+    
+    def log_metrics(self):
+        """Log a one-line metrics summary."""
+        m = self.metrics()
+        logger.info(f"Fetch: {m['requests']} requests, {m['attempts']} attempts, {m['retries']} retries, "
+                    f"{m['timeouts']} timeouts, {m['hedges']} hedges ({m['hedge_wins']} won), "
+                    f"{m['deadline_exceeded']} past deadline, latency {format_latency(m['recent_latency'])}")
+    
+    def to_prometheus(self):
+        """
+        Render the latency histograms and counters in the Prometheus text format.
+        
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        
+        text = self.request_latency.to_prometheus(
+            'truedata_request_duration_seconds', "Option chain fetch time including retries and hedges")
+        text += self.attempt_latency.to_prometheus(
+            'truedata_attempt_duration_seconds', "Time of each HTTP attempt")
+        for name, value in counters.items():
+            text += f"# TYPE truedata_fetch_{name}_total counter\ntruedata_fetch_{name}_total {value}\n"
+        return text
+    
+    def export_metrics(self, path=None):
+        """
+        Write the metrics to a file for a node_exporter-style textfile collector.
+        
+        Args:
+            path (str, optional): Output file. If None, use HTTP_CLIENT["metrics_file"].
+        
+        Returns:
+            bool: True if written
+        """
+        path = path or HTTP_CLIENT["metrics_file"]
+        if not path:
+            return False
+        
+        try:
+            # Write and rename, so scrapers never read a partial file
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.error(f"Error writing fetch metrics to {path}: {str(e)}")
+            return False
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+def get_fetcher():
+    """
+    Get the process-wide fetcher.
+    
+    Returns:
+        Fetcher: Shared fetcher over the shared session and rate limiter
+    """
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = Fetcher()
+        return _fetcher
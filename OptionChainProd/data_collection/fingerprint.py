@@ -0,0 +1,114 @@
+"""
+Payload fingerprinting to detect unchanged option chain snapshots.
+"""
+import hashlib
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Per-strike values whose change matters downstream
+FINGERPRINT_COLUMNS = ['callOI', 'callpOI', 'putOI', 'putPOI', 'callltp', 'putLTP']
+
+# unchanged: no strike moved; changed: bool array aligned with the frame rows
+ChangeSet = namedtuple('ChangeSet', ['unchanged', 'changed', 'changed_count', 'body_match'])
+
+def body_digest(body):
+    """
+    Hash a raw response body.
+    
+    Args:
+        body (bytes or str): Response body
+    
+    Returns:
+        bytes: 16-byte BLAKE2b digest
+    """
+    if isinstance(body, str):
+        body = body.encode()
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+def strike_hashes(data):
+    """
+    Hash each strike's OI and LTP values.
+    
+    Args:
+        data (pandas.DataFrame): Option chain with a strike column
+    
+    Returns:
+        pandas.Series: uint64 hashes indexed by strike
+    """
+    columns = [c for c in FINGERPRINT_COLUMNS if c in data.columns]
+    values = data[columns].apply(pd.to_numeric, errors='coerce').astype('float64')
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    strikes = pd.to_numeric(data['strike'], errors='coerce').to_numpy(dtype='float64')
+    return pd.Series(hashes, index=strikes)
+
+class SnapshotFingerprinter:
+    """
+    Remembers the last payload per (symbol, expiry) and reports what changed.
+    
+    An identical response body is recognised before parsing, so its CSV is
+    not decoded again. Otherwise per-strike OI/LTP hashes give a change mask.
+    """
+    
+    def __init__(self):
+        """Initialize with no history."""
+        self._last = {}
+        self._lock = threading.Lock()
+    
+    def cached_frame(self, symbol, expiry, digest):
+        """
+        Get the frame parsed from an identical earlier body.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            digest (bytes): body_digest of the new response
+        
+        Returns:
+            pandas.DataFrame or None: Previous frame if the body is unchanged
+        """
+        with self._lock:
+            last = self._last.get((symbol, expiry))
+        if last is not None and last['digest'] == digest:
+            return last['data']
+        return None
+    
+    def update(self, symbol, expiry, digest, data):
+        """
+        Record a new payload and compare it with the previous one.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            digest (bytes): body_digest of the response
+            data (pandas.DataFrame): Parsed option chain
+        
+        Returns:
+            ChangeSet: What changed since the previous payload
+        """
+        key = (symbol, expiry)
+        with self._lock:
+            last = self._last.get(key)
+        
+        if last is not None and last['digest'] == digest:
+            return ChangeSet(True, np.zeros(len(data), dtype=bool), 0, True)
+        
+        hashes = strike_hashes(data)
+        
+        if last is None:
+            changed = np.ones(len(data), dtype=bool)
+        else:
+            previous = last['hashes']
+            previous = previous[~previous.index.duplicated()]
+            positions = previous.index.get_indexer(hashes.index)
+            changed = (positions == -1) | (previous.to_numpy()[positions] != hashes.to_numpy())
+        
+        same_strikes = last is not None and len(last['hashes']) == len(hashes)
+        unchanged = same_strikes and not changed.any()
+        
+        with self._lock:
+            self._last[key] = {'digest': digest, 'hashes': hashes, 'data': data}
+        
+        return ChangeSet(unchanged, changed, int(changed.sum()), False)
@@ -0,0 +1,33 @@
+"""
+Shared HTTP session for TrueData API requests.
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import HTTP_CLIENT
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_http_session():
+    """
+    Get the process-wide pooled HTTP session.
+    
+    Connections are kept alive between requests and collection cycles, so
+    only the first request to a host pays the TCP and TLS handshake.
+    requests.Session is safe to share for plain GETs and POSTs across threads.
+    
+    Returns:
+        requests.Session: Shared session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_CLIENT["pool_connections"],
+                pool_maxsize=HTTP_CLIENT["pool_maxsize"]
+            )
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
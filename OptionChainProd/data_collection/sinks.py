@@ -0,0 +1,296 @@
+"""
+Snapshot sinks that archive raw option chain payloads to disk.
+"""
+import os
+import atexit
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config.settings import PATHS, STORAGE
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Column added to every archived row: when the snapshot was collected (IST wall-clock)
+SNAPSHOT_TIME_COLUMN = 'snapshot_time'
+
+# Payload columns that are always text, even when a snapshot has them all empty
+TEXT_COLUMNS = {'symbol', 'expiry', 'calltimestamp', 'puttimestamp'}
+
+class ExcelSnapshotSink:
+    """
+    Writes each snapshot to its own Excel file.
+    
+    Layout: data/DD-MM-YYYY/SYMBOL/SYMBOL_EXPIRY_HHMM.xlsx. Slow and large,
+    kept as an export mode for users who open snapshots in a spreadsheet.
+    """
+    
+    extension = '.xlsx'
+    
+    def __init__(self, base_dir=None):
+        """
+        Initialize the sink.
+        
+        Args:
+            base_dir (str, optional): Root data folder. If None, use PATHS["data_folder"].
+        """
+        self.base_dir = base_dir or PATHS["data_folder"]
+    
+    def path(self, symbol, expiry, timestamp):
+        """Get the file a snapshot is written to."""
+        dir_path = os.path.join(self.base_dir, timestamp.strftime(PATHS["date_format"]), symbol)
+        filename = f"{symbol}_{expiry}_{timestamp.strftime(PATHS['time_format'])}{self.extension}"
+        return os.path.join(dir_path, filename)
+    
+    def write(self, data, symbol, expiry, timestamp):
+        """
+        Write one snapshot.
+        
+        Args:
+            data (pandas.DataFrame): Option chain payload
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            timestamp (datetime): Collection time
+        
+        Returns:
+            str: Path written to
+        """
+        filepath = self.path(symbol, expiry, timestamp)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        data.to_excel(filepath, index=False)
+        return filepath
+    
+    def close(self):
+        """Nothing to close: every snapshot is its own file."""
+
+class ParquetSnapshotSink:
+    """
+    Appends snapshots to one zstd-compressed Parquet file per day and (symbol, expiry).
+    
+    Layout: data/DD-MM-YYYY/SYMBOL/SYMBOL_EXPIRY.parquet, with one row group
+    per snapshot and a snapshot_time column, so a single snapshot or a few
+    columns can be read without decoding the rest of the day.
+    
+    A Parquet file is only readable once its footer is written, so the open
+    day is written to a .partial file and moved into place when it is closed
+    (on day rollover, close() or interpreter exit). If the day file already
+    exists, for example after a restart, its row groups are copied into the
+    new writer first.
+    """
+    
+    extension = '.parquet'
+    
+    def __init__(self, base_dir=None, compression=None):
+        """
+        Initialize the sink.
+        
+        Args:
+            base_dir (str, optional): Root data folder. If None, use PATHS["data_folder"].
+            compression (str, optional): Parquet codec. If None, use STORAGE["compression"].
+        """
+        if pq is None:
+            raise ImportError("pyarrow is required for the Parquet snapshot sink")
+        
+        self.base_dir = base_dir or PATHS["data_folder"]
+        self.compression = compression or STORAGE["compression"]
+        self._writers = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+    
+    def path(self, symbol, expiry, timestamp):
+        """Get the day file a snapshot is appended to."""
+        dir_path = os.path.join(self.base_dir, timestamp.strftime(PATHS["date_format"]), symbol)
+        return os.path.join(dir_path, f"{symbol}_{expiry}{self.extension}")
+    
+    @staticmethod
+    def _table(data, timestamp):
+        """
+        Convert a payload to an Arrow table with a stable schema.
+        
+        Numeric columns are stored as float64 (the API sends a column as int or
+        float depending on gaps), TEXT_COLUMNS and anything else as strings.
+        """
+        arrays = {SNAPSHOT_TIME_COLUMN: pa.array(
+            np.full(len(data), pd.Timestamp(timestamp).tz_localize(None).floor('s').to_datetime64()),
+            type=pa.timestamp('s')
+        )}
+        
+        for column in data.columns:
+            values = data[column]
+            if (column not in TEXT_COLUMNS and pd.api.types.is_numeric_dtype(values)
+                    and not pd.api.types.is_bool_dtype(values)):
+                arrays[str(column)] = pa.array(values.to_numpy(dtype='float64'), type=pa.float64())
+            else:
+                arrays[str(column)] = pa.array(
+                    [None if pd.isna(v) else str(v) for v in values], type=pa.string()
+                )
+        
+        return pa.table(arrays)
+    
+    @staticmethod
+    def _conform(table, schema):
+        """Align a table to an existing file schema, filling or dropping drifted columns."""
+        if table.schema.equals(schema):
+            return table
+        
+        extra = set(table.column_names) - set(schema.names)
+        if extra:
+            logger.warning(f"Dropping columns not in the snapshot file schema: {sorted(extra)}")
+        
+        columns = [
+            table.column(field.name).cast(field.type) if field.name in table.column_names
+            else pa.nulls(table.num_rows, type=field.type)
+            for field in schema
+        ]
+        return pa.Table.from_arrays(columns, schema=schema)
+    
+    def _open(self, filepath, schema):
+        """Open a writer for a day file, carrying over row groups already written."""
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        partial_path = filepath + '.partial'
+        existing = None
+        
+        if os.path.exists(filepath):
+            existing = pq.ParquetFile(filepath)
+            schema = existing.schema_arrow
+        
+        # Row groups hold one small snapshot each, so per-column metadata is a large
+        # share of the file: keep statistics only for the columns reads filter on
+        # and dictionary-encode only the repetitive text columns.
+        writer = pq.ParquetWriter(
+            partial_path, schema,
+            compression=self.compression,
+            write_statistics=[SNAPSHOT_TIME_COLUMN, 'strike'],
+            use_dictionary=[name for name in schema.names if name in TEXT_COLUMNS]
+        )
+        
+        if existing is not None:
+            for i in range(existing.num_row_groups):
+                writer.write_table(existing.read_row_group(i))
+            logger.info(f"Reopened {filepath} with {existing.num_row_groups} snapshots")
+        
+        return writer
+    
+    def write(self, data, symbol, expiry, timestamp):
+        """
+        Append one snapshot as a row group.
+        
+        Args:
+            data (pandas.DataFrame): Option chain payload
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            timestamp (datetime): Collection time
+        
+        Returns:
+            str: Day file the snapshot is appended to
+        """
+        filepath = self.path(symbol, expiry, timestamp)
+        table = self._table(data, timestamp)
+        
+        with self._lock:
+            current = self._writers.get((symbol, expiry))
+            
+            # Day rollover: finish yesterday's file
+            if current is not None and current[0] != filepath:
+                self._finish(*current)
+                current = None
+            
+            if current is None:
+                current = (filepath, self._open(filepath, table.schema))
+                self._writers[(symbol, expiry)] = current
+            
+            writer = current[1]
+            writer.write_table(self._conform(table, writer.schema), row_group_size=max(len(table), 1))
+        
+        return filepath
+    
+    @staticmethod
+    def _finish(filepath, writer):
+        """Close a writer and move its file into place."""
+        writer.close()
+        os.replace(filepath + '.partial', filepath)
+        logger.info(f"Snapshot file closed: {filepath}")
+    
+    def close(self):
+        """Close all open day files."""
+        with self._lock:
+            for filepath, writer in self._writers.values():
+                try:
+                    self._finish(filepath, writer)
+                except Exception as e:
+                    logger.error(f"Error closing snapshot file {filepath}: {str(e)}")
+            self._writers.clear()
+    
+    def read(self, symbol, expiry, date, columns=None, start=None, end=None):
+        """
+        Read archived snapshots for a day.
+        
+        Only the requested columns are decoded, and row groups outside the
+        time range are skipped using their statistics.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            date (datetime): Day to read
+            columns (list, optional): Payload columns to read. If None, read all.
+            start (datetime, optional): Earliest snapshot time (inclusive)
+            end (datetime, optional): Latest snapshot time (inclusive)
+        
+        Returns:
+            pandas.DataFrame: Snapshot rows with a snapshot_time column
+        """
+        filepath = self.path(symbol, expiry, date)
+        if not os.path.exists(filepath):
+            return pd.DataFrame()
+        
+        if columns is not None:
+            columns = [SNAPSHOT_TIME_COLUMN] + [c for c in columns if c != SNAPSHOT_TIME_COLUMN]
+        
+        filters = []
+        if start is not None:
+            filters.append((SNAPSHOT_TIME_COLUMN, '>=', pd.Timestamp(start).tz_localize(None)))
+        if end is not None:
+            filters.append((SNAPSHOT_TIME_COLUMN, '<=', pd.Timestamp(end).tz_localize(None)))
+        
+        table = pq.read_table(filepath, columns=columns, filters=filters or None)
+        return table.to_pandas()
+
+SINKS = {
+    'parquet': ParquetSnapshotSink,
+    'excel': ExcelSnapshotSink,
+}
+
+_shared_sink = None
+_shared_sink_lock = threading.Lock()
+
+def get_snapshot_sink():
+    """
+    Get the process-wide snapshot sink configured by STORAGE["snapshot_format"].
+    
+    Falls back to Excel if pyarrow is not installed.
+    
+    Returns:
+        ParquetSnapshotSink, ExcelSnapshotSink or None: None if archiving is off
+    """
+    global _shared_sink
+    with _shared_sink_lock:
+        if _shared_sink is None:
+            snapshot_format = STORAGE["snapshot_format"]
+            
+            if snapshot_format == 'none':
+                return None
+            if snapshot_format == 'parquet' and pq is None:
+                logger.warning("pyarrow is not installed, saving snapshots as Excel")
+                snapshot_format = 'excel'
+            
+            _shared_sink = SINKS[snapshot_format]()
+        return _shared_sink
@@ -0,0 +1,437 @@
+"""
+Streaming ingestion of option chains over a WebSocket feed.
+
+Instead of polling the CSV snapshot endpoint, a StreamingCollector keeps one
+connection open, subscribes to its targets and keeps a LiveChainState per
+target current from the feed's messages. Snapshots are cut from that state
+on the collection schedule (DataCollectionConnector.collect_from_stream) and
+stored through the same path as polled ones.
+
+Feed protocol (JSON text frames):
+
+    client -> feed  {"action": "subscribe", "symbol": ..., "expiry": ...}
+    feed -> client  {"type": "chain", "symbol", "expiry", "seq", "columns": [...], "data": [[...], ...]}
+                    {"type": "update", "symbol", "expiry", "seq", "strike": 22000, "fields": {"callOI": ..., ...}}
+                    {"type": "heartbeat"} | {"type": "error", "message": ...}
+
+"chain" is the full payload (PAYLOAD_COLUMNS) sent on subscribe; "update"
+carries the payload columns of one strike that changed. seq increases by one
+per message of a target, so a gap means messages were lost and the target is
+resubscribed to get a fresh chain.
+"""
+import json
+import time
+import random
+import logging
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config.settings import STREAMING
+from data_collection.auth import get_token_manager
+from data_collection.decoder import OptionChainDecoder, SchemaDriftError, PAYLOAD_COLUMNS, PAYLOAD_SCHEMA
+from data_collection.fingerprint import body_digest
+from data_collection.sinks import TEXT_COLUMNS
+
+try:
+    from websockets.exceptions import ConnectionClosed, InvalidHandshake, InvalidStatus
+    from websockets.sync.client import connect
+except ImportError:
+    connect = None
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_COLUMNS = [c for c in PAYLOAD_COLUMNS if c not in TEXT_COLUMNS]
+NUMERIC_INDEX = {column: i for i, column in enumerate(NUMERIC_COLUMNS)}
+
+# Text columns that vary by strike (symbol and expiry are the same for all)
+STRIKE_TEXT_COLUMNS = ['calltimestamp', 'puttimestamp']
+
+# Process-wide, so a snapshot digest never repeats across states or restarts of the stream
+_generations = itertools.count(1)
+
+class LiveChainState:
+    """
+    Latest per-strike values of one option chain, updated in place from feed messages.
+    """
+    
+    def __init__(self, symbol, expiry):
+        """
+        Initialize an empty state (no snapshot until the first full chain).
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+        """
+        self.symbol = symbol
+        self.expiry = expiry
+        self.seq = None
+        self.generation = None
+        self.version = 0
+        self.live = False
+        self.lost_at = None
+        self.updated_at = None
+        self._rows = {}
+        self._strikes = np.empty(0)
+        self._values = np.empty((0, len(NUMERIC_COLUMNS)))
+        self._text = {column: np.empty(0, dtype=object) for column in STRIKE_TEXT_COLUMNS}
+        self._snapshot = None
+        self._lock = threading.Lock()
+    
+    def load(self, data, seq):
+        """
+        Replace the state with a full chain.
+        
+        Args:
+            data (pandas.DataFrame): Chain with PAYLOAD_COLUMNS
+            seq (int): Sequence number of the chain message
+        """
+        strikes = data['strike'].to_numpy(dtype='float64')
+        values = data[NUMERIC_COLUMNS].to_numpy(dtype='float64', na_value=np.nan, copy=True)
+        text = {
+            column: np.array([None if pd.isna(v) else v for v in data[column]], dtype=object)
+            for column in STRIKE_TEXT_COLUMNS
+        }
+        
+        with self._lock:
+            self._strikes = strikes
+            self._values = values
+            self._text = text
+            self._rows = {strike: i for i, strike in enumerate(strikes.tolist())}
+            self.seq = seq
+            self.generation = next(_generations)
+            self.version += 1
+            self.live = True
+            self.lost_at = None
+            self.updated_at = time.monotonic()
+    
+    def apply(self, strike, fields, seq):
+        """
+        Apply one strike's update.
+        
+        Args:
+            strike (float): Strike price; an unknown strike is added
+            fields (dict): Payload column -> new value (None for missing)
+            seq (int): Sequence number of the update message
+        
+        Returns:
+            bool: False if the update does not follow the last message
+                (messages were lost and a full chain is needed)
+        
+        Raises:
+            SchemaDriftError: If the strike is not a number, fields is not an
+                object, a field is not a per-strike payload column or a
+                numeric field is not a number
+        """
+        try:
+            strike = float(strike)
+        except (TypeError, ValueError):
+            raise SchemaDriftError(f"Update strike is not numeric: {strike!r}")
+        if not np.isfinite(strike):
+            raise SchemaDriftError(f"Update strike is not finite: {strike!r}")
+        if not isinstance(fields, dict):
+            raise SchemaDriftError(f"Update fields are not an object: {fields!r}")
+        
+        numeric, text = [], []
+        for name, value in fields.items():
+            if name in NUMERIC_INDEX:
+                try:
+                    numeric.append((NUMERIC_INDEX[name], np.nan if value is None else float(value)))
+                except (TypeError, ValueError):
+                    raise SchemaDriftError(f"Update field {name} is not numeric: {value!r}")
+            elif name in self._text:
+                text.append((name, value))
+            else:
+                raise SchemaDriftError(f"Update has an unknown field: {name}")
+        
+        with self._lock:
+            if self.seq is None or seq != self.seq + 1:
+                return False
+            
+            row = self._rows.get(strike)
+            if row is None:
+                row = self._add_strike(strike)
+            for column, value in numeric:
+                self._values[row, column] = value
+            for name, value in text:
+                self._text[name][row] = value
+            
+            self.seq = seq
+            self.version += 1
+            self.updated_at = time.monotonic()
+            return True
+    
+    def _add_strike(self, strike):
+        """Append an empty row for a strike listed after the chain was loaded."""
+        row = len(self._strikes)
+        self._strikes = np.append(self._strikes, strike)
+        self._values = np.vstack([self._values, np.full((1, len(NUMERIC_COLUMNS)), np.nan)])
+        self._values[row, NUMERIC_INDEX['strike']] = strike
+        for name in self._text:
+            self._text[name] = np.append(self._text[name], None)
+        self._rows[strike] = row
+        return row
+    
+    def mark_lost(self):
+        """Record that the feed stopped delivering updates for this state."""
+        with self._lock:
+            if self.live:
+                self.live = False
+                self.lost_at = time.monotonic()
+            self.seq = None
+    
+    def is_fresh(self, stale_seconds=None):
+        """
+        Whether the state may be snapshotted.
+        
+        Args:
+            stale_seconds (float, optional): How long a state stays usable after
+                the feed dropped. If None, use STREAMING["stale_seconds"].
+        
+        Returns:
+            bool: True if a chain was loaded and the feed is live or dropped recently
+        """
+        stale_seconds = STREAMING["stale_seconds"] if stale_seconds is None else stale_seconds
+        with self._lock:
+            if self.generation is None:
+                return False
+            return self.live or time.monotonic() - self.lost_at < stale_seconds
+    
+    def snapshot(self):
+        """
+        Cut a snapshot of the current chain.
+        
+        Returns:
+            tuple: (DataFrame with PAYLOAD_COLUMNS and PAYLOAD_SCHEMA dtypes sorted
+                by strike, digest for SnapshotFingerprinter), or (None, None)
+                before the first chain. Unchanged states return the same frame.
+        """
+        with self._lock:
+            if self.generation is None:
+                return None, None
+            
+            digest = body_digest(f"{self.generation}:{self.version}")
+            if self._snapshot is not None and self._snapshot[0] == digest:
+                return self._snapshot[1], digest
+            
+            order = np.argsort(self._strikes, kind='stable')
+            values = self._values[order]
+            text = {name: column[order] for name, column in self._text.items()}
+        
+        columns = {}
+        for column in PAYLOAD_COLUMNS:
+            if column in NUMERIC_INDEX:
+                columns[column] = values[:, NUMERIC_INDEX[column]]
+            elif column in text:
+                columns[column] = pd.Series(text[column], dtype=object).astype(PAYLOAD_SCHEMA[column])
+            else:
+                columns[column] = pd.Series([getattr(self, column)] * len(order), dtype=PAYLOAD_SCHEMA[column])
+        data = pd.DataFrame(columns)
+        
+        with self._lock:
+            self._snapshot = (digest, data)
+        return data, digest
+
+class StreamingCollector:
+    """
+    Keeps LiveChainStates current from the WebSocket feed on a background thread.
+    """
+    
+    def __init__(self, targets, url=None):
+        """
+        Initialize the collector (call start() to connect).
+        
+        Args:
+            targets (list): (symbol, expiry) tuples to subscribe to
+            url (str, optional): Feed URL. If None, use STREAMING["url"].
+        """
+        self.targets = list(dict.fromkeys(targets))
+        self.url = url or STREAMING["url"]
+        self.states = {target: LiveChainState(*target) for target in self.targets}
+        self.tokens = get_token_manager()
+        self.decoder = OptionChainDecoder()
+        self.stats = {
+            'connects': 0, 'messages': 0, 'bytes': 0, 'chains': 0,
+            'updates': 0, 'gaps': 0, 'errors': 0,
+        }
+        self._resyncing = set()
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._thread = None
+        self._ws = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Connect and start receiving on a background thread."""
+        if connect is None:
+            raise RuntimeError("Streaming needs the websockets package (pip install websockets)")
+        if not self.url:
+            raise ValueError("No feed URL: set STREAMING['url'] or TRUEDATA_STREAM_URL")
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='option-chain-stream', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout=5):
+        """Close the connection and stop the receiving thread."""
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def wait_ready(self, timeout=None):
+        """
+        Wait until every target has received its first chain.
+        
+        Returns:
+            bool: True if all targets have a state to snapshot
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not all(state.generation is not None for state in self.states.values()):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff before reconnect number `attempt` (1-based)."""
+        ceiling = min(STREAMING["reconnect_backoff_cap"], STREAMING["reconnect_backoff"] * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+    
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+    
+    def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            token = None
+            try:
+                token = self.tokens.get_token()
+                self._session(token)
+                attempt = 0
+            except InvalidStatus as e:
+                logger.error(f"Stream handshake rejected: {str(e)}")
+                if e.response.status_code == 401 and token:
+                    self.tokens.invalidate(token)
+            except (ConnectionClosed, InvalidHandshake, OSError, TimeoutError) as e:
+                if not self._stop.is_set():
+                    logger.warning(f"Stream connection lost: {str(e)}")
+            except Exception as e:
+                # Anything else would end the thread silently and never reconnect
+                logger.error(f"Stream session failed: {str(e)}", exc_info=True)
+            finally:
+                self._ws = None
+                self._connected.clear()
+                for state in self.states.values():
+                    state.mark_lost()
+            
+            if self._stop.is_set():
+                break
+            attempt += 1
+            delay = self.backoff(attempt)
+            logger.info(f"Reconnecting to the stream in {delay:.1f}s")
+            self._stop.wait(delay)
+    
+    def _session(self, token):
+        """One connection: subscribe to every target and apply messages until it closes."""
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        with connect(
+            self.url,
+            additional_headers=headers,
+            open_timeout=STREAMING["open_timeout"],
+            ping_interval=STREAMING["ping_interval"],
+            max_size=None
+        ) as ws:
+            self._ws = ws
+            self._count('connects')
+            self._resyncing.clear()
+            for symbol, expiry in self.targets:
+                self._subscribe(ws, symbol, expiry)
+            self._connected.set()
+            logger.info(f"Streaming {len(self.targets)} targets from {self.url}")
+            
+            while not self._stop.is_set():
+                try:
+                    message = ws.recv(timeout=1)
+                except TimeoutError:
+                    continue
+                self._handle(ws, message)
+    
+    def _subscribe(self, ws, symbol, expiry):
+        ws.send(json.dumps({'action': 'subscribe', 'symbol': symbol, 'expiry': expiry}))
+    
+    def _handle(self, ws, message):
+        """Apply one feed message to its target's state."""
+        with self._lock:
+            self.stats['messages'] += 1
+            self.stats['bytes'] += len(message)
+        
+        try:
+            message = json.loads(message)
+            if not isinstance(message, dict):
+                raise SchemaDriftError(f"Message is not an object: {type(message).__name__}")
+            kind = message.get('type')
+            if kind == 'heartbeat':
+                return
+            if kind == 'error':
+                logger.error(f"Stream error: {message.get('message')}")
+                return
+            
+            key = (message.get('symbol'), message.get('expiry'))
+            state = self.states.get(key)
+            if state is None:
+                return
+            
+            if kind == 'chain':
+                state.load(self.decoder.decode_records(message), message['seq'])
+                self._resyncing.discard(key)
+                self._count('chains')
+            elif kind == 'update':
+                if state.apply(message['strike'], message['fields'], message['seq']):
+                    self._count('updates')
+                elif key not in self._resyncing:
+                    # Lost messages: the state is wrong until a fresh chain arrives
+                    logger.warning(f"Stream gap for {key[0]} {key[1]} at seq {message['seq']}, resubscribing")
+                    self._count('gaps')
+                    self._resyncing.add(key)
+                    state.mark_lost()
+                    self._subscribe(ws, *key)
+        except (SchemaDriftError, ValueError, KeyError) as e:
+            logger.error(f"Bad stream message: {str(e)}")
+            self._count('errors')
+    
+    def snapshot(self, symbol, expiry):
+        """
+        Cut a snapshot of a target's live state.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+        
+        Returns:
+            tuple: (DataFrame, digest), or (None, None) if the target has no
+                state yet or the feed has been down longer than STREAMING["stale_seconds"]
+        """
+        state = self.states.get((symbol, expiry))
+        if state is None or not state.is_fresh():
+            return None, None
+        return state.snapshot()
+    
+    def metrics(self):
+        """
+        Feed statistics.
+        
+        Returns:
+            dict: connects, messages, bytes, chains, updates, gaps, errors and connected
+        """
+        with self._lock:
+            metrics = dict(self.stats)
+        metrics['connected'] = self._connected.is_set()
+        return metrics
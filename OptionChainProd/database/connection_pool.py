@@ -0,0 +1,112 @@
+"""
+SQLite connection pooling for NIFTY Options Dashboard.
+"""
+import os
+import queue
+import sqlite3
+import logging
+import threading
+from config.settings import DATABASE
+
+logger = logging.getLogger(__name__)
+
+class ConnectionPool:
+    """
+    Pool of reusable SQLite connections for one database file.
+    
+    Each connection is handed to one thread at a time and returned to the pool
+    afterwards, so open/PRAGMA setup happens once per connection and each
+    connection keeps its prepared statement cache across calls.
+    """
+    
+    def __init__(self, db_file, pool_size=None, pragmas=None):
+        """
+        Initialize the pool.
+        
+        Args:
+            db_file (str): Path to database file
+            pool_size (int, optional): Maximum idle connections kept open.
+                If None, use the value from settings.
+            pragmas (dict, optional): PRAGMAs applied to each new connection.
+                If None, use the values from settings.
+        """
+        self.db_file = db_file
+        self.pool_size = pool_size or DATABASE["pool_size"]
+        self.pragmas = DATABASE["pragmas"] if pragmas is None else pragmas
+        self._idle = queue.LifoQueue(maxsize=self.pool_size)
+    
+    def _connect(self):
+        """Open and configure a new connection."""
+        busy_timeout = self.pragmas.get("busy_timeout", 5000)
+        
+        conn = sqlite3.connect(
+            self.db_file,
+            timeout=busy_timeout / 1000,
+            check_same_thread=False,  # Connections move between threads, but are never shared
+            cached_statements=DATABASE["statement_cache_size"]
+        )
+        conn.row_factory = sqlite3.Row  # Enable row access by name
+        
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        
+        return conn
+    
+    def acquire(self):
+        """
+        Get a connection for exclusive use by the calling thread.
+        
+        Returns:
+            sqlite3.Connection: Pooled connection
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+    
+    def release(self, conn):
+        """
+        Return a connection to the pool.
+        
+        Any transaction left open by the caller is rolled back. Connections
+        beyond the pool size are closed.
+        
+        Args:
+            conn (sqlite3.Connection): Connection obtained from acquire()
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding broken database connection: {str(e)}")
+            conn.close()
+    
+    def close_all(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_connection_pool(db_file):
+    """
+    Get the process-wide connection pool for a database file.
+    
+    Args:
+        db_file (str): Path to database file
+        
+    Returns:
+        ConnectionPool: Shared pool for that database
+    """
+    key = os.path.abspath(db_file)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(db_file)
+        return _pools[key]
@@ -4,13 +4,143 @@ Database management module for NIFTY Options Dashboard.
 import os
 import sqlite3
 import logging
+import time
+import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import json
 from config.settings import DATABASE
+from database.connection_pool import get_connection_pool
+from database.migrations import STRIKE_SCALE, apply_migrations, get_schema_version
+from database.notifications import get_snapshot_notifier
+from database.timestamp_index import TIMESTAMP_FORMAT, format_epoch, get_timestamp_index, to_epoch
+from utils.helpers import to_ist
 
 logger = logging.getLogger(__name__)
 
+# API column -> snapshot_strikes column for the OI values we persist
+OI_COLUMNS = {
+    'callOI': 'call_oi',
+    'callpOI': 'call_prev_oi',
+    'putOI': 'put_oi',
+    'putPOI': 'put_prev_oi',
+}
+
+def _nullable_int_list(data, column):
+    """
+    Convert a DataFrame column to a list of Python ints with None for missing values.
+    
+    Args:
+        data (pandas.DataFrame): Source data
+        column (str): Column name; a missing column yields all None
+        
+    Returns:
+        list: One int or None per row
+    """
+    if column not in data.columns:
+        return [None] * len(data)
+    
+    values = pd.to_numeric(data[column], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    missing = np.isnan(values)
+    result = np.where(missing, 0, values).astype(np.int64).tolist()
+    
+    for i in np.flatnonzero(missing):
+        result[i] = None
+    
+    return result
+
+SYMBOL_INSERT = '''
+INSERT OR IGNORE INTO symbols (name) VALUES (?)
+'''
+
+EXPIRY_INSERT = '''
+INSERT OR IGNORE INTO expiries (name) VALUES (?)
+'''
+
+SNAPSHOT_INSERT = '''
+INSERT OR IGNORE INTO snapshots (symbol_id, expiry_id, epoch_ms) VALUES (?, ?, ?)
+'''
+
+SNAPSHOT_ID_QUERY = '''
+SELECT id FROM snapshots
+WHERE symbol_id = ? AND expiry_id = ? AND epoch_ms = ?
+'''
+
+MANIFEST_INSERT = '''
+INSERT OR REPLACE INTO import_manifest (path, size, mtime_ns, snapshots, imported_at)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+# Unchanged snapshot: point at the strike rows of the identical snapshot it was
+# compared with; inserts nothing if that snapshot is not stored
+UNCHANGED_SNAPSHOT_INSERT = '''
+INSERT OR IGNORE INTO snapshots (symbol_id, expiry_id, epoch_ms, source_snapshot_id)
+SELECT symbol_id, expiry_id, ?, COALESCE(source_snapshot_id, id) FROM snapshots
+WHERE symbol_id = ? AND expiry_id = ? AND epoch_ms = ?
+'''
+
+STRIKES_INSERT = '''
+INSERT OR REPLACE INTO snapshot_strikes
+(snapshot_id, strike_int, call_oi, call_prev_oi, put_oi, put_prev_oi)
+VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+OI_CHANGES_INSERT = '''
+INSERT OR REPLACE INTO oi_changes
+(timestamp, symbol, expiry, strike, interval, ce_oi_change, pe_oi_change)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+SYMBOL_ID_QUERY = '''
+SELECT id FROM symbols WHERE name = ?
+'''
+
+EXPIRY_ID_QUERY = '''
+SELECT id FROM expiries WHERE name = ?
+'''
+
+LATEST_SNAPSHOT_QUERY = '''
+SELECT MAX(epoch_ms) AS max_epoch_ms FROM snapshots
+WHERE symbol_id = ? AND expiry_id = ?
+'''
+
+SNAPSHOT_QUERY = '''
+SELECT ss.strike_int, ss.call_oi, ss.call_prev_oi, ss.put_oi, ss.put_prev_oi
+FROM snapshots sn
+JOIN snapshot_strikes ss ON ss.snapshot_id = COALESCE(sn.source_snapshot_id, sn.id)
+WHERE sn.symbol_id = ? AND sn.expiry_id = ? AND sn.epoch_ms = ?
+ORDER BY ss.strike_int
+'''
+
+TIMESTAMPS_QUERY = '''
+SELECT epoch_ms FROM snapshots
+WHERE symbol_id = ? AND expiry_id = ?
+ORDER BY epoch_ms DESC
+'''
+
+NEW_TIMESTAMPS_QUERY = '''
+SELECT epoch_ms FROM snapshots
+WHERE symbol_id = ? AND expiry_id = ? AND epoch_ms > ?
+'''
+
+# Read queries on the refresh path, checked by database.query_plans
+HOT_QUERIES = {
+    'symbol_id': SYMBOL_ID_QUERY,
+    'expiry_id': EXPIRY_ID_QUERY,
+    'latest_snapshot': LATEST_SNAPSHOT_QUERY,
+    'snapshot': SNAPSHOT_QUERY,
+    'timestamps': TIMESTAMPS_QUERY,
+    'new_timestamps': NEW_TIMESTAMPS_QUERY,
+}
+
+# Columns returned by the option data getters
+OPTION_DATA_COLUMNS = ['timestamp', 'symbol', 'expiry', 'strike', 'call_oi', 'call_prev_oi', 'put_oi', 'put_prev_oi']
+
+# Database files whose tables and migrations this process has already checked
+_initialized_files = set()
+_initialized_lock = threading.Lock()
+
 class DatabaseManager:
     """
     Manages SQLite database operations for the NIFTY Options Dashboard.
@@ -28,7 +158,17 @@ class DatabaseManager:
             db_file = DATABASE["filename"]
             
         self.db_file = db_file
-        self._ensure_db_exists()
+        self.pool = get_connection_pool(db_file)
+        self.timestamp_index = get_timestamp_index(db_file)
+        self.notifier = get_snapshot_notifier(db_file)
+        self._name_ids = {}
+        
+        # The DDL and migrations only need to run once per file and process
+        key = os.path.abspath(db_file)
+        with _initialized_lock:
+            if key not in _initialized_files:
+                self._ensure_db_exists()
+                _initialized_files.add(key)
     
     def _ensure_db_exists(self):
         """Ensure database file and tables exist."""
@@ -38,26 +178,28 @@ class DatabaseManager:
             os.makedirs(os.path.dirname(os.path.abspath(self.db_file)), exist_ok=True)
             
             # Connect to database
-            conn = sqlite3.connect(self.db_file)
+            conn = self._get_connection()
             cursor = conn.cursor()
             
             # Create tables if they don't exist
             
-            # Options data table - store raw metrics
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS option_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME NOT NULL,
-                symbol TEXT NOT NULL,
-                expiry TEXT NOT NULL,
-                strike REAL NOT NULL,
-                call_oi INTEGER,
-                call_prev_oi INTEGER,
-                put_oi INTEGER,
-                put_prev_oi INTEGER,
-                UNIQUE(timestamp, symbol, expiry, strike)
-            )
-            ''')
+            # Options data table - store raw metrics. This is the version 0
+            # layout; migrations replace it with the snapshot tables.
+            if get_schema_version(conn) == 0:
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS option_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME NOT NULL,
+                    symbol TEXT NOT NULL,
+                    expiry TEXT NOT NULL,
+                    strike REAL NOT NULL,
+                    call_oi INTEGER,
+                    call_prev_oi INTEGER,
+                    put_oi INTEGER,
+                    put_prev_oi INTEGER,
+                    UNIQUE(timestamp, symbol, expiry, strike)
+                )
+                ''')
             
             # Calculated metrics table - store derived values
             cursor.execute('''
@@ -84,6 +226,9 @@ class DatabaseManager:
             ''')
             
             conn.commit()
+            
+            # Bring the schema up to the current version
+            apply_migrations(conn)
             logger.info("Database initialized successfully")
             
         except sqlite3.Error as e:
@@ -92,19 +237,100 @@ class DatabaseManager:
         
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
     
     def _get_connection(self):
-        """Get database connection."""
+        """Get a pooled database connection."""
         try:
-            conn = sqlite3.connect(self.db_file)
-            conn.row_factory = sqlite3.Row  # Enable row access by name
-            return conn
+            return self.pool.acquire()
         except sqlite3.Error as e:
             logger.error(f"Database connection error: {str(e)}")
             raise
     
-    def save_option_data(self, data, symbol, expiry, timestamp=None):
+    def _release_connection(self, conn):
+        """Return a connection obtained from _get_connection to the pool."""
+        self.pool.release(conn)
+    
+    def _name_id(self, cursor, table, name, create=False):
+        """
+        Get the id of a symbol or expiry name, optionally creating it.
+        
+        Ids never change once assigned, so they are cached per instance.
+        
+        Args:
+            cursor (sqlite3.Cursor): Database cursor
+            table (str): 'symbols' or 'expiries'
+            name (str): Symbol or expiry name
+            create (bool): Insert the name if it does not exist yet
+            
+        Returns:
+            int or None: Row id, or None if the name is unknown
+        """
+        key = (table, name)
+        if key in self._name_ids:
+            return self._name_ids[key]
+        
+        insert_query, id_query = {
+            'symbols': (SYMBOL_INSERT, SYMBOL_ID_QUERY),
+            'expiries': (EXPIRY_INSERT, EXPIRY_ID_QUERY),
+        }[table]
+        
+        if create:
+            cursor.execute(insert_query, (name,))
+        
+        cursor.execute(id_query, (name,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        
+        self._name_ids[key] = row[0]
+        return row[0]
+    
+    def _snapshot_key(self, cursor, symbol, expiry):
+        """
+        Get the (symbol_id, expiry_id) pair used to query snapshots.
+        
+        Returns:
+            tuple or None: Ids, or None if the symbol or expiry has no data
+        """
+        symbol_id = self._name_id(cursor, 'symbols', symbol)
+        expiry_id = self._name_id(cursor, 'expiries', expiry)
+        if symbol_id is None or expiry_id is None:
+            return None
+        return symbol_id, expiry_id
+    
+    def _strike_rows(self, data, snapshot_id):
+        """
+        Convert an option chain DataFrame into snapshot_strikes insert rows.
+        
+        Each column is converted to a typed array once instead of per cell.
+        Rows without a numeric strike are dropped.
+        
+        Args:
+            data (pandas.DataFrame): Option chain data
+            snapshot_id (int): Id of the snapshot the rows belong to
+            
+        Returns:
+            list: Row tuples matching STRIKES_INSERT
+        """
+        strikes = pd.to_numeric(data['strike'], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        valid = ~np.isnan(strikes)
+        if not valid.all():
+            logger.warning(f"Dropping {int((~valid).sum())} rows without a strike")
+        
+        strike_ints = np.rint(strikes[valid] * STRIKE_SCALE).astype(np.int64).tolist()
+        oi_values = [
+            [value for value, keep in zip(_nullable_int_list(data, column), valid) if keep]
+            for column in OI_COLUMNS
+        ]
+        
+        return list(zip(
+            [snapshot_id] * len(strike_ints),
+            strike_ints,
+            *oi_values
+        ))
+    
+    def save_option_data(self, data, symbol, expiry, timestamp=None, source_timestamp=None):
         """
         Save option data to the database.
         
@@ -114,61 +340,150 @@ class DatabaseManager:
             expiry (str): Expiry date
             timestamp (datetime, optional): Timestamp for the data.
                 If None, use current time.
+            source_timestamp (datetime, optional): Time of an earlier snapshot
+                whose chain is identical to this one. Only a marker pointing at
+                that snapshot is stored; if it is not in the database, the
+                chain is stored in full.
                 
         Returns:
             bool: True if successful, False otherwise
         """
-        if timestamp is None:
-            timestamp = datetime.now()
-            
         if data is None or data.empty:
             logger.error("No data to save to database")
             return False
-            
+        
+        stats = self.bulk_save_option_data([(data, symbol, expiry, timestamp, source_timestamp)])
+        return stats['success']
+    
+    def bulk_save_option_data(self, snapshots, manifest=None):
+        """
+        Save many option chain snapshots in a single transaction.
+        
+        Args:
+            snapshots (iterable): Tuples of (data, symbol, expiry, timestamp),
+                optionally followed by a source timestamp (see save_option_data).
+                A timestamp of None means the current time.
+            manifest (list, optional): (path, size, mtime_ns, snapshots) tuples
+                recorded in import_manifest in the same transaction, so an
+                imported file is marked done exactly when its data is committed
+                
+        Returns:
+            dict: Ingest statistics with keys success, snapshots, unchanged,
+                rows, seconds and rows_per_sec
+        """
+        stats = {'success': False, 'snapshots': 0, 'unchanged': 0, 'rows': 0, 'seconds': 0.0, 'rows_per_sec': 0.0}
+        started = time.perf_counter()
+        
         conn = None
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
             
-            # Convert timestamp to string format for SQLite
-            ts_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Filter only needed columns
-            if 'strike' in data.columns and 'callOI' in data.columns and 'putOI' in data.columns:
-                # Extract needed data
-                for _, row in data.iterrows():
-                    # Insert data into option_data table
-                    cursor.execute('''
-                    INSERT OR REPLACE INTO option_data 
-                    (timestamp, symbol, expiry, strike, call_oi, call_prev_oi, put_oi, put_prev_oi)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        ts_str, 
-                        symbol,
-                        expiry,
-                        float(row['strike']),
-                        int(row['callOI']) if 'callOI' in row and pd.notna(row['callOI']) else None,
-                        int(row['callpOI']) if 'callpOI' in row and pd.notna(row['callpOI']) else None,
-                        int(row['putOI']) if 'putOI' in row and pd.notna(row['putOI']) else None,
-                        int(row['putPOI']) if 'putPOI' in row and pd.notna(row['putPOI']) else None
-                    ))
+            rows = []
+            saved_epochs = {}
+            for snapshot in snapshots:
+                data, symbol, expiry, timestamp = snapshot[:4]
+                source_timestamp = snapshot[4] if len(snapshot) > 4 else None
                 
-                conn.commit()
-                logger.info(f"Saved {len(data)} records to database")
-                return True
-            else:
-                logger.error("Required columns not found in data")
-                return False
+                if data is None or data.empty:
+                    logger.warning(f"Skipping empty snapshot for {symbol} {expiry}")
+                    continue
+                
+                if not {'strike', 'callOI', 'putOI'}.issubset(data.columns):
+                    logger.error("Required columns not found in data")
+                    continue
+                
+                if timestamp is None:
+                    timestamp = datetime.now()
+                
+                epoch = to_epoch(timestamp)
+                symbol_id = self._name_id(cursor, 'symbols', symbol, create=True)
+                expiry_id = self._name_id(cursor, 'expiries', expiry, create=True)
                 
+                if source_timestamp is not None:
+                    cursor.execute(
+                        UNCHANGED_SNAPSHOT_INSERT,
+                        (epoch * 1000, symbol_id, expiry_id, to_epoch(source_timestamp) * 1000)
+                    )
+                    if cursor.rowcount == 1:
+                        saved_epochs.setdefault((symbol, expiry), []).append(epoch)
+                        stats['snapshots'] += 1
+                        stats['unchanged'] += 1
+                        continue
+                    # The source snapshot was never stored (e.g. its write failed),
+                    # or this one exists already: store in full
+                
+                cursor.execute(SNAPSHOT_INSERT, (symbol_id, expiry_id, epoch * 1000))
+                cursor.execute(SNAPSHOT_ID_QUERY, (symbol_id, expiry_id, epoch * 1000))
+                snapshot_id = cursor.fetchone()[0]
+                
+                rows.extend(self._strike_rows(data, snapshot_id))
+                saved_epochs.setdefault((symbol, expiry), []).append(epoch)
+                stats['snapshots'] += 1
+            
+            if not stats['snapshots'] and not manifest:
+                conn.rollback()
+                self._name_ids.clear()
+                return stats
+            
+            cursor.executemany(STRIKES_INSERT, rows)
+            if manifest:
+                imported_at = datetime.now().strftime(TIMESTAMP_FORMAT)
+                cursor.executemany(MANIFEST_INSERT, [(*entry, imported_at) for entry in manifest])
+            conn.commit()
+            
         except sqlite3.Error as e:
             logger.error(f"Error saving option data to database: {str(e)}")
             if conn:
                 conn.rollback()
-            return False
+            # Ids created in the rolled back transaction are gone
+            self._name_ids.clear()
+            stats['snapshots'] = 0
+            return stats
             
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
+        
+        # Keep already-loaded timestamp indexes current without re-reading them,
+        # and tell open dashboards about the new snapshots
+        for (symbol, expiry), epochs in saved_epochs.items():
+            if self.timestamp_index.is_loaded(symbol, expiry):
+                self.timestamp_index.add(symbol, expiry, epochs)
+            self.notifier.publish(symbol, expiry, max(epochs))
+        
+        elapsed = time.perf_counter() - started
+        stats.update({
+            'success': True,
+            'rows': len(rows),
+            'seconds': elapsed,
+            'rows_per_sec': len(rows) / elapsed if elapsed > 0 else float('inf')
+        })
+        logger.info(f"Saved {len(rows)} records from {stats['snapshots']} snapshot(s) to database "
+                    f"({stats['unchanged']} unchanged, {stats['rows_per_sec']:,.0f} rows/sec)")
+        return stats
+    
+    def get_import_manifest(self):
+        """
+        Get the archived files imported so far.
+        
+        Returns:
+            dict: {path: (size, mtime_ns)} for every imported file
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            cursor.execute('SELECT path, size, mtime_ns FROM import_manifest')
+            return {row['path']: (row['size'], row['mtime_ns']) for row in cursor.fetchall()}
+        
+        except sqlite3.Error as e:
+            logger.error(f"Error reading import manifest: {str(e)}")
+            return {}
+        
+        finally:
+            if conn:
+                self._release_connection(conn)
     
     def save_oi_changes(self, changes_df):
         """
@@ -189,29 +504,35 @@ class DatabaseManager:
         # Fill NaN values with 0 before saving
         changes_df = changes_df.fillna(0)
         
+        timestamps = changes_df['timestamp']
+        if pd.api.types.is_datetime64_any_dtype(timestamps):
+            ts_values = timestamps.dt.strftime(TIMESTAMP_FORMAT).tolist()
+        else:
+            ts_values = [
+                ts.strftime(TIMESTAMP_FORMAT) if isinstance(ts, datetime) else ts
+                for ts in timestamps
+            ]
+        
+        rows = list(zip(
+            ts_values,
+            changes_df['symbol'].tolist(),
+            changes_df['expiry'].tolist(),
+            changes_df['strike'].to_numpy(dtype='float64').tolist(),
+            changes_df['interval'].to_numpy(dtype='int64').tolist(),
+            changes_df['ce_oi_change'].to_numpy(dtype='float64').astype(np.int64).tolist(),
+            changes_df['pe_oi_change'].to_numpy(dtype='float64').astype(np.int64).tolist()
+        ))
+        
         conn = None
         try:
             conn = self._get_connection()
-            cursor = conn.cursor()
-        
-            # Insert each row
-            for _, row in changes_df.iterrows():
-                cursor.execute('''
-                INSERT OR REPLACE INTO oi_changes
-                (timestamp, symbol, expiry, strike, interval, ce_oi_change, pe_oi_change)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row['timestamp'].strftime('%Y-%m-%d %H:%M:%S') if isinstance(row['timestamp'], datetime) else row['timestamp'],
-                    row['symbol'],
-                    row['expiry'],
-                    float(row['strike']),
-                    int(row['interval']),
-                    int(row['ce_oi_change']),
-                    int(row['pe_oi_change'])
-                ))
-        
+            started = time.perf_counter()
+            conn.executemany(OI_CHANGES_INSERT, rows)
             conn.commit()
-            logger.info(f"Saved {len(changes_df)} OI changes to database")
+            elapsed = time.perf_counter() - started
+            
+            logger.info(f"Saved {len(rows)} OI changes to database "
+                        f"({len(rows) / elapsed if elapsed > 0 else 0:,.0f} rows/sec)")
             return True
         
         except sqlite3.Error as e:
@@ -222,7 +543,36 @@ class DatabaseManager:
         
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
+    
+    def _read_snapshot(self, conn, symbol, expiry, key, epoch_ms):
+        """
+        Read one snapshot into the public option data layout.
+        
+        Args:
+            conn (sqlite3.Connection): Database connection
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            key (tuple): (symbol_id, expiry_id)
+            epoch_ms (int): Snapshot time in epoch milliseconds
+            
+        Returns:
+            pandas.DataFrame: Option data with OPTION_DATA_COLUMNS
+        """
+        df = pd.read_sql_query(
+            SNAPSHOT_QUERY,
+            conn,
+            params=(*key, epoch_ms)
+        )
+        
+        if df.empty:
+            return pd.DataFrame(columns=OPTION_DATA_COLUMNS)
+        
+        df.insert(0, 'strike', df.pop('strike_int') / STRIKE_SCALE)
+        df.insert(0, 'expiry', expiry)
+        df.insert(0, 'symbol', symbol)
+        df.insert(0, 'timestamp', format_epoch(epoch_ms // 1000))
+        return df
     
     def get_latest_option_data(self, symbol, expiry):
         """
@@ -238,34 +588,22 @@ class DatabaseManager:
         conn = None
         try:
             conn = self._get_connection()
+            cursor = conn.cursor()
             
-            # Get the latest timestamp first
-            latest_ts_query = '''
-            SELECT MAX(timestamp) as max_ts FROM option_data 
-            WHERE symbol = ? AND expiry = ?
-            '''
+            key = self._snapshot_key(cursor, symbol, expiry)
             
-            cursor = conn.cursor()
-            cursor.execute(latest_ts_query, (symbol, expiry))
-            latest_ts = cursor.fetchone()['max_ts']
+            # Get the latest timestamp first
+            latest_epoch_ms = None
+            if key:
+                cursor.execute(LATEST_SNAPSHOT_QUERY, key)
+                latest_epoch_ms = cursor.fetchone()['max_epoch_ms']
             
-            if not latest_ts:
+            if latest_epoch_ms is None:
                 logger.warning(f"No data found for {symbol} {expiry}")
                 return pd.DataFrame()
             
             # Now get data for that timestamp
-            data_query = '''
-            SELECT timestamp, symbol, expiry, strike, call_oi, call_prev_oi, put_oi, put_prev_oi
-            FROM option_data
-            WHERE symbol = ? AND expiry = ? AND timestamp = ?
-            ORDER BY strike
-            '''
-            
-            return pd.read_sql_query(
-                data_query, 
-                conn, 
-                params=(symbol, expiry, latest_ts)
-            )
+            return self._read_snapshot(conn, symbol, expiry, key, latest_epoch_ms)
             
         except sqlite3.Error as e:
             logger.error(f"Error getting latest option data: {str(e)}")
@@ -273,7 +611,39 @@ class DatabaseManager:
             
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
+    
+    def get_latest_timestamp(self, symbol, expiry):
+        """
+        Get the timestamp of the latest snapshot without reading its strikes.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            
+        Returns:
+            str or None: Timestamp string or None if there is no data
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            key = self._snapshot_key(cursor, symbol, expiry)
+            if key is None:
+                return None
+            
+            cursor.execute(LATEST_SNAPSHOT_QUERY, key)
+            latest_epoch_ms = cursor.fetchone()['max_epoch_ms']
+            return format_epoch(latest_epoch_ms // 1000) if latest_epoch_ms is not None else None
+            
+        except sqlite3.Error as e:
+            logger.error(f"Error getting latest timestamp: {str(e)}")
+            return None
+            
+        finally:
+            if conn:
+                self._release_connection(conn)
     
     def get_option_data_by_timestamp(self, symbol, expiry, timestamp):
         """
@@ -291,23 +661,11 @@ class DatabaseManager:
         try:
             conn = self._get_connection()
             
-            # Format timestamp if it's a datetime object
-            if isinstance(timestamp, datetime):
-                timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Query data
-            query = '''
-            SELECT timestamp, symbol, expiry, strike, call_oi, call_prev_oi, put_oi, put_prev_oi
-            FROM option_data
-            WHERE symbol = ? AND expiry = ? AND timestamp = ?
-            ORDER BY strike
-            '''
-            
-            return pd.read_sql_query(
-                query, 
-                conn, 
-                params=(symbol, expiry, timestamp)
-            )
+            key = self._snapshot_key(conn.cursor(), symbol, expiry)
+            if key is None:
+                return pd.DataFrame(columns=OPTION_DATA_COLUMNS)
+            
+            return self._read_snapshot(conn, symbol, expiry, key, to_epoch(timestamp) * 1000)
             
         except sqlite3.Error as e:
             logger.error(f"Error getting option data by timestamp: {str(e)}")
@@ -315,7 +673,7 @@ class DatabaseManager:
             
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
     
     def get_timestamps(self, symbol, expiry, limit=None):
         """
@@ -328,27 +686,26 @@ class DatabaseManager:
                 If None, return all timestamps.
                 
         Returns:
-            list: List of timestamp strings
+            list: List of timestamp strings, newest first
         """
         conn = None
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
             
-            query = '''
-            SELECT DISTINCT timestamp 
-            FROM option_data
-            WHERE symbol = ? AND expiry = ?
-            ORDER BY timestamp DESC
-            '''
+            key = self._snapshot_key(cursor, symbol, expiry)
+            if key is None:
+                return []
+            
+            query = TIMESTAMPS_QUERY
             
             if limit:
                 query += f" LIMIT {int(limit)}"
             
-            cursor.execute(query, (symbol, expiry))
+            cursor.execute(query, key)
             
-            # Extract timestamps from results
-            return [row['timestamp'] for row in cursor.fetchall()]
+            # Convert stored epochs to timestamp strings
+            return [format_epoch(row['epoch_ms'] // 1000) for row in cursor.fetchall()]
             
         except sqlite3.Error as e:
             logger.error(f"Error getting timestamps: {str(e)}")
@@ -356,7 +713,64 @@ class DatabaseManager:
             
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
+    
+    def _sync_timestamp_index(self, symbol, expiry):
+        """
+        Load timestamps stored since the last sync into the timestamp index.
+        
+        The first call loads all timestamps; later calls only read timestamps
+        newer than the latest indexed one, which also picks up snapshots
+        written by other processes.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+        """
+        latest = self.timestamp_index.latest(symbol, expiry)
+        
+        conn = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            key = self._snapshot_key(cursor, symbol, expiry)
+            if key is None:
+                return
+            
+            after_ms = latest * 1000 if latest is not None else -1
+            cursor.execute(NEW_TIMESTAMPS_QUERY, (*key, after_ms))
+            self.timestamp_index.add(symbol, expiry, [row['epoch_ms'] // 1000 for row in cursor.fetchall()])
+            
+        except sqlite3.Error as e:
+            logger.error(f"Error syncing timestamp index: {str(e)}")
+            
+        finally:
+            if conn:
+                self._release_connection(conn)
+    
+    def get_nearest_timestamp(self, symbol, expiry, target, before):
+        """
+        Get the stored timestamp closest to a target time, strictly before a cutoff.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            target (datetime): Time to get closest to
+            before (datetime): Only timestamps earlier than this are considered
+            
+        Returns:
+            str or None: Timestamp string or None if no earlier snapshot exists
+        """
+        self._sync_timestamp_index(symbol, expiry)
+        
+        found = self.timestamp_index.nearest(
+            symbol,
+            expiry,
+            to_ist(target).timestamp(),
+            to_ist(before).timestamp()
+        )
+        return format_epoch(found) if found is not None else None
     
     def save_user_settings(self, settings_dict):
         """
@@ -381,7 +795,7 @@ class DatabaseManager:
             INSERT INTO user_settings (timestamp, settings)
             VALUES (?, ?)
             ''', (
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                datetime.now().strftime(TIMESTAMP_FORMAT),
                 settings_json
             ))
             
@@ -397,7 +811,7 @@ class DatabaseManager:
             
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
     
     def get_latest_user_settings(self):
         """
@@ -432,7 +846,7 @@ class DatabaseManager:
             
         finally:
             if conn:
-                conn.close()
+                self._release_connection(conn)
     
     def backup_database(self, backup_dir="backups"):
         """
@@ -455,14 +869,15 @@ class DatabaseManager:
                 f"{os.path.splitext(os.path.basename(self.db_file))[0]}_{timestamp}.db"
             )
             
-            # Connect to source database
-            source_conn = sqlite3.connect(self.db_file)
+            # Get a source connection from the pool
+            source_conn = self._get_connection()
             
             # Create backup
-            with sqlite3.connect(backup_file) as backup_conn:
-                source_conn.backup(backup_conn)
-            
-            source_conn.close()
+            try:
+                with sqlite3.connect(backup_file) as backup_conn:
+                    source_conn.backup(backup_conn)
+            finally:
+                self._release_connection(source_conn)
             
             logger.info(f"Database backed up to {backup_file}")
             return backup_file
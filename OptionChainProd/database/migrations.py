@@ -0,0 +1,236 @@
+"""
+Versioned schema migrations for NIFTY Options Dashboard.
+
+The schema version is kept in SQLite's PRAGMA user_version. Version 0 is
+the original schema created by DatabaseManager._ensure_db_exists.
+"""
+import os
+import sys
+import sqlite3
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Strikes are stored as integers in hundredths
+STRIKE_SCALE = 100
+
+# Stored text timestamps were IST wall-clock times (UTC+05:30, no DST)
+IST_OFFSET_SECONDS = 19800
+
+def _add_hot_query_indexes(cursor):
+    """Add indexes shaped for the dashboard and calculator read paths."""
+    # Latest-timestamp, timestamp list and snapshot reads all filter on
+    # symbol/expiry and then seek or range over timestamp; covering the OI
+    # columns lets snapshot reads skip the table entirely.
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_option_data_snapshot
+    ON option_data (symbol, expiry, timestamp, strike, call_oi, call_prev_oi, put_oi, put_prev_oi)
+    ''')
+    
+    # Latest user settings lookup
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_user_settings_timestamp
+    ON user_settings (timestamp)
+    ''')
+    
+    cursor.execute('ANALYZE')
+
+def _normalize_snapshots(cursor):
+    """
+    Replace the flat option_data table with normalized snapshot tables.
+    
+    Symbols and expiries become lookup tables, each snapshot becomes one
+    snapshots row with an integer epoch_ms timestamp, and strike rows are
+    keyed by (snapshot_id, strike_int) with strikes scaled by STRIKE_SCALE.
+    Stored text timestamps are naive IST times.
+    """
+    cursor.execute('''
+    CREATE TABLE symbols (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE expiries (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE snapshots (
+        id INTEGER PRIMARY KEY,
+        symbol_id INTEGER NOT NULL REFERENCES symbols (id),
+        expiry_id INTEGER NOT NULL REFERENCES expiries (id),
+        epoch_ms INTEGER NOT NULL,
+        UNIQUE (symbol_id, expiry_id, epoch_ms)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE snapshot_strikes (
+        snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+        strike_int INTEGER NOT NULL,  -- strike * STRIKE_SCALE
+        call_oi INTEGER,
+        call_prev_oi INTEGER,
+        put_oi INTEGER,
+        put_prev_oi INTEGER,
+        PRIMARY KEY (snapshot_id, strike_int)
+    ) WITHOUT ROWID
+    ''')
+    
+    # Carry existing data over
+    cursor.execute('INSERT INTO symbols (name) SELECT DISTINCT symbol FROM option_data ORDER BY symbol')
+    cursor.execute('INSERT INTO expiries (name) SELECT DISTINCT expiry FROM option_data ORDER BY expiry')
+    
+    cursor.execute(f'''
+    INSERT INTO snapshots (symbol_id, expiry_id, epoch_ms)
+    SELECT DISTINCT s.id, e.id, (CAST(strftime('%s', o.timestamp) AS INTEGER) - {IST_OFFSET_SECONDS}) * 1000
+    FROM option_data o
+    JOIN symbols s ON s.name = o.symbol
+    JOIN expiries e ON e.name = o.expiry
+    ORDER BY o.timestamp
+    ''')
+    
+    cursor.execute(f'''
+    INSERT OR REPLACE INTO snapshot_strikes
+    (snapshot_id, strike_int, call_oi, call_prev_oi, put_oi, put_prev_oi)
+    SELECT sn.id, CAST(ROUND(o.strike * {STRIKE_SCALE}) AS INTEGER),
+           o.call_oi, o.call_prev_oi, o.put_oi, o.put_prev_oi
+    FROM option_data o
+    JOIN symbols s ON s.name = o.symbol
+    JOIN expiries e ON e.name = o.expiry
+    JOIN snapshots sn ON sn.symbol_id = s.id AND sn.expiry_id = e.id
+        AND sn.epoch_ms = (CAST(strftime('%s', o.timestamp) AS INTEGER) - {IST_OFFSET_SECONDS}) * 1000
+    ORDER BY o.id
+    ''')
+    
+    cursor.execute('SELECT COUNT(*) FROM option_data')
+    migrated = cursor.fetchone()[0]
+    logger.info(f"Moved {migrated} option_data rows into snapshot tables")
+    
+    cursor.execute('DROP TABLE option_data')
+
+def _add_snapshot_source(cursor):
+    """
+    Let a snapshot reuse another snapshot's strike rows.
+    
+    When the API returns an unchanged chain, the new snapshot row only points
+    at the snapshot holding the data (source_snapshot_id) instead of copying
+    every strike. Readers resolve COALESCE(source_snapshot_id, id).
+    """
+    cursor.execute('ALTER TABLE snapshots ADD COLUMN source_snapshot_id INTEGER REFERENCES snapshots (id)')
+
+def _add_import_manifest(cursor):
+    """
+    Record which archived snapshot files have been imported.
+    
+    The backfill importer skips files whose path, size and modification time
+    match a manifest row, so reruns only read new or changed files.
+    """
+    cursor.execute('''
+    CREATE TABLE import_manifest (
+        path TEXT PRIMARY KEY,  -- relative to the data folder
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        snapshots INTEGER NOT NULL,
+        imported_at TEXT NOT NULL
+    )
+    ''')
+
+# (version, description, migration function), in order
+MIGRATIONS = [
+    (1, "Add indexes for hot option_data queries", _add_hot_query_indexes),
+    (2, "Normalize option_data into snapshot tables", _normalize_snapshots),
+    (3, "Add source_snapshot_id for unchanged snapshots", _add_snapshot_source),
+    (4, "Add import_manifest for the backfill importer", _add_import_manifest),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """
+    Get the schema version of a database.
+    
+    Args:
+        conn (sqlite3.Connection): Database connection
+        
+    Returns:
+        int: Schema version
+    """
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def apply_migrations(conn):
+    """
+    Apply all pending migrations, each in its own transaction.
+    
+    Args:
+        conn (sqlite3.Connection): Database connection
+        
+    Returns:
+        int: Schema version after migrating
+    """
+    version = get_schema_version(conn)
+    
+    for target, description, migration in MIGRATIONS:
+        if target <= version:
+            continue
+        
+        logger.info(f"Migrating database schema to version {target}: {description}")
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {int(target)}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = target
+    
+    return version
+
+def main():
+    """
+    Migrate a database file in place to the current schema version.
+    
+    Usage:
+        python -m database.migrations [db_file]
+    
+    A backup copy is written next to the database before migrating.
+    """
+    from config.settings import DATABASE
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    db_file = sys.argv[1] if len(sys.argv) > 1 else DATABASE["filename"]
+    if not os.path.exists(db_file):
+        logger.error(f"Database not found: {db_file}")
+        sys.exit(1)
+    
+    conn = sqlite3.connect(db_file)
+    try:
+        version = get_schema_version(conn)
+        if version >= SCHEMA_VERSION:
+            logger.info(f"{db_file} is already at schema version {version}")
+            return
+        
+        backup_file = f"{os.path.splitext(db_file)[0]}_v{version}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+        with sqlite3.connect(backup_file) as backup_conn:
+            conn.backup(backup_conn)
+        logger.info(f"Backed up {db_file} to {backup_file}")
+        
+        size_before = os.path.getsize(db_file)
+        version = apply_migrations(conn)
+        
+        # Reclaim the space freed by dropped tables
+        conn.execute('VACUUM')
+        logger.info(f"Migrated {db_file} to schema version {version} "
+                    f"({size_before:,} -> {os.path.getsize(db_file):,} bytes)")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
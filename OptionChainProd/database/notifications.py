@@ -0,0 +1,214 @@
+"""
+New-snapshot notifications for NIFTY Options Dashboard.
+
+DatabaseManager publishes every snapshot it commits to the notifier of its
+database file, so sessions in the same process learn about it at once.
+Snapshots committed by other processes (e.g. `main.py --mode collection`
+next to a separate dashboard) are picked up by one watcher thread per file.
+It polls PRAGMA data_version, which SQLite changes only when another
+connection commits, and reads the latest snapshot per symbol and expiry
+only then.
+"""
+import os
+import sqlite3
+import logging
+import threading
+from collections import namedtuple
+
+from config.settings import DATABASE
+from database.timestamp_index import format_epoch
+
+logger = logging.getLogger(__name__)
+
+# A newly committed snapshot; sequence increases with every event of a notifier
+SnapshotEvent = namedtuple('SnapshotEvent', ['symbol', 'expiry', 'timestamp', 'sequence'])
+
+LATEST_SNAPSHOTS_QUERY = '''
+SELECT sy.name AS symbol, ex.name AS expiry, MAX(sn.epoch_ms) AS max_epoch_ms
+FROM snapshots sn
+JOIN symbols sy ON sy.id = sn.symbol_id
+JOIN expiries ex ON ex.id = sn.expiry_id
+GROUP BY sn.symbol_id, sn.expiry_id
+'''
+
+class SnapshotNotifier:
+    """
+    Tracks the latest committed snapshot per (symbol, expiry) and wakes waiters.
+    """
+    
+    def __init__(self, db_file, poll_interval=None):
+        """
+        Initialize the notifier.
+        
+        Args:
+            db_file (str): Path to database file
+            poll_interval (float, optional): Seconds between data_version checks
+                of the watcher. If None, use the value from settings.
+        """
+        self.db_file = db_file
+        self.poll_interval = poll_interval or DATABASE["change_poll_ms"] / 1000
+        self.stats = {'events': 0, 'polls': 0, 'changes': 0}
+        self._latest = {}
+        self._epochs = {}
+        self._sequence = 0
+        self._subscribers = []
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def publish(self, symbol, expiry, epoch):
+        """
+        Record a committed snapshot and notify waiters and subscribers.
+        
+        Snapshots older than the latest known one are ignored.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            epoch (int): Snapshot time in epoch seconds
+        
+        Returns:
+            SnapshotEvent or None: The event, or None if the snapshot was not newer
+        """
+        with self._changed:
+            if epoch <= self._epochs.get((symbol, expiry), -1):
+                return None
+            
+            self._epochs[(symbol, expiry)] = epoch
+            self._sequence += 1
+            event = SnapshotEvent(symbol, expiry, format_epoch(epoch), self._sequence)
+            self._latest[(symbol, expiry)] = event
+            self.stats['events'] += 1
+            subscribers = list(self._subscribers)
+            self._changed.notify_all()
+        
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Snapshot subscriber failed: {str(e)}")
+        return event
+    
+    def latest(self, symbol, expiry):
+        """
+        Get the latest known snapshot for a symbol and expiry.
+        
+        Returns:
+            SnapshotEvent or None: None if no snapshot has been seen
+        """
+        with self._changed:
+            return self._latest.get((symbol, expiry))
+    
+    def wait(self, symbol, expiry, after=0, timeout=None):
+        """
+        Wait for a snapshot newer than a previously seen event.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            after (int): Sequence of the last event seen; 0 to take any snapshot
+            timeout (float, optional): Longest wait in seconds. If None, wait until one arrives.
+        
+        Returns:
+            SnapshotEvent or None: The latest event, or None on timeout
+        """
+        def newer():
+            event = self._latest.get((symbol, expiry))
+            return event if event is not None and event.sequence > after else None
+        
+        with self._changed:
+            return self._changed.wait_for(newer, timeout)
+    
+    def subscribe(self, callback):
+        """
+        Call a function with every new SnapshotEvent (on the publishing thread).
+        
+        Args:
+            callback (callable): Called with a SnapshotEvent; must not block
+        """
+        with self._changed:
+            self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback):
+        """Stop calling a function registered with subscribe()."""
+        with self._changed:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+    
+    def is_watching(self):
+        """Check whether the watcher thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self):
+        """
+        Start watching the database for commits by other processes.
+        
+        Returns:
+            SnapshotNotifier: self
+        """
+        with self._changed:
+            if self.is_watching():
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name='snapshot-notifier', daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self, timeout=None):
+        """Stop the watcher thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _load_latest(self, conn):
+        """Publish the latest snapshot of every symbol and expiry that is newer than known."""
+        for row in conn.execute(LATEST_SNAPSHOTS_QUERY):
+            self.publish(row['symbol'], row['expiry'], row['max_epoch_ms'] // 1000)
+    
+    def _watch(self):
+        """Watcher loop: check data_version and reload the latest snapshots when it changes."""
+        conn = None
+        try:
+            # A connection of its own that never writes, so every commit shows up in data_version
+            conn = sqlite3.connect(self.db_file, timeout=DATABASE["pragmas"].get("busy_timeout", 5000) / 1000)
+            conn.row_factory = sqlite3.Row
+            
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            self._load_latest(conn)
+            
+            while not self._stop.wait(self.poll_interval):
+                self.stats['polls'] += 1
+                current = conn.execute("PRAGMA data_version").fetchone()[0]
+                if current == version:
+                    continue
+                
+                version = current
+                self.stats['changes'] += 1
+                self._load_latest(conn)
+        
+        except sqlite3.Error as e:
+            logger.error(f"Snapshot notifier stopped: {str(e)}")
+        
+        finally:
+            if conn:
+                conn.close()
+
+_notifiers = {}
+_notifiers_lock = threading.Lock()
+
+def get_snapshot_notifier(db_file):
+    """
+    Get the process-wide snapshot notifier for a database file.
+    
+    Args:
+        db_file (str): Path to database file
+    
+    Returns:
+        SnapshotNotifier: Shared notifier for that database (watcher not started)
+    """
+    key = os.path.abspath(db_file)
+    with _notifiers_lock:
+        if key not in _notifiers:
+            _notifiers[key] = SnapshotNotifier(db_file)
+        return _notifiers[key]
@@ -0,0 +1,73 @@
+"""
+EXPLAIN QUERY PLAN check for the hot database queries.
+
+Usage:
+    python -m database.query_plans [db_file]
+
+Exits with status 1 if any hot query in database.db_manager falls back to a
+table or unconstrained index scan, or needs a temporary sort.
+"""
+import sys
+import logging
+from database.db_manager import DatabaseManager, HOT_QUERIES
+
+logger = logging.getLogger(__name__)
+
+def plan_problems(plan_details):
+    """
+    Find full scans and temporary sorts in EXPLAIN QUERY PLAN output.
+    
+    Args:
+        plan_details (list): Detail strings from EXPLAIN QUERY PLAN rows
+        
+    Returns:
+        list: Offending detail strings
+    """
+    problems = []
+    for detail in plan_details:
+        if detail.startswith('SCAN') and detail != 'SCAN CONSTANT ROW':
+            problems.append(detail)
+        # A SEARCH with no "(column=?)" constraint walks the whole index
+        elif detail.startswith('SEARCH') and '(' not in detail:
+            problems.append(detail)
+        elif 'TEMP B-TREE' in detail:
+            problems.append(detail)
+    return problems
+
+def check_query_plans(db):
+    """
+    Run EXPLAIN QUERY PLAN for every hot query.
+    
+    Args:
+        db (DatabaseManager): Database to check
+        
+    Returns:
+        dict: Query name -> list of offending plan details (empty if the plan is fine)
+    """
+    results = {}
+    conn = db._get_connection()
+    try:
+        for name, query in HOT_QUERIES.items():
+            params = (None,) * query.count('?')
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            details = [row['detail'] for row in plan]
+            results[name] = plan_problems(details)
+            logger.info(f"{name}: {' | '.join(details)}")
+    finally:
+        db._release_connection(conn)
+    return results
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    db = DatabaseManager(sys.argv[1] if len(sys.argv) > 1 else None)
+    results = check_query_plans(db)
+    
+    failed = {name: problems for name, problems in results.items() if problems}
+    for name, problems in failed.items():
+        logger.error(f"Hot query '{name}' is not index-driven: {'; '.join(problems)}")
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
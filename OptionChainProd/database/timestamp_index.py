@@ -0,0 +1,135 @@
+"""
+Sorted snapshot timestamp index for NIFTY Options Dashboard.
+"""
+import os
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+
+from utils.helpers import IST, to_ist
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def to_epoch(value):
+    """
+    Convert a timestamp to whole epoch seconds.
+    
+    Naive values, including stored timestamp strings, are taken to be IST.
+    Sub-second precision is dropped, matching stored timestamps.
+    
+    Args:
+        value (datetime or str): Timestamp to convert
+    
+    Returns:
+        int: Epoch seconds
+    """
+    return int(to_ist(value).timestamp())
+
+def format_epoch(epoch):
+    """
+    Format epoch seconds as a stored timestamp string (IST wall-clock time).
+    
+    Args:
+        epoch (int): Epoch seconds
+    
+    Returns:
+        str: Timestamp in TIMESTAMP_FORMAT
+    """
+    return datetime.fromtimestamp(epoch, IST).strftime(TIMESTAMP_FORMAT)
+
+class TimestampIndex:
+    """
+    Keeps snapshot timestamps per (symbol, expiry) as a sorted list of epoch seconds.
+    
+    The index is loaded once, kept up to date on insert, and queried with
+    bisect, so looking up the snapshot nearest to a target time costs
+    O(log n) no matter how much history is stored.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._epochs = {}
+        self._lock = threading.Lock()
+    
+    def is_loaded(self, symbol, expiry):
+        """Check whether timestamps for a symbol and expiry have been loaded."""
+        return (symbol, expiry) in self._epochs
+    
+    def latest(self, symbol, expiry):
+        """
+        Get the newest indexed timestamp.
+        
+        Returns:
+            int or None: Latest epoch seconds or None if nothing is indexed
+        """
+        epochs = self._epochs.get((symbol, expiry))
+        return epochs[-1] if epochs else None
+    
+    def add(self, symbol, expiry, epochs):
+        """
+        Add timestamps to the index, ignoring ones already present.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            epochs (iterable): Epoch seconds
+        """
+        with self._lock:
+            key_epochs = self._epochs.setdefault((symbol, expiry), [])
+            
+            for epoch in sorted(set(epochs)):
+                # Appending is the common case: snapshots arrive in time order
+                if not key_epochs or epoch > key_epochs[-1]:
+                    key_epochs.append(epoch)
+                    continue
+                
+                pos = bisect_left(key_epochs, epoch)
+                if pos == len(key_epochs) or key_epochs[pos] != epoch:
+                    insort(key_epochs, epoch)
+    
+    def nearest(self, symbol, expiry, target, before):
+        """
+        Find the indexed timestamp closest to a target, strictly before a cutoff.
+        
+        Ties go to the later timestamp.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            target (float): Target time in epoch seconds
+            before (float): Only timestamps earlier than this epoch are considered
+        
+        Returns:
+            int or None: Epoch seconds or None if no timestamp qualifies
+        """
+        with self._lock:
+            epochs = self._epochs.get((symbol, expiry), [])
+            
+            hi = bisect_left(epochs, before)
+            if hi == 0:
+                return None
+            
+            pos = bisect_left(epochs, target, 0, hi)
+            candidates = [i for i in (pos - 1, pos) if 0 <= i < hi]
+            best = min(reversed(candidates), key=lambda i: abs(epochs[i] - target))
+            
+            return epochs[best]
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_timestamp_index(db_file):
+    """
+    Get the process-wide timestamp index for a database file.
+    
+    Args:
+        db_file (str): Path to database file
+    
+    Returns:
+        TimestampIndex: Shared index for that database
+    """
+    key = os.path.abspath(db_file)
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = TimestampIndex()
+        return _indexes[key]
@@ -0,0 +1,286 @@
+"""
+Background group-commit writer for NIFTY Options Dashboard.
+"""
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+
+import pandas as pd
+
+from config.settings import DATABASE
+from utils.metrics import LatencyRecorder, format_latency
+
+logger = logging.getLogger(__name__)
+
+# Queue item kinds
+_SNAPSHOT = 'snapshot'
+_OI_CHANGES = 'oi_changes'
+_TASK = 'task'
+_STOP = 'stop'
+
+class BackgroundWriter:
+    """
+    Write-behind queue that commits snapshots and OI changes on a dedicated thread.
+    
+    Pending writes are grouped so one transaction commits many of them. The
+    queue is bounded: when it is full, submitters block for up to
+    put_timeout seconds before the write is dropped. Everything still queued
+    is flushed on close(), which also runs at interpreter exit.
+    """
+    
+    def __init__(self, db, max_queue=None, batch_size=None, max_wait_ms=None, put_timeout=None):
+        """
+        Initialize and start the writer thread.
+        
+        Args:
+            db (DatabaseManager): Database to write to
+            max_queue (int, optional): Queue depth limit
+            batch_size (int, optional): Most queued writes per commit
+            max_wait_ms (int, optional): Time to wait for a batch to fill
+            put_timeout (float, optional): Seconds to block on a full queue
+        
+        Unset options use DATABASE["writer"] from settings.
+        """
+        settings = DATABASE["writer"]
+        self.db = db
+        self.batch_size = batch_size or settings["batch_size"]
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings["max_wait_ms"]) / 1000
+        self.put_timeout = put_timeout if put_timeout is not None else settings["put_timeout"]
+        
+        self._queue = queue.Queue(maxsize=max_queue or settings["max_queue"])
+        self._pending = 0
+        self._pending_cv = threading.Condition()
+        
+        self.commit_latency = LatencyRecorder()
+        self._counters = {
+            'batches': 0,
+            'snapshots': 0,
+            'oi_change_rows': 0,
+            'tasks': 0,
+            'dropped': 0,
+            'failed': 0,
+        }
+        self._counters_lock = threading.Lock()
+        
+        # Held from the closed check to the put, and by close() around the
+        # stop item, so no accepted write can land behind it
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def _count(self, name, n=1):
+        with self._counters_lock:
+            self._counters[name] += n
+    
+    def _submit(self, item):
+        """Queue an item, blocking for up to put_timeout when the queue is full."""
+        with self._submit_lock:
+            if self._closed:
+                logger.error("Write submitted after the background writer was closed")
+                return False
+        
+            with self._pending_cv:
+                self._pending += 1
+        
+            try:
+                self._queue.put(item, timeout=self.put_timeout)
+                return True
+            except queue.Full:
+                logger.error(f"Write queue full for {self.put_timeout}s, dropping {item[0]} write")
+                self._count('dropped')
+                self._done(1)
+                return False
+    
+    def submit_snapshot(self, data, symbol, expiry, timestamp, source_timestamp=None):
+        """
+        Queue an option chain snapshot for saving.
+        
+        Args:
+            data (pandas.DataFrame): Option chain data
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            timestamp (datetime): Snapshot timestamp
+            source_timestamp (datetime, optional): Time of the identical snapshot
+                to store a marker to (see DatabaseManager.save_option_data)
+        
+        Returns:
+            bool: True if queued, False if dropped
+        """
+        return self._submit((_SNAPSHOT, (data, symbol, expiry, timestamp, source_timestamp)))
+    
+    def submit_oi_changes(self, changes_df):
+        """
+        Queue calculated OI changes for saving.
+        
+        Args:
+            changes_df (pandas.DataFrame): OI changes, as for DatabaseManager.save_oi_changes
+        
+        Returns:
+            bool: True if queued, False if dropped
+        """
+        if changes_df is None or changes_df.empty:
+            return False
+        return self._submit((_OI_CHANGES, changes_df))
+    
+    def submit_task(self, func, *args, **kwargs):
+        """
+        Queue a non-database write (such as a snapshot file) to run after the next commit.
+        
+        Returns:
+            bool: True if queued, False if dropped
+        """
+        return self._submit((_TASK, (func, args, kwargs)))
+    
+    def _done(self, n):
+        """Mark n queued writes as finished."""
+        with self._pending_cv:
+            self._pending -= n
+            if self._pending <= 0:
+                self._pending_cv.notify_all()
+    
+    def _next_batch(self):
+        """Block for the next item, then gather more for up to max_wait seconds."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        
+        while len(batch) < self.batch_size and batch[-1][0] != _STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        return batch
+    
+    def _run(self):
+        """Writer thread main loop."""
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1][0] == _STOP
+            items = batch[:-1] if stop else batch
+            
+            try:
+                self._write_batch(items)
+            except Exception as e:
+                self._count('failed', len(items))
+                logger.error(f"Background write failed: {str(e)}", exc_info=True)
+            finally:
+                self._done(len(items))
+            
+            if stop:
+                break
+    
+    def _write_batch(self, items):
+        """Commit one group of queued writes."""
+        snapshots = [payload for kind, payload in items if kind == _SNAPSHOT]
+        changes = [payload for kind, payload in items if kind == _OI_CHANGES]
+        tasks = [payload for kind, payload in items if kind == _TASK]
+        
+        started = time.perf_counter()
+        
+        if snapshots:
+            stats = self.db.bulk_save_option_data(snapshots)
+            if stats['success']:
+                self._count('snapshots', stats['snapshots'])
+            else:
+                self._count('failed', len(snapshots))
+        
+        if changes:
+            changes_df = pd.concat(changes, ignore_index=True)
+            if self.db.save_oi_changes(changes_df):
+                self._count('oi_change_rows', len(changes_df))
+            else:
+                self._count('failed', len(changes))
+        
+        if snapshots or changes:
+            self.commit_latency.record(time.perf_counter() - started)
+            self._count('batches')
+        
+        for func, args, kwargs in tasks:
+            try:
+                func(*args, **kwargs)
+                self._count('tasks')
+            except Exception as e:
+                self._count('failed')
+                logger.error(f"Background task {getattr(func, '__name__', func)} failed: {str(e)}")
+    
+    def flush(self, timeout=None):
+        """
+        Wait until every write queued so far has been processed.
+        
+        Args:
+            timeout (float, optional): Seconds to wait. If None, wait indefinitely.
+        
+        Returns:
+            bool: True if the queue drained, False on timeout
+        """
+        with self._pending_cv:
+            return self._pending_cv.wait_for(lambda: self._pending <= 0, timeout=timeout)
+    
+    def close(self, timeout=None):
+        """
+        Flush pending writes and stop the writer thread.
+        
+        Args:
+            timeout (float, optional): Seconds to wait for the flush
+        """
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((_STOP, None))
+        
+        self._thread.join(timeout)
+        
+        if self._thread.is_alive():
+            logger.error("Background writer did not finish flushing before shutdown")
+        else:
+            logger.info(f"Background writer closed: {self.metrics()}")
+    
+    def metrics(self):
+        """
+        Current writer metrics.
+        
+        Returns:
+            dict: queue_depth, max_queue, pending, counters and commit_latency summary
+        """
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {
+            'queue_depth': self._queue.qsize(),
+            'max_queue': self._queue.maxsize,
+            'pending': self._pending,
+            **counters,
+            'commit_latency': self.commit_latency.snapshot(),
+        }
+    
+    def log_metrics(self):
+        """Log a one-line metrics summary."""
+        m = self.metrics()
+        logger.info(f"Writer: queue {m['queue_depth']}/{m['max_queue']}, {m['batches']} commits, "
+                    f"{m['snapshots']} snapshots, {m['dropped']} dropped, {m['failed']} failed, "
+                    f"commit latency {format_latency(m['commit_latency'])}")
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_background_writer(db):
+    """
+    Get the process-wide background writer for a database.
+    
+    Args:
+        db (DatabaseManager): Database to write to
+    
+    Returns:
+        BackgroundWriter: Shared writer for that database file
+    """
+    key = os.path.abspath(db.db_file)
+    with _writers_lock:
+        if key not in _writers:
+            _writers[key] = BackgroundWriter(db)
+        return _writers[key]
@@ -4,75 +4,98 @@ Main entry point for the NIFTY Options Dashboard application.
 import os
 import logging
 import argparse
-import time
 from threading import Thread
-from datetime import datetime
 
 import streamlit.web.bootstrap as bootstrap
 from streamlit.config import get_config_options
 
 # Import our modules
 from data_collection.connector import DataCollectionConnector
+from data_collection.streaming import StreamingCollector
 from database.db_manager import DatabaseManager
-from utils.helpers import setup_logging, is_trading_hours
+from utils.helpers import setup_logging
+from utils.schedule import CollectionScheduler
 from config.settings import PATHS, DATA_COLLECTION
 
 # Set up logging
 logger = setup_logging()
 
-def run_data_collection(symbol, expiry, interval_minutes=None, end_time=None):
+def run_data_collection(targets, interval_minutes=None, end_time=None, interval_seconds=None, source="poll"):
     """
     Run data collection process.
     
     Args:
-        symbol (str): Symbol to collect data for
-        expiry (str): Expiry date
+        targets (list): (symbol, expiry) tuples collected concurrently each cycle
         interval_minutes (int, optional): Collection interval in minutes
         end_time (str, optional): End time in HH:MM format
+        interval_seconds (int, optional): High-frequency collection interval in
+            seconds; snapshots are then saved to the database every interval_minutes
+        source (str): "poll" fetches each snapshot from the option chain API;
+            "stream" keeps a live chain from the WebSocket feed and snapshots it
     """
-    logger.info(f"Starting data collection for {symbol} with expiry {expiry}")
+    logger.info(f"Starting data collection for {', '.join(f'{s} {e}' for s, e in targets)}")
     
     # Use default interval if not provided
     if interval_minutes is None:
         interval_minutes = DATA_COLLECTION["interval_minutes"]
     
-    # Create connector
-    connector = DataCollectionConnector()
+    interval_seconds = interval_seconds or DATA_COLLECTION.get("interval_seconds")
+    
+    # Create connector; the interval is passed in rather than written to
+    # DATA_COLLECTION, which the dashboard reads in --mode both
+    if interval_seconds:
+        logger.info(f"High-frequency mode: collecting every {interval_seconds}s, "
+                    f"saving to the database every {interval_minutes} minutes")
+        connector = DataCollectionConnector(
+            persist_interval_seconds=interval_minutes * 60,
+            interval_seconds=interval_seconds
+        )
+    else:
+        connector = DataCollectionConnector(interval_seconds=interval_minutes * 60)
+    
+    scheduler = CollectionScheduler(
+        connector.interval_seconds,
+        throttle=connector.collector.limiter.throttle
+    )
     
     # Create data directory
     os.makedirs(PATHS["data_folder"], exist_ok=True)
     
-    try:
-        while True:
-            # Check if within trading hours
-            if is_trading_hours():
-                logger.info("Collecting data...")
-                
-                # Collect and store data
-                data, filepath, success = connector.collect_and_store(symbol, expiry)
-                
-                if success and data is not None:
-                    logger.info(f"Successfully collected data with {len(data)} rows")
-                else:
-                    logger.error("Failed to collect or save data")
+    stream = None
+    if source == "stream":
+        stream = StreamingCollector(targets).start()
+        logger.info(f"Snapshotting the live feed {stream.url}")
+    
+    def collect(fire_time):
+        logger.info("Collecting data...")
+        
+        # Collect and store data for all targets
+        if stream is not None:
+            results = connector.collect_from_stream(stream, targets)
+        else:
+            results = connector.collect_and_store_many(targets)
+        
+        for (symbol, expiry), (data, filepath, success) in results.items():
+            if success and data is not None:
+                logger.info(f"Successfully collected {symbol} {expiry} with {len(data)} rows")
             else:
-                logger.info("Outside trading hours. Waiting for next check...")
-                # Sleep for a longer period outside trading hours
-                time.sleep(3600)  # 1 hour
-                continue
-            
-            # Check if we should stop
-            if end_time:
-                now = datetime.now()
-                end_hour, end_minute = map(int, end_time.split(':'))
-                
-                if now.hour > end_hour or (now.hour == end_hour and now.minute >= end_minute):
-                    logger.info(f"Reached end time {end_time}. Stopping collection.")
-                    break
-            
-            # Sleep until next collection
-            logger.info(f"Sleeping for {interval_minutes} minutes until next collection...")
-            time.sleep(interval_minutes * 60)
+                logger.error(f"Failed to collect or save data for {symbol} {expiry}")
+        
+        connector.writer.log_metrics()
+        if stream is not None:
+            logger.info(f"Stream: {stream.metrics()}")
+        else:
+            connector.collector.fetcher.log_metrics()
+            connector.collector.fetcher.export_metrics()
+        
+        # Check if we should stop
+        if end_time and fire_time.strftime('%H:%M') >= end_time.zfill(5):
+            logger.info(f"Reached end time {end_time}. Stopping collection.")
+            scheduler.stop()
+    
+    try:
+        # Fires on wall-clock boundaries and sleeps to the exact market open
+        scheduler.run(collect)
     
     except KeyboardInterrupt:
         logger.info("Data collection stopped by user")
@@ -80,6 +103,11 @@ def run_data_collection(symbol, expiry, interval_minutes=None, end_time=None):
         logger.critical(f"Data collection crashed: {str(e)}", exc_info=True)
         # In production, you might want to add notification here
         raise
+    finally:
+        if stream is not None:
+            stream.stop()
+        # Commit anything still queued before exiting
+        connector.writer.close()
 
 def run_dashboard():
     """Run the Streamlit dashboard."""
@@ -116,29 +144,58 @@ def main():
         help="Expiry date (DD-MM-YYYY)"
     )
     
+    parser.add_argument(
+        "--target",
+        action="append",
+        metavar="SYMBOL:EXPIRY",
+        help="Symbol and expiry to collect, e.g. BANKNIFTY:29-05-2025 (repeatable; overrides --symbol/--expiry)"
+    )
+    
     parser.add_argument(
         "--interval",
         type=int,
         help=f"Collection interval in minutes (default: {DATA_COLLECTION['interval_minutes']})"
     )
     
+    parser.add_argument(
+        "--interval-seconds",
+        type=int,
+        help="High-frequency mode: collection interval in seconds (10-30); the database keeps one snapshot per --interval"
+    )
+    
     parser.add_argument(
         "--end-time",
         help="End time for data collection (HH:MM)"
     )
     
+    parser.add_argument(
+        "--source",
+        choices=["poll", "stream"],
+        default="poll",
+        help="Poll the option chain API each cycle, or snapshot a live WebSocket feed (STREAMING['url'])"
+    )
+    
     args = parser.parse_args()
     
     # Run in the specified mode
     if args.mode in ["collection", "both"]:
-        if not args.expiry:
-            parser.error("--expiry is required for data collection")
+        if args.target:
+            try:
+                targets = [tuple(target.split(":", 1)) for target in args.target]
+                if any(not symbol or not expiry for symbol, expiry in targets):
+                    raise ValueError
+            except ValueError:
+                parser.error("--target must be SYMBOL:EXPIRY")
+        elif args.expiry:
+            targets = [(args.symbol, args.expiry)]
+        else:
+            parser.error("--expiry or --target is required for data collection")
         
         if args.mode == "both":
             # Start data collection in a separate thread
             collection_thread = Thread(
                 target=run_data_collection,
-                args=(args.symbol, args.expiry, args.interval, args.end_time),
+                args=(targets, args.interval, args.end_time, args.interval_seconds, args.source),
                 daemon=True
             )
             collection_thread.start()
@@ -147,7 +204,7 @@ def main():
             run_dashboard()
         else:
             # Run data collection in main thread
-            run_data_collection(args.symbol, args.expiry, args.interval, args.end_time)
+            run_data_collection(targets, args.interval, args.end_time, args.interval_seconds, args.source)
     
     elif args.mode == "dashboard":
         # Run dashboard only
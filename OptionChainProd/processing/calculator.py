@@ -5,7 +5,11 @@ import pandas as pd
 import logging
 from datetime import datetime, timedelta
 from database.db_manager import DatabaseManager
+from database.writer import get_background_writer
+from processing.oi_engine import compute_oi_changes
+from processing.snapshot_buffer import get_snapshot_buffer
 from config.settings import DATA_COLLECTION
+from utils.helpers import to_ist
 
 logger = logging.getLogger(__name__)
 
@@ -14,9 +18,17 @@ class OptionMetricsCalculator:
     Calculator for option metrics and OI changes.
     """
     
-    def __init__(self):
-        """Initialize the calculator."""
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        """
+        Initialize the calculator.
+        
+        Args:
+            db (DatabaseManager, optional): Database to read from and write to.
+                If None, use the default database.
+        """
+        self.db = db or DatabaseManager()
+        self.buffer = get_snapshot_buffer()
+        self.writer = get_background_writer(self.db)
     
     def calculate_oi_changes(self, symbol, expiry, current_data=None):
         """
@@ -31,9 +43,6 @@ class OptionMetricsCalculator:
         Returns:
             pandas.DataFrame: Calculated OI changes
         """
-        import pytz
-        ist = pytz.timezone('Asia/Kolkata')
-        
         # Get current data if not provided
         if current_data is None:
             current_data = self.db.get_latest_option_data(symbol, expiry)
@@ -42,59 +51,43 @@ class OptionMetricsCalculator:
             logger.error("No current data available for OI change calculation")
             return pd.DataFrame()
         
-        # Get current timestamp
-        current_timestamp = pd.to_datetime(current_data['timestamp'].iloc[0])
+        # Get current timestamp (timezone-aware IST)
+        current_timestamp = to_ist(current_data['timestamp'].iloc[0])
         
-        # Ensure current_timestamp is timezone-aware
-        if current_timestamp.tz is None:
-            current_timestamp = ist.localize(current_timestamp)
-        else:
-            current_timestamp = current_timestamp.astimezone(ist)
+        # Use the in-memory snapshot buffer when it already holds this snapshot
+        # and reaches back to the longest interval
+        if (self.buffer.is_warm(symbol, expiry) and self.buffer.has_snapshot(symbol, expiry, current_timestamp)
+                and self.buffer.covers(symbol, expiry, current_timestamp)):
+            logger.info(f"Calculating OI changes for {symbol} {expiry} from snapshot buffer")
+            return self.buffer.oi_changes(symbol, expiry, current_timestamp)
         
-        # Get all available timestamps from database
-        db_timestamps = self.db.get_timestamps(symbol, expiry)
+        # Past snapshots to compare against, one per interval
+        past_snapshots = []
         
-        if not db_timestamps:
-            logger.error("No timestamps available for OI change calculation")
-            return pd.DataFrame()
-        
-        # Convert string timestamps to timezone-aware datetime objects
-        all_timestamps = []
-        for ts_str in db_timestamps:
-            dt = pd.to_datetime(ts_str)
-            # Make timezone-aware if not already
-            if dt.tz is None:
-                dt = ist.localize(dt)
-            else:
-                dt = dt.astimezone(ist)
-            all_timestamps.append(dt)
-        
-        # Initialize results dataframe
-        results = []
-        
-        # Calculate OI changes for each interval
+        # Find the past snapshot for each interval
         for interval_minutes in DATA_COLLECTION["analysis_intervals"]:
             # Calculate target timestamp (approximately)
             target_timestamp = current_timestamp - timedelta(minutes=interval_minutes)
             
-            # Find timestamps before current timestamp
-            past_timestamps = [ts for ts in all_timestamps if ts < current_timestamp]
+            # Find the closest timestamp before the current one
+            closest = self.db.get_nearest_timestamp(
+                symbol,
+                expiry,
+                target_timestamp,
+                before=current_timestamp
+            )
             
-            if not past_timestamps:
+            if closest is None:
                 logger.warning(f"No past data found for {interval_minutes} minute interval")
                 continue
             
-            # Find closest timestamp
-            closest_timestamp = min(
-                past_timestamps,
-                key=lambda x: abs((x - target_timestamp).total_seconds())
-            )
+            closest_timestamp = to_ist(closest)
             
             # Get data for the closest timestamp
             past_data = self.db.get_option_data_by_timestamp(
                 symbol, 
                 expiry, 
-                closest_timestamp
+                closest
             )
             
             if past_data.empty:
@@ -107,50 +100,18 @@ class OptionMetricsCalculator:
             logger.info(f"Calculating changes for requested {interval_minutes}min interval "
                        f"(actual: {actual_interval}min, {closest_timestamp})")
             
-            # Merge current and past data
-            merged = pd.merge(
-                current_data, 
-                past_data,
-                on='strike', 
-                suffixes=('_current', '_past')
-            )
-            
-            # Calculate OI changes
-            for _, row in merged.iterrows():
-                # Calculate CE OI change
-                try:
-                    ce_oi_change = row['call_oi_current'] - row['call_oi_past']
-                    if pd.isna(ce_oi_change):
-                        ce_oi_change = 0
-                except (KeyError, TypeError):
-                    ce_oi_change = 0
-                
-                # Calculate PE OI change
-                try:
-                    pe_oi_change = row['put_oi_current'] - row['put_oi_past']
-                    if pd.isna(pe_oi_change):
-                        pe_oi_change = 0
-                except (KeyError, TypeError):
-                    pe_oi_change = 0
-                
-                # Add to results
-                results.append({
-                    'timestamp': current_timestamp,
-                    'symbol': symbol,
-                    'expiry': expiry,
-                    'strike': row['strike'],
-                    'interval': actual_interval,
-                    'ce_oi_change': ce_oi_change,
-                    'pe_oi_change': pe_oi_change
-                })
-        
-        # Convert to DataFrame
-        return pd.DataFrame(results)
+            past_snapshots.append((actual_interval, past_data))
+        
+        # Calculate CE/PE OI changes for all intervals at once
+        return compute_oi_changes(current_data, past_snapshots, current_timestamp, symbol, expiry)
         
     def process_latest_data(self, symbol, expiry, currently_trading, range_limit, highlight_limit):
         """
         Process the latest data and prepare for dashboard.
         
+        User settings are not saved here; the dashboard saves them when a
+        session changes its inputs.
+        
         Args:
             symbol (str): Symbol name
             expiry (str): Expiry date
@@ -175,9 +136,9 @@ class OptionMetricsCalculator:
         # Calculate OI changes
         oi_changes = self.calculate_oi_changes(symbol, expiry, latest_data)
         
-        # Save OI changes to database
+        # Save OI changes to database off the request path
         if not oi_changes.empty:
-            self.db.save_oi_changes(oi_changes)
+            self.writer.submit_oi_changes(oi_changes)
         
         # Filter strikes by range
         filtered_data = self.filter_strikes_by_range(
@@ -210,15 +171,6 @@ class OptionMetricsCalculator:
             highlight_limit
         )
         
-        # Save user settings
-        self.db.save_user_settings({
-            'symbol': symbol,
-            'expiry': expiry,
-            'currently_trading': currently_trading,
-            'range_limit': range_limit,
-            'highlight_limit': highlight_limit
-        })
-        
         # Prepare data for dashboard
         dashboard_data = self._prepare_dashboard_data(
             filtered_data,
@@ -290,6 +242,24 @@ class OptionMetricsCalculator:
         Returns:
             dict: Dashboard data
         """
+        dashboard_df = self.prepare_dashboard_frame(option_data, oi_changes, highlight_min, highlight_max)
+        
+        # Format for dashboard
+        return dashboard_df.to_dict(orient='records')
+    
+    def prepare_dashboard_frame(self, option_data, oi_changes, highlight_min, highlight_max):
+        """
+        Build the dashboard table: one row per strike with highlight flag and OI changes.
+        
+        Args:
+            option_data (pandas.DataFrame): Option data
+            oi_changes (pandas.DataFrame): OI changes
+            highlight_min (float): Lower bound for highlighting
+            highlight_max (float): Upper bound for highlighting
+            
+        Returns:
+            pandas.DataFrame: Columns strike, highlight, then ce_/pe_ changes per interval
+        """
         # Start with strikes from option_data
         dashboard_df = option_data[['strike']].copy()
         
@@ -299,40 +269,28 @@ class OptionMetricsCalculator:
             (dashboard_df['strike'] <= highlight_max)
         )
         
-        # Initialize OI change columns with N/A (for when market is closed or insufficient data)
+        # Initialize OI change columns with N/A (for when market is closed or insufficient data);
+        # object dtype, so integer changes can replace it
         for interval in [5, 10, 15]:
-            dashboard_df[f'ce_{interval}min'] = "N/A"
-            dashboard_df[f'pe_{interval}min'] = "N/A"
+            dashboard_df[f'ce_{interval}min'] = pd.Series("N/A", index=dashboard_df.index, dtype=object)
+            dashboard_df[f'pe_{interval}min'] = pd.Series("N/A", index=dashboard_df.index, dtype=object)
         
         # If we have OI changes data, populate the columns
         if not oi_changes.empty:
-            # Handle duplicate strike/interval combinations by aggregating first
-            ce_pivot_df = oi_changes.groupby(['strike', 'interval'])['ce_oi_change'].mean().reset_index()
-            pe_pivot_df = oi_changes.groupby(['strike', 'interval'])['pe_oi_change'].mean().reset_index()
+            for side in ['ce', 'pe']:
+                # Handle duplicate strike/interval combinations by aggregating first
+                means = oi_changes.groupby(['strike', 'interval'])[f'{side}_oi_change'].mean()
+                intervals = means.index.get_level_values('interval').astype(int)
             
-            # Populate CE columns
-            for _, row in ce_pivot_df.iterrows():
-                strike = row['strike']
-                interval = int(row['interval'])
-                change = int(row['ce_oi_change'])
+                # Only intervals we're tracking (5, 10, 15)
+                for interval in [5, 10, 15]:
+                    changes = means[intervals == interval].droplevel('interval')
+                    if changes.empty:
+                        continue
                 
-                # Only update if this interval is one we're tracking (5, 10, 15)
-                if interval in [5, 10, 15]:
-                    mask = dashboard_df['strike'] == strike
-                    if mask.any():
-                        dashboard_df.loc[mask, f'ce_{interval}min'] = change
+                    changes = pd.Series([int(change) for change in changes], index=changes.index, dtype=object)
+                    values = dashboard_df['strike'].map(changes)
+                    present = values.notna()
+                    dashboard_df.loc[present, f'{side}_{interval}min'] = values[present]
             
-            # Populate PE columns
-            for _, row in pe_pivot_df.iterrows():
-                strike = row['strike']
-                interval = int(row['interval'])
-                change = int(row['pe_oi_change'])
-                
-                # Only update if this interval is one we're tracking (5, 10, 15)
-                if interval in [5, 10, 15]:
-                    mask = dashboard_df['strike'] == strike
-                    if mask.any():
-                        dashboard_df.loc[mask, f'pe_{interval}min'] = change
-        
-        # Format for dashboard
-        return dashboard_df.to_dict(orient='records')
+        return dashboard_df
@@ -0,0 +1,48 @@
+"""
+Downsampling of high-frequency snapshots to the base collection interval.
+"""
+import threading
+
+from config.settings import DATA_COLLECTION
+from utils.helpers import to_ist
+
+class Downsampler:
+    """
+    Picks the first snapshot of each base-interval bucket for persistence.
+    
+    In high-frequency mode every snapshot goes to the snapshot archive, but
+    only one per interval_minutes bucket is saved to the database and the
+    in-memory buffer, so stored history (and the 5/10/15/30-minute analysis
+    on top of it) keeps its usual granularity.
+    """
+    
+    def __init__(self, bucket_seconds=None):
+        """
+        Initialize the downsampler.
+        
+        Args:
+            bucket_seconds (int, optional): Bucket size. If None, use DATA_COLLECTION["interval_minutes"].
+        """
+        self.bucket_seconds = bucket_seconds or DATA_COLLECTION["interval_minutes"] * 60
+        self._last_bucket = {}
+        self._lock = threading.Lock()
+    
+    def should_persist(self, symbol, expiry, timestamp):
+        """
+        Check whether a snapshot is the first of its bucket (and claim the bucket if so).
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            timestamp (datetime): Snapshot time
+        
+        Returns:
+            bool: True if the snapshot should be saved to the database
+        """
+        bucket = int(to_ist(timestamp).timestamp() // self.bucket_seconds)
+        
+        with self._lock:
+            if self._last_bucket.get((symbol, expiry), -1) >= bucket:
+                return False
+            self._last_bucket[(symbol, expiry)] = bucket
+            return True
@@ -0,0 +1,125 @@
+"""
+Vectorized OI change engine for NIFTY Options Dashboard.
+"""
+import numpy as np
+import pandas as pd
+
+OI_CHANGE_COLUMNS = ['timestamp', 'symbol', 'expiry', 'strike', 'interval', 'ce_oi_change', 'pe_oi_change']
+
+def _oi_values(df, column):
+    """
+    Get an OI column as float64 values.
+    
+    Args:
+        df (pandas.DataFrame): Option data
+        column (str): OI column name
+    
+    Returns:
+        tuple: (float64 array or None if the column is missing, whether the column is integer typed)
+    """
+    if column not in df.columns:
+        return None, True
+    
+    values = df[column]
+    is_int = pd.api.types.is_integer_dtype(values.dtype)
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan), is_int
+
+def _interval_deltas(current, pasts, column, indexers):
+    """
+    Compute OI deltas for one column across every past snapshot at once.
+    
+    Args:
+        current (pandas.DataFrame): Current option data
+        pasts (list): Past option data frames, one per interval
+        column (str): OI column name
+        indexers (numpy.ndarray): (intervals, strikes) positions of each current
+            strike in the matching past frame, -1 where the strike is absent
+    
+    Returns:
+        tuple: (deltas array shaped like indexers with NaN replaced by 0,
+            per-interval flags telling whether the delta is float typed)
+    """
+    shape = indexers.shape
+    current_values, current_is_int = _oi_values(current, column)
+    
+    if current_values is None:
+        return np.zeros(shape), np.zeros(shape[0], dtype=bool)
+    
+    past_values = np.full(shape, np.nan)
+    is_float = np.zeros(shape[0], dtype=bool)
+    
+    for i, past in enumerate(pasts):
+        values, past_is_int = _oi_values(past, column)
+        if values is None:
+            # A missing column in the past snapshot means no change can be computed
+            past_values[i] = np.nan
+            continue
+        
+        found = indexers[i] >= 0
+        past_values[i, found] = values[indexers[i, found]]
+        is_float[i] = not (current_is_int and past_is_int)
+    
+    deltas = current_values[np.newaxis, :] - past_values
+    missing = np.isnan(deltas)
+    
+    # A NaN delta becomes an integer 0, so only surviving values keep the float type
+    is_float = is_float & (~missing).any(axis=1)
+    deltas[missing] = 0
+    
+    return deltas, is_float
+
+def _typed(values, is_float):
+    """Return deltas as float64 if any surviving delta is a float, else int64."""
+    return values if is_float else values.astype(np.int64)
+
+def compute_oi_changes(current_data, past_snapshots, timestamp, symbol, expiry):
+    """
+    Compute CE/PE OI changes of the current snapshot against several past snapshots.
+    
+    All past snapshots are aligned on the current snapshot's strikes and the
+    deltas for every interval are computed in a single array operation. The
+    result matches an inner merge on strike per interval, in current strike
+    order, with missing or NaN deltas reported as 0.
+    
+    Args:
+        current_data (pandas.DataFrame): Current option data
+        past_snapshots (list): (interval in minutes, past option data) tuples
+        timestamp (datetime): Timestamp of the current snapshot
+        symbol (str): Symbol name
+        expiry (str): Expiry date
+    
+    Returns:
+        pandas.DataFrame: OI changes with OI_CHANGE_COLUMNS
+    """
+    if current_data.empty or not past_snapshots:
+        return pd.DataFrame()
+    
+    intervals = [interval for interval, _ in past_snapshots]
+    pasts = [past.drop_duplicates('strike', keep='last') for _, past in past_snapshots]
+    
+    strikes = current_data['strike'].to_numpy()
+    indexers = np.vstack([
+        pd.Index(past['strike']).get_indexer(strikes) for past in pasts
+    ])
+    present = indexers >= 0
+    
+    ce_deltas, ce_is_float = _interval_deltas(current_data, pasts, 'call_oi', indexers)
+    pe_deltas, pe_is_float = _interval_deltas(current_data, pasts, 'put_oi', indexers)
+    
+    # Flatten interval-major so rows come out grouped by interval, like the merge loop
+    row_strikes = np.broadcast_to(strikes, present.shape)[present]
+    row_intervals = np.repeat(np.asarray(intervals, dtype=np.int64), present.sum(axis=1))
+    n_rows = len(row_strikes)
+    
+    if n_rows == 0:
+        return pd.DataFrame()
+    
+    return pd.DataFrame({
+        'timestamp': [timestamp] * n_rows,
+        'symbol': [symbol] * n_rows,
+        'expiry': [expiry] * n_rows,
+        'strike': row_strikes,
+        'interval': row_intervals,
+        'ce_oi_change': _typed(ce_deltas[present], ce_is_float.any()),
+        'pe_oi_change': _typed(pe_deltas[present], pe_is_float.any()),
+    })
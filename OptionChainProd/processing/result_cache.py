@@ -0,0 +1,181 @@
+"""
+Shared dashboard results for NIFTY Options Dashboard.
+
+The OI changes and full-chain dashboard table of a snapshot are computed
+once per process, however many sessions view it: concurrent requests for
+the same snapshot share one computation (single-flight), and finished
+results are kept in an LRU keyed by (symbol, expiry, snapshot timestamp).
+Each viewer's range and highlight are applied as a cheap row filter on top.
+"""
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+
+from config.settings import DASHBOARD
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Everything about one snapshot that does not depend on the viewer
+ChainResult = namedtuple('ChainResult', ['symbol', 'expiry', 'timestamp', 'table'])
+
+class ResultCache:
+    """
+    Process-wide, snapshot-keyed cache of full-chain dashboard results.
+    """
+    
+    def __init__(self, calculator, capacity=None):
+        """
+        Initialize the cache.
+        
+        Args:
+            calculator (OptionMetricsCalculator): Computes OI changes and tables
+            capacity (int, optional): Snapshots kept. If None, use the value from settings.
+        """
+        self.calculator = calculator
+        self.db = calculator.db
+        self.capacity = capacity or DASHBOARD["result_cache_entries"]
+        self.flights = SingleFlight()
+        self.stats = {'computations': 0, 'hits': 0, 'shared': 0, 'evictions': 0}
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def latest_timestamp(self, symbol, expiry):
+        """
+        Get the latest snapshot timestamp, from the notifier when it is watching.
+        
+        Returns:
+            str or None: Timestamp string or None if there is no data
+        """
+        if self.db.notifier.is_watching():
+            event = self.db.notifier.latest(symbol, expiry)
+            if event is not None:
+                return event.timestamp
+        return self.db.get_latest_timestamp(symbol, expiry)
+    
+    def get(self, symbol, expiry, timestamp):
+        """
+        Get the full-chain result for a snapshot, computing it at most once.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            timestamp (str): Snapshot timestamp
+        
+        Returns:
+            ChainResult or None: None if the snapshot has no data
+        """
+        key = (symbol, expiry, timestamp)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.stats['hits'] += 1
+                return result
+        
+        result, shared = self.flights.do(key, lambda: self._compute(symbol, expiry, timestamp))
+        if shared:
+            with self._lock:
+                self.stats['shared'] += 1
+        return result
+    
+    def _compute(self, symbol, expiry, timestamp):
+        """Compute and store the result for one snapshot (run by one caller per key)."""
+        data = self.db.get_option_data_by_timestamp(symbol, expiry, timestamp)
+        if data.empty:
+            logger.error(f"No data for {symbol} {expiry} at {timestamp}")
+            return None
+        
+        oi_changes = self.calculator.calculate_oi_changes(symbol, expiry, data)
+        
+        # Saved once per snapshot, not once per viewer
+        if not oi_changes.empty:
+            self.calculator.writer.submit_oi_changes(oi_changes)
+        
+        # The whole chain, unhighlighted; viewers filter rows and set the highlight
+        table = self.calculator.prepare_dashboard_frame(data, oi_changes, float('inf'), float('-inf'))
+        result = ChainResult(symbol, expiry, data['timestamp'].iloc[0], table)
+        
+        with self._lock:
+            self.stats['computations'] += 1
+            self._results[(symbol, expiry, timestamp)] = result
+            while len(self._results) > self.capacity:
+                self._results.popitem(last=False)
+                self.stats['evictions'] += 1
+        
+        logger.info(f"Computed dashboard result for {symbol} {expiry} at {timestamp}")
+        return result
+    
+    def view(self, symbol, expiry, currently_trading, range_limit, highlight_limit, timestamp=None):
+        """
+        Get one viewer's dashboard payload for a snapshot.
+        
+        Nothing is written: the dashboard saves user settings itself when a
+        session changes its inputs.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            currently_trading (float): Current trading value
+            range_limit (float): Range limit for filtering
+            highlight_limit (float): Highlight limit
+            timestamp (str, optional): Snapshot timestamp. If None, use the latest.
+        
+        Returns:
+            dict: Processed data for dashboard, as from process_latest_data
+        """
+        if timestamp is None:
+            timestamp = self.latest_timestamp(symbol, expiry)
+        
+        result = self.get(symbol, expiry, timestamp) if timestamp is not None else None
+        if result is None:
+            return {
+                'success': False,
+                'message': 'No data available',
+                'data': None
+            }
+        
+        table = result.table
+        rows = table[(table['strike'] >= currently_trading - range_limit) &
+                     (table['strike'] <= currently_trading + range_limit)]
+        
+        if rows.empty:
+            logger.warning(f"No data in range {currently_trading}±{range_limit}")
+            return {
+                'success': False,
+                'message': f'No data in range {currently_trading}±{range_limit}',
+                'data': None
+            }
+        
+        highlight_min, highlight_max = self.calculator.get_highlight_range(
+            rows['strike'].min(),
+            rows['strike'].max(),
+            highlight_limit
+        )
+        rows = rows.assign(highlight=(rows['strike'] >= highlight_min) & (rows['strike'] <= highlight_max))
+        
+        return {
+            'success': True,
+            'message': 'Data processed successfully',
+            'timestamp': result.timestamp,
+            'data': rows.to_dict(orient='records')
+        }
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_result_cache(calculator):
+    """
+    Get the process-wide result cache, created with the first calculator passed in.
+    
+    Args:
+        calculator (OptionMetricsCalculator): Calculator to compute results with
+    
+    Returns:
+        ResultCache: Shared cache
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResultCache(calculator)
+        return _shared_cache
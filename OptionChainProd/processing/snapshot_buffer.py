@@ -0,0 +1,293 @@
+"""
+In-memory snapshot ring buffer for incremental OI change calculation.
+"""
+import logging
+import threading
+from collections import deque, namedtuple
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DATA_COLLECTION
+from processing.oi_engine import compute_oi_changes
+from utils.helpers import to_ist, collection_interval_seconds
+
+logger = logging.getLogger(__name__)
+
+# Strike-indexed arrays for one snapshot; call_oi/put_oi keep the source dtype
+Snapshot = namedtuple('Snapshot', ['timestamp', 'strikes', 'call_oi', 'put_oi'])
+
+# Accepted column names for each value, database names first
+_COLUMN_ALIASES = {
+    'call_oi': ('call_oi', 'callOI'),
+    'put_oi': ('put_oi', 'putOI'),
+}
+
+def default_capacity(interval_seconds=None):
+    """
+    Number of snapshots needed to cover the longest analysis interval.
+    
+    Twice the nominal count, so a few missed or irregular collections do not
+    push the target snapshot out of the buffer.
+    
+    Args:
+        interval_seconds (float, optional): Interval between buffered snapshots.
+            If None, use collection_interval_seconds().
+    
+    Returns:
+        int: Buffer capacity per (symbol, expiry)
+    """
+    interval_seconds = interval_seconds or collection_interval_seconds()
+    longest = max(DATA_COLLECTION["analysis_intervals"]) * 60
+    return 2 * int(longest // interval_seconds) + 1
+
+def _column_values(data, name):
+    """
+    Get OI values for a snapshot column, accepting API or database column names.
+    
+    Whole-number float columns without gaps are stored as int64, the same
+    dtype they come back with after a round trip through the database.
+    """
+    for column in _COLUMN_ALIASES[name]:
+        if column in data.columns:
+            values = pd.to_numeric(data[column], errors='coerce').to_numpy()
+            if values.dtype.kind == 'f' and not np.isnan(values).any() and (values == np.trunc(values)).all():
+                values = values.astype(np.int64)
+            return values
+    return None
+
+class SnapshotRingBuffer:
+    """
+    Keeps the last N snapshots per (symbol, expiry) as strike-indexed NumPy arrays.
+    
+    Fed by the data collection connector, so the OI changes of a new snapshot
+    for every configured analysis interval can be computed without any
+    database reads.
+    """
+    
+    def __init__(self, capacity=None):
+        """
+        Initialize the ring buffer.
+        
+        Args:
+            capacity (int, optional): Snapshots kept per (symbol, expiry).
+                If None, derive it from the analysis intervals.
+        """
+        self.capacity = capacity or default_capacity()
+        self._snapshots = {}
+        self._warm = set()
+        # Keys whose buffer holds every stored snapshot (nothing older was left out or evicted)
+        self._complete = set()
+        self._lock = threading.Lock()
+    
+    def ensure_capacity(self, capacity):
+        """
+        Grow the buffer to keep at least this many snapshots per (symbol, expiry).
+        
+        The buffer is shared by the process, so it never shrinks: a collector
+        with a shorter interval than the one it was created for grows it.
+        
+        Args:
+            capacity (int): Snapshots to keep per (symbol, expiry)
+        """
+        with self._lock:
+            if capacity <= self.capacity:
+                return
+            self.capacity = capacity
+            for key, snapshots in self._snapshots.items():
+                self._snapshots[key] = deque(snapshots, maxlen=capacity)
+    
+    def push(self, symbol, expiry, timestamp, data, changed=None):
+        """
+        Add a snapshot to the buffer.
+        
+        Snapshots older than the newest buffered one are ignored.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            timestamp (datetime or str): Snapshot timestamp
+            data (pandas.DataFrame): Option data with strike and call/put OI columns
+            changed (numpy.ndarray, optional): Per-row change mask from the
+                collector's fingerprinting. If no row changed, the previous
+                snapshot's arrays are shared instead of converting the frame.
+        
+        Returns:
+            bool: True if the snapshot was added
+        """
+        if data is None or data.empty or 'strike' not in data.columns:
+            return False
+        
+        # Match the one-second resolution of stored timestamps
+        timestamp = to_ist(timestamp).floor('s')
+        previous = None
+        if changed is not None and not changed.any():
+            with self._lock:
+                snapshots = self._snapshots.get((symbol, expiry))
+                if snapshots and len(snapshots[-1].strikes) == len(data):
+                    previous = snapshots[-1]
+        
+        if previous is not None:
+            snapshot = previous._replace(timestamp=timestamp)
+        else:
+            snapshot = Snapshot(
+                timestamp=timestamp,
+                strikes=pd.to_numeric(data['strike'], errors='coerce').to_numpy(dtype='float64'),
+                call_oi=_column_values(data, 'call_oi'),
+                put_oi=_column_values(data, 'put_oi')
+            )
+        
+        with self._lock:
+            snapshots = self._snapshots.setdefault((symbol, expiry), deque(maxlen=self.capacity))
+            if snapshots and snapshot.timestamp <= snapshots[-1].timestamp:
+                if snapshot.timestamp == snapshots[-1].timestamp:
+                    snapshots[-1] = snapshot
+                    return True
+                return False
+            if len(snapshots) == snapshots.maxlen:
+                self._complete.discard((symbol, expiry))
+            snapshots.append(snapshot)
+        
+        return True
+    
+    def is_warm(self, symbol, expiry):
+        """Check whether the buffer has been loaded for a symbol and expiry."""
+        return (symbol, expiry) in self._warm
+    
+    def warm(self, db, symbol, expiry):
+        """
+        Load the most recent snapshots for a symbol and expiry from the database.
+        
+        Args:
+            db (DatabaseManager): Database to read from
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+        
+        Returns:
+            int: Number of snapshots loaded
+        """
+        timestamps = db.get_timestamps(symbol, expiry, limit=self.capacity)
+        loaded = 0
+        
+        # Oldest first so pushes stay in order
+        for ts in reversed(timestamps):
+            if self.push(symbol, expiry, ts, db.get_option_data_by_timestamp(symbol, expiry, ts)):
+                loaded += 1
+        
+        # With fewer stored snapshots than the capacity, the buffer holds them all
+        if len(timestamps) < self.capacity and loaded == len(timestamps):
+            with self._lock:
+                self._complete.add((symbol, expiry))
+        
+        self._warm.add((symbol, expiry))
+        logger.info(f"Snapshot buffer warmed with {loaded} snapshots for {symbol} {expiry}")
+        return loaded
+    
+    def latest_timestamp(self, symbol, expiry):
+        """Get the timestamp of the newest buffered snapshot, or None."""
+        snapshots = self._snapshots.get((symbol, expiry))
+        return snapshots[-1].timestamp if snapshots else None
+    
+    def has_snapshot(self, symbol, expiry, timestamp):
+        """Check whether a snapshot at the given timestamp is buffered."""
+        target = to_ist(timestamp).floor('s')
+        with self._lock:
+            return any(s.timestamp == target for s in reversed(self._snapshots.get((symbol, expiry), ())))
+    
+    def covers(self, symbol, expiry, timestamp):
+        """
+        Check whether the buffer reaches back far enough for every analysis interval.
+        
+        The past snapshot for an interval is the one closest to its target
+        time. The buffer finds the same one as the database only if it holds a
+        snapshot at or before the longest interval's target, or if it holds
+        every stored snapshot. Otherwise the closest buffered snapshot can be
+        far newer than the target, e.g. when the buffer was sized for a longer
+        collection interval than the one in use.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            timestamp (datetime or str): Snapshot to calculate OI changes for
+        
+        Returns:
+            bool: True if oi_changes() matches the database lookup for this snapshot
+        """
+        target = to_ist(timestamp).floor('s') - timedelta(minutes=max(DATA_COLLECTION["analysis_intervals"]))
+        with self._lock:
+            if (symbol, expiry) in self._complete:
+                return True
+            snapshots = self._snapshots.get((symbol, expiry))
+            return bool(snapshots) and snapshots[0].timestamp <= target
+    
+    def oi_changes(self, symbol, expiry, timestamp=None):
+        """
+        Calculate OI changes of a buffered snapshot for all configured intervals.
+        
+        For each interval the past snapshot closest to the target time is used,
+        as in OptionMetricsCalculator.calculate_oi_changes. Only buffered
+        snapshots are considered, so check covers() first.
+        
+        Args:
+            symbol (str): Symbol name
+            expiry (str): Expiry date
+            timestamp (datetime, optional): Snapshot to calculate for. If None,
+                use the newest one.
+        
+        Returns:
+            pandas.DataFrame: Calculated OI changes (empty if there is no history)
+        """
+        with self._lock:
+            snapshots = list(self._snapshots.get((symbol, expiry), ()))
+        
+        if timestamp is not None:
+            target = to_ist(timestamp).floor('s')
+            snapshots = [s for s in snapshots if s.timestamp <= target]
+            if not snapshots or snapshots[-1].timestamp != target:
+                return pd.DataFrame()
+        
+        if len(snapshots) < 2:
+            return pd.DataFrame()
+        
+        current = snapshots[-1]
+        past_snapshots = []
+        
+        for interval_minutes in DATA_COLLECTION["analysis_intervals"]:
+            target = current.timestamp - timedelta(minutes=interval_minutes)
+            
+            # Newest first, so ties go to the later snapshot
+            closest = min(
+                reversed(snapshots[:-1]),
+                key=lambda s: abs((s.timestamp - target).total_seconds())
+            )
+            actual_interval = round((current.timestamp - closest.timestamp).total_seconds() / 60)
+            past_snapshots.append((actual_interval, self._frame(closest)))
+        
+        return compute_oi_changes(self._frame(current), past_snapshots, current.timestamp, symbol, expiry)
+    
+    @staticmethod
+    def _frame(snapshot):
+        """Build the minimal option data frame the OI change engine needs."""
+        frame = pd.DataFrame({'strike': snapshot.strikes})
+        if snapshot.call_oi is not None:
+            frame['call_oi'] = snapshot.call_oi
+        if snapshot.put_oi is not None:
+            frame['put_oi'] = snapshot.put_oi
+        return frame
+
+_shared_buffer = None
+_shared_buffer_lock = threading.Lock()
+
+def get_snapshot_buffer():
+    """
+    Get the process-wide snapshot ring buffer.
+    
+    Returns:
+        SnapshotRingBuffer: Shared buffer instance
+    """
+    global _shared_buffer
+    with _shared_buffer_lock:
+        if _shared_buffer is None:
+            _shared_buffer = SnapshotRingBuffer()
+        return _shared_buffer
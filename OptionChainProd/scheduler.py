@@ -1,14 +1,12 @@
 """
 Scheduler for regular data collection and dashboard updates.
 """
-import time
 import logging
 import os
-from datetime import datetime
-import pandas as pd
-from config.settings import DATA_COLLECTION, PATHS
+from config.settings import PATHS
 from data_collection.collector import OptionChainCollector
-from utils.helpers import setup_logging, is_trading_hours, time_until_next_collection
+from utils.helpers import setup_logging
+from utils.schedule import CollectionScheduler
 
 # Setup logging
 logger = setup_logging()
@@ -31,34 +29,20 @@ def run_scheduler(symbol, expiry):
         logger.error("Failed to authenticate. Exiting scheduler.")
         return
     
+    def collect(fire_time):
+        logger.info("Collecting data...")
+        
+        # Collect and save data
+        data, filepath = collector.collect_and_save(symbol, expiry)
+        
+        if data is not None:
+            logger.info(f"Successfully collected data with {len(data)} rows")
+        else:
+            logger.error("Failed to collect or save data")
+    
     try:
-        # Main scheduling loop
-        while True:
-            # Check if within trading hours
-            if is_trading_hours():
-                logger.info("Collecting data...")
-                
-                # Collect and save data
-                data, filepath = collector.collect_and_save(symbol, expiry)
-                
-                if data is not None:
-                    logger.info(f"Successfully collected data with {len(data)} rows")
-                else:
-                    logger.error("Failed to collect or save data")
-            else:
-                logger.info("Outside trading hours. Waiting for next trading day.")
-                # Sleep until next check (check every hour outside trading hours)
-                time.sleep(3600)  # 1 hour
-                continue
-            
-            # Calculate time until next collection
-            sleep_seconds = time_until_next_collection()
-            next_collection_time = datetime.now() + pd.Timedelta(seconds=sleep_seconds)
-            
-            logger.info(f"Next collection at {next_collection_time.strftime('%H:%M:%S')}")
-            
-            # Sleep until next collection time
-            time.sleep(sleep_seconds)
+        # Fires on wall-clock interval boundaries and sleeps to the exact market open
+        CollectionScheduler().run(collect)
     
     except KeyboardInterrupt:
         logger.info("Scheduler stopped by user")
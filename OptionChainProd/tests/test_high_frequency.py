@@ -0,0 +1,60 @@
+"""
+High-frequency mode: OI changes from the snapshot buffer equal those from the database.
+
+Run from the project folder:
+    python -m pytest tests
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from benchmarks.common import make_chain
+from data_collection.connector import DataCollectionConnector
+from data_collection.sinks import ParquetSnapshotSink
+from database.db_manager import DatabaseManager
+from processing.calculator import OptionMetricsCalculator
+from processing.snapshot_buffer import SnapshotRingBuffer, default_capacity
+
+SYMBOL, EXPIRY = 'NIFTY', '30-01-2025'
+START = datetime(2025, 1, 2, 9, 15)
+
+@pytest.fixture
+def connector(tmp_path):
+    """A connector collecting every 13 seconds and saving one snapshot per 5 minutes."""
+    connector = DataCollectionConnector(
+        persist_interval_seconds=300, db=DatabaseManager(str(tmp_path / 'options.db')), interval_seconds=13
+    )
+    connector.collector.sink = ParquetSnapshotSink(str(tmp_path / 'data'))
+    # Room for every collection, so only the connector decides what is buffered
+    connector.buffer = SnapshotRingBuffer(default_capacity(13))
+    yield connector
+    connector.writer.flush()
+    connector.collector.sink.close()
+
+def test_buffer_matches_database(connector):
+    # An hour of collections: the database gets the first snapshot of each 5 minutes
+    for i in range(60 * 60 // 13):
+        timestamp = START + timedelta(seconds=13 * i)
+        _, _, success = connector._store(make_chain(20, seed=i), SYMBOL, EXPIRY, timestamp, wait=False)
+        assert success
+    connector.writer.flush()
+    saved = connector.db.get_timestamps(SYMBOL, EXPIRY)[::-1]
+    assert len(saved) == 12
+    
+    from_buffer = OptionMetricsCalculator(connector.db)
+    from_buffer.buffer = connector.buffer
+    from_db = OptionMetricsCalculator(connector.db)
+    from_db.buffer = SnapshotRingBuffer()
+    
+    # Every saved snapshot, including those the buffer reaches back 30 minutes from
+    covered = 0
+    for timestamp in saved[1:]:
+        current = connector.db.get_option_data_by_timestamp(SYMBOL, EXPIRY, timestamp)
+        covered += connector.buffer.covers(SYMBOL, EXPIRY, current['timestamp'].iloc[0])
+        pd.testing.assert_frame_equal(
+            from_buffer.calculate_oi_changes(SYMBOL, EXPIRY, current),
+            from_db.calculate_oi_changes(SYMBOL, EXPIRY, current),
+            check_exact=True
+        )
+    assert covered
@@ -0,0 +1,46 @@
+"""
+Parity tests: the vectorized OI change engine against the original merge + iterrows loop.
+
+Run from the project folder:
+    python -m pytest tests
+"""
+import pandas as pd
+import pytest
+import pytz
+
+from benchmarks.oi_engine import db_snapshot, legacy_oi_changes
+from processing.oi_engine import compute_oi_changes
+
+SYMBOL, EXPIRY = 'NIFTY', '29-05-2025'
+TIMESTAMP = pytz.timezone('Asia/Kolkata').localize(pd.Timestamp('2025-05-22 10:30:00'))
+
+def scenarios(n_strikes):
+    """Return {name: (current, past_snapshots)} parity scenarios."""
+    current = db_snapshot(n_strikes, 0, '2025-05-22 10:30:00')
+    pasts = [
+        (5, db_snapshot(n_strikes, 1, '2025-05-22 10:25:00')),
+        (10, db_snapshot(n_strikes, 2, '2025-05-22 10:20:00')),
+        (15, db_snapshot(n_strikes, 3, '2025-05-22 10:15:00')),
+        (30, db_snapshot(n_strikes, 4, '2025-05-22 10:00:00')),
+    ]
+    return {
+        'int columns': (current, pasts),
+        'NaN OI and missing strikes': (db_snapshot(n_strikes, 0, '2025-05-22 10:30:00', with_nans=True), [
+            (5, db_snapshot(n_strikes, 1, '2025-05-22 10:25:00', drop_every=5)),
+            (10, db_snapshot(n_strikes, 2, '2025-05-22 10:20:00', with_nans=True)),
+            (16, db_snapshot(n_strikes, 3, '2025-05-22 10:14:00', drop_every=3)),
+        ]),
+        'missing put column': (current, [(5, pasts[0][1].drop(columns=['put_oi']))]),
+    }
+
+@pytest.mark.parametrize('n_strikes', [100, 500])
+@pytest.mark.parametrize('scenario', ['int columns', 'NaN OI and missing strikes', 'missing put column'])
+def test_matches_legacy(scenario, n_strikes):
+    current, pasts = scenarios(n_strikes)[scenario]
+    expected = legacy_oi_changes(current, pasts, TIMESTAMP, SYMBOL, EXPIRY)
+    actual = compute_oi_changes(current, pasts, TIMESTAMP, SYMBOL, EXPIRY)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+def test_no_past_snapshots():
+    current, _ = scenarios(100)['int columns']
+    assert compute_oi_changes(current, [], TIMESTAMP, SYMBOL, EXPIRY).empty
@@ -0,0 +1,54 @@
+"""
+Malformed feed messages are counted as errors and leave the live chain intact.
+
+Run from the project folder:
+    python -m pytest tests
+"""
+import json
+
+import pytest
+
+from benchmarks.common import make_payload
+from data_collection.decoder import PAYLOAD_COLUMNS
+from data_collection.streaming import StreamingCollector
+
+SYMBOL, EXPIRY = 'NIFTY', '29-05-2025'
+
+@pytest.fixture
+def collector():
+    """A collector (never connected) whose target has a loaded chain at seq 1."""
+    collector = StreamingCollector([(SYMBOL, EXPIRY)], url='ws://feed.invalid')
+    rows = json.loads(make_payload(10, symbol=SYMBOL, expiry=EXPIRY).to_json(orient='values'))
+    collector._handle(None, json.dumps({
+        'type': 'chain', 'symbol': SYMBOL, 'expiry': EXPIRY, 'seq': 1,
+        'columns': PAYLOAD_COLUMNS, 'data': rows,
+    }))
+    assert collector.stats['chains'] == 1
+    return collector
+
+@pytest.mark.parametrize('message', [
+    [1, 2],
+    {'type': 'update', 'symbol': SYMBOL, 'expiry': EXPIRY, 'seq': 2, 'strike': 22000, 'fields': [1]},
+    {'type': 'update', 'symbol': SYMBOL, 'expiry': EXPIRY, 'seq': 2, 'strike': None, 'fields': {'callOI': 1}},
+], ids=['array body', 'fields not an object', 'null strike'])
+def test_malformed_message_is_an_error(collector, message):
+    state = collector.states[(SYMBOL, EXPIRY)]
+    before, _ = state.snapshot()
+    
+    collector._handle(None, json.dumps(message))
+    
+    assert collector.stats['errors'] == 1
+    assert collector.stats['updates'] == 0
+    assert state.seq == 1
+    after, _ = state.snapshot()
+    assert after is before
+
+def test_valid_update_still_applies(collector):
+    collector._handle(None, json.dumps({
+        'type': 'update', 'symbol': SYMBOL, 'expiry': EXPIRY, 'seq': 2, 'strike': 22000, 'fields': {'callOI': 7},
+    }))
+    
+    assert collector.stats['errors'] == 0
+    assert collector.stats['updates'] == 1
+    data, _ = collector.states[(SYMBOL, EXPIRY)].snapshot()
+    assert data.loc[data['strike'] == 22000, 'callOI'].item() == 7
@@ -4,7 +4,6 @@ Streamlit dashboard UI for NIFTY Options Dashboard.
 import streamlit as st
 import pandas as pd
 import numpy as np
-import time
 import logging
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
@@ -14,19 +13,16 @@ import os
 import pytz
 
 # Import our modules
-from database.db_manager import DatabaseManager
-from processing.calculator import OptionMetricsCalculator
-from data_collection.connector import DataCollectionConnector
-from config.settings import DATA_COLLECTION, PATHS
+from ui.resources import get_components, get_dashboard_payload
+from ui.table_render import render_oi_table
+from config.settings import DASHBOARD, DATA_COLLECTION, PATHS
 from utils.helpers import is_trading_hours, time_until_next_collection
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Initialize components
-db = DatabaseManager()
-calculator = OptionMetricsCalculator()
-connector = DataCollectionConnector()
+# Initialize components (built once per server process, not on every rerun)
+db, calculator, connector = get_components()
 
 # Configure Streamlit page
 st.set_page_config(
@@ -202,45 +198,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Function to format OI changes with colors
-def format_oi_change(val, is_ce=True):
-    """Format OI change value with colors based on interpretation."""
-    if pd.isna(val) or val == "N/A":
-        return "N/A"
-        
-    # Convert to int if it's not already
-    try:
-        val = int(val)
-    except (ValueError, TypeError):
-        return "N/A"
-    
-    # Apply new color coding
-    if is_ce:
-        # CE: DARK Green for decrease (bullish), Normal Red for increase (bearish)
-        if val < 0:
-            color = "cell-dark-green"  # DARK Green for bullish
-        elif val > 0:
-            color = "cell-red"  # Normal Red for bearish
-        else:
-            color = ""
-    else:
-        # PE: DARK Red for decrease (bearish), Normal Green for increase (bullish)
-        if val < 0:
-            color = "cell-dark-red"  # DARK Red for bearish
-        elif val > 0:
-            color = "cell-green"  # Normal Green for bullish
-        else:
-            color = ""
-    
-    # Format with commas for thousands
-    formatted_val = f"{val:,}"
-    
-    # Add + sign for positive values
-    if val > 0:
-        formatted_val = f"+{formatted_val}"
-    
-    return f'<div class="{color}">{formatted_val}</div>'
-
 # Function to create OI change table
 def create_oi_change_table(data, selected_intervals=[5, 10, 15]):
     """Create OI change table with formatting."""
@@ -280,57 +237,12 @@ def create_oi_change_table(data, selected_intervals=[5, 10, 15]):
     return display_df[columns_to_display + ['highlight']]
 
 # Function to display OI change table with styling
-def display_oi_table(df):
-    """Display OI change table with proper styling."""
-    if df.empty:
+def display_oi_table(html_output):
+    """Display an OI change table rendered by render_oi_table (None if there is no data)."""
+    if not html_output:
         st.warning("No data available for display")
         return
     
-    # Get column names
-    cols = df.columns.tolist()
-    
-    # Remove highlight column from display
-    display_cols = [col for col in cols if col != 'highlight']
-    
-    # Create HTML output
-    html_output = "<div class='table-container'><table class='dataframe'>"
-    
-    # Table header
-    html_output += "<thead><tr>"
-    for col in display_cols:
-        html_output += f"<th>{col}</th>"
-    html_output += "</tr></thead>"
-    
-    # Table body
-    html_output += "<tbody>"
-    for idx, row in df.iterrows():
-        # Add highlight class if needed
-        row_class = "highlight" if row.get('highlight', False) else ""
-        html_output += f"<tr class='{row_class}'>"
-        
-        for col in display_cols:
-            value = row[col]
-            
-            # Format OI change columns
-            if col.startswith('CE ') and col != 'CE OI':
-                cell_content = format_oi_change(value, is_ce=True)
-            elif col.startswith('PE ') and col != 'PE OI':
-                cell_content = format_oi_change(value, is_ce=False)
-            # Format strike price
-            elif col == 'Strike':
-                cell_content = f"{value:,.0f}"
-            # Format regular OI columns with commas
-            elif col in ['CE OI', 'PE OI']:
-                cell_content = f"{int(value):,}" if pd.notna(value) else ""
-            else:
-                cell_content = str(value)
-            
-            html_output += f"<td>{cell_content}</td>"
-        
-        html_output += "</tr>"
-    
-    html_output += "</tbody></table></div>"
-    
     # Display the HTML table
     st.markdown(html_output, unsafe_allow_html=True)
 
@@ -358,7 +270,7 @@ def collect_data_once(symbol, expiry):
     with st.spinner("Collecting data..."):
         try:
             # Collect and store data
-            data, filepath, success = connector.collect_and_store(symbol, expiry)
+            data, filepath, success = connector.collect_and_store(symbol, expiry, wait=True)
             
             if success and data is not None:
                 ist = pytz.timezone('Asia/Kolkata')
@@ -371,7 +283,11 @@ def collect_data_once(symbol, expiry):
                 st.session_state['last_collection_file'] = filepath
                 
                 # Success message
-                st.success(f"Data collected successfully: {len(data)} rows")
+                age = connector.flights.age((symbol, expiry))
+                if connector.last_shared.get((symbol, expiry)) and age is not None:
+                    st.success(f"Using the snapshot collected {age:.0f}s ago: {len(data)} rows")
+                else:
+                    st.success(f"Data collected successfully: {len(data)} rows")
                 return True
             else:
                 st.session_state['last_collection_success'] = False
@@ -388,8 +304,8 @@ def collect_data_once(symbol, expiry):
 def update_dashboard_data(symbol, expiry, currently_trading, range_limit, highlight_limit):
     """Update dashboard data based on latest collection."""
     try:
-        # Process data for dashboard
-        result = calculator.process_latest_data(
+        # Process data for dashboard (cached until a newer snapshot is stored)
+        result = get_dashboard_payload(
             symbol,
             expiry,
             currently_trading,
@@ -417,6 +333,10 @@ def update_dashboard_data(symbol, expiry, currently_trading, range_limit, highli
                 ts = ts.astimezone(ist)
             
             st.session_state['dashboard_timestamp'] = ts
+            # What the payload was computed from, to tell when the table must be rebuilt
+            st.session_state['dashboard_key'] = (
+                symbol, expiry, result['timestamp'], currently_trading, range_limit, highlight_limit
+            )
             st.session_state['dashboard_success'] = True
             return True
         else:
@@ -452,8 +372,11 @@ if 'dashboard_timestamp' not in st.session_state:
 if 'dashboard_success' not in st.session_state:
     st.session_state['dashboard_success'] = False
 
-# Try to load user settings
-user_settings = db.get_latest_user_settings()
+# Try to load user settings (once per session; they only seed the inputs)
+if 'user_settings' not in st.session_state:
+    st.session_state['user_settings'] = db.get_latest_user_settings()
+
+user_settings = st.session_state['user_settings']
 
 # Header
 st.title("📊 AccuNirvana Options Analysis Dashboard")
@@ -510,6 +433,18 @@ highlight_limit = st.sidebar.number_input(
     help="Range of strikes to highlight in the dashboard"
 )
 
+# Save the settings only when this session changed them, not on every refresh
+settings = {
+    'symbol': symbol,
+    'expiry': expiry,
+    'currently_trading': currently_trading,
+    'range_limit': range_limit,
+    'highlight_limit': highlight_limit
+}
+if settings != user_settings:
+    calculator.writer.submit_task(db.save_user_settings, settings)
+    st.session_state['user_settings'] = settings
+
 # Data Collection Controls
 st.sidebar.markdown("<div class='sidebar-header'>Data Collection</div>", unsafe_allow_html=True)
 
@@ -562,20 +497,53 @@ if st.sidebar.button("Collect Data Now", key="collect_now"):
     collect_data_once(symbol, expiry)
 
 # Collection status info
-if st.session_state['last_collection_time']:
-    st.sidebar.markdown(
-        f"Last collection: {st.session_state['last_collection_time'].strftime('%H:%M:%S')}"
-    )
-
-if st.session_state['next_collection_time'] and st.session_state['collection_running']:
-    ist = pytz.timezone('Asia/Kolkata')
-    time_diff = (st.session_state['next_collection_time'] - datetime.now(ist)).total_seconds()
+def collection_status():
+    """
+    Show the last collection and the countdown, and run auto-collection when due.
+    
+    Runs as a fragment on its own timer while collection is running, so the
+    countdown moves without sleeping in the script thread or rerunning the page.
+    """
+    if st.session_state['collection_running'] and st.session_state['next_collection_time']:
+        ist = pytz.timezone('Asia/Kolkata')
+        current_time = datetime.now(ist)
+        
+        # Check if it's time for next collection
+        if is_trading_hours() and current_time >= st.session_state['next_collection_time']:
+            # Collect data
+            success = collect_data_once(
+                st.session_state['collection_symbol'],
+                st.session_state['collection_expiry']
+            )
+            
+            # Update next collection time
+            st.session_state['next_collection_time'] = current_time + timedelta(
+                minutes=DATA_COLLECTION["interval_minutes"]
+            )
+            
+            # Let the dashboard fragment load the new snapshot
+            st.session_state['new_collection'] = success
     
-    if time_diff > 0:
-        st.sidebar.progress(
-            1 - (time_diff / (DATA_COLLECTION["interval_minutes"] * 60)),
-            text=f"Next in: {int(time_diff // 60):02d}:{int(time_diff % 60):02d}"
+    if st.session_state['last_collection_time']:
+        st.markdown(
+            f"Last collection: {st.session_state['last_collection_time'].strftime('%H:%M:%S')}"
         )
+    
+    if st.session_state['next_collection_time'] and st.session_state['collection_running']:
+        ist = pytz.timezone('Asia/Kolkata')
+        time_diff = (st.session_state['next_collection_time'] - datetime.now(ist)).total_seconds()
+        
+        if time_diff > 0:
+            st.progress(
+                1 - (time_diff / (DATA_COLLECTION["interval_minutes"] * 60)),
+                text=f"Next in: {int(time_diff // 60):02d}:{int(time_diff % 60):02d}"
+            )
+
+with st.sidebar:
+    st.fragment(
+        collection_status,
+        run_every=DASHBOARD["countdown_refresh_seconds"] if st.session_state['collection_running'] else None
+    )()
 
 # Dashboard Controls
 st.sidebar.markdown("<div class='sidebar-header'>Dashboard</div>", unsafe_allow_html=True)
@@ -609,164 +577,157 @@ selected_intervals = st.sidebar.multiselect(
 # Main dashboard area
 st.header("Options Open Interest Analysis")
 
-# Status metrics row
-col1, col2, col3, col4 = st.columns(4)
-
-with col1:
-    # Last updated time
-    last_updated = st.session_state.get('dashboard_timestamp', "Not updated yet")
-    last_updated_display = "Not updated yet"
+def live_dashboard(symbol, expiry, currently_trading, range_limit, highlight_limit, selected_intervals, auto_refresh):
+    """
+    Show the status metrics and the OI change table.
+    
+    Runs as a fragment on its own timer. A tick only looks for a new payload
+    when the snapshot notifier has seen a newer snapshot or the view changed,
+    and the table is only rebuilt for a new payload.
+    """
+    # Follow the latest snapshot, wherever it was collected, once the dashboard
+    # is loaded or a new collection finished
+    new_collection = st.session_state.pop('new_collection', False)
+    event = db.notifier.latest(symbol, expiry)
+    marker = (symbol, expiry, currently_trading, range_limit, highlight_limit, event.sequence if event else None)
+    
+    if auto_refresh and (st.session_state['dashboard_success'] or new_collection) and (
+        new_collection or st.session_state.get('refresh_marker') != marker
+    ):
+        if update_dashboard_data(
+            symbol,
+            expiry,
+            currently_trading,
+            range_limit,
+            highlight_limit
+        ):
+            st.session_state['refresh_marker'] = marker
     
-    if last_updated and not isinstance(last_updated, str):
-        try:
-            ist = pytz.timezone('Asia/Kolkata')
-            utc = pytz.timezone('UTC')
-            
-            # Debug: print the original datetime and its timezone
-            print(f"Original datetime: {last_updated}")
-            print(f"Original timezone: {last_updated.tzinfo}")
-            
-            # Handle different timezone scenarios
-            if last_updated.tzinfo is None:
-                # Naive datetime - assume it's UTC
-                last_updated_utc = utc.localize(last_updated)
-            elif last_updated.tzinfo.zone == 'UTC' or str(last_updated.tzinfo) == 'UTC':
-                # Already UTC timezone
-                last_updated_utc = last_updated
-            else:
-                # Other timezone - convert to UTC first
-                last_updated_utc = last_updated.astimezone(utc)
-            
-            # Convert UTC to IST
-            last_updated_ist = last_updated_utc.astimezone(ist)
-            last_updated_display = last_updated_ist.strftime('%H:%M:%S')
-            
-            # Debug: print the converted time
-            print(f"Converted to IST: {last_updated_ist}")
-            
-        except Exception as e:
-            # For debugging - you can remove this print in production
-            print(f"Timezone conversion error: {e}")
-            print(f"Error type: {type(e)}")
-            last_updated_display = "Error converting time"
-    elif isinstance(last_updated, str):
-        last_updated_display = last_updated
+    # Status metrics row
+    col1, col2, col3, col4 = st.columns(4)
     
-    st.markdown(
-        f"""
-        <div style="text-align: center;">
-            <h4>Last Updated</h4>
-            <p style="font-size: 18px; font-weight: bold;">{last_updated_display}</p>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
-with col2:
-    # Current Symbol & Expiry
-    st.markdown(
-        f"""
-        <div class="metric-card">
-            <div class="metric-title">Symbol & Expiry</div>
-            <div class="metric-value">{symbol} {expiry}</div>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
-with col3:
-    # Data Range
-    range_from = currently_trading - range_limit
-    range_to = currently_trading + range_limit
-    st.markdown(
-        f"""
-        <div class="metric-card">
-            <div class="metric-title">Data Range</div>
-            <div class="metric-value">{range_from:,.0f} - {range_to:,.0f}</div>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
-with col4:
-    # Highlight Range
-    highlight_from = (range_from + range_to) / 2 - highlight_limit
-    highlight_to = (range_from + range_to) / 2 + highlight_limit
-    st.markdown(
-        f"""
-        <div class="metric-card">
-            <div class="metric-title">Focus Range</div>
-            <div class="metric-value">{highlight_from:,.0f} - {highlight_to:,.0f}</div>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
-# OI Change Analysis Table
-st.subheader("Open Interest Changes")
-
-# Legend
-legend_col1, legend_col2, legend_col3, legend_col4 = st.columns(4)
-
-with legend_col1:
-    st.markdown('<div class="cell-down">🔴 CE OI Increase (Bearish)</div>', unsafe_allow_html=True)
-
-with legend_col2:
-    st.markdown('<div class="cell-up">🟢 CE OI Decrease (Bullish)</div>', unsafe_allow_html=True)
-
-with legend_col3:
-    st.markdown('<div class="cell-down">🔴 PE OI Decrease (Bearish)</div>', unsafe_allow_html=True)
-
-with legend_col4:
-    st.markdown('<div class="cell-up">🟢 PE OI Increase (Bullish)</div>', unsafe_allow_html=True)
-
-# Dashboard data
-dashboard_data = st.session_state.get('dashboard_data')
-
-if dashboard_data:
-    # Convert to DataFrame for display
-    display_df = create_oi_change_table(dashboard_data, selected_intervals)
+    with col1:
+        # Last updated time
+        last_updated = st.session_state.get('dashboard_timestamp', "Not updated yet")
+        last_updated_display = "Not updated yet"
+        
+        if last_updated and not isinstance(last_updated, str):
+            try:
+                ist = pytz.timezone('Asia/Kolkata')
+                utc = pytz.timezone('UTC')
+                
+                # Handle different timezone scenarios
+                if last_updated.tzinfo is None:
+                    # Naive datetime - assume it's UTC
+                    last_updated_utc = utc.localize(last_updated)
+                elif last_updated.tzinfo.zone == 'UTC' or str(last_updated.tzinfo) == 'UTC':
+                    # Already UTC timezone
+                    last_updated_utc = last_updated
+                else:
+                    # Other timezone - convert to UTC first
+                    last_updated_utc = last_updated.astimezone(utc)
+                
+                # Convert UTC to IST
+                last_updated_ist = last_updated_utc.astimezone(ist)
+                last_updated_display = last_updated_ist.strftime('%H:%M:%S')
+            
+            except Exception as e:
+                last_updated_display = "Error converting time"
+        elif isinstance(last_updated, str):
+            last_updated_display = last_updated
+        
+        st.markdown(
+            f"""
+            <div style="text-align: center;">
+                <h4>Last Updated</h4>
+                <p style="font-size: 18px; font-weight: bold;">{last_updated_display}</p>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
     
-    # Display table
-    display_oi_table(display_df)
-else:
-    st.info("Click 'Refresh Dashboard' to view data")
-
-# Auto-collection and refresh logic
-if st.session_state['collection_running'] and trading_active:
-    # Check if it's time for next collection
-    ist = pytz.timezone('Asia/Kolkata')
-    current_time = datetime.now(ist)
+    with col2:
+        # Current Symbol & Expiry
+        st.markdown(
+            f"""
+            <div class="metric-card">
+                <div class="metric-title">Symbol & Expiry</div>
+                <div class="metric-value">{symbol} {expiry}</div>
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
     
-    if st.session_state['next_collection_time'] and current_time >= st.session_state['next_collection_time']:
-        # Collect data
-        success = collect_data_once(
-            st.session_state['collection_symbol'],
-            st.session_state['collection_expiry']
+    with col3:
+        # Data Range
+        range_from = currently_trading - range_limit
+        range_to = currently_trading + range_limit
+        st.markdown(
+            f"""
+            <div class="metric-card">
+                <div class="metric-title">Data Range</div>
+                <div class="metric-value">{range_from:,.0f} - {range_to:,.0f}</div>
+            </div>
+            """,
+            unsafe_allow_html=True
         )
-        
-        # Update next collection time
-        st.session_state['next_collection_time'] = current_time + timedelta(
-            minutes=DATA_COLLECTION["interval_minutes"]
+    
+    with col4:
+        # Highlight Range
+        highlight_from = (range_from + range_to) / 2 - highlight_limit
+        highlight_to = (range_from + range_to) / 2 + highlight_limit
+        st.markdown(
+            f"""
+            <div class="metric-card">
+                <div class="metric-title">Focus Range</div>
+                <div class="metric-value">{highlight_from:,.0f} - {highlight_to:,.0f}</div>
+            </div>
+            """,
+            unsafe_allow_html=True
         )
+    
+    # OI Change Analysis Table
+    st.subheader("Open Interest Changes")
+    
+    # Legend
+    legend_col1, legend_col2, legend_col3, legend_col4 = st.columns(4)
+    
+    with legend_col1:
+        st.markdown('<div class="cell-down">🔴 CE OI Increase (Bearish)</div>', unsafe_allow_html=True)
+    
+    with legend_col2:
+        st.markdown('<div class="cell-up">🟢 CE OI Decrease (Bullish)</div>', unsafe_allow_html=True)
+    
+    with legend_col3:
+        st.markdown('<div class="cell-down">🔴 PE OI Decrease (Bearish)</div>', unsafe_allow_html=True)
+    
+    with legend_col4:
+        st.markdown('<div class="cell-up">🟢 PE OI Increase (Bullish)</div>', unsafe_allow_html=True)
+    
+    # Dashboard data
+    dashboard_data = st.session_state.get('dashboard_data')
+    
+    if dashboard_data:
+        # Rebuild the table only for a new payload or interval selection; an unchanged
+        # table (over 10 KB) is re-sent to the browser as a reference to its cached copy
+        table_key = (st.session_state.get('dashboard_key'), tuple(selected_intervals))
+        if st.session_state.get('table_key') != table_key:
+            # Convert to DataFrame for display
+            display_df = create_oi_change_table(dashboard_data, selected_intervals)
+            st.session_state['table_html'] = render_oi_table(display_df) if not display_df.empty else None
+            st.session_state['table_key'] = table_key
         
-        # Auto-refresh dashboard if enabled
-        if success and auto_refresh:
-            update_dashboard_data(
-                symbol,
-                expiry,
-                currently_trading,
-                range_limit,
-                highlight_limit
-            )
-        
-        # Trigger a rerun to update UI
-        st.rerun()
-
-# Add periodic refresh for countdown
-if st.session_state['collection_running'] and st.session_state['next_collection_time']:
-    # Add auto-refresh every 10 seconds to update countdown
-    ist = pytz.timezone('Asia/Kolkata')
-    time_to_wait = min(10, max(1, int((st.session_state['next_collection_time'] - datetime.now(ist)).total_seconds())))
-    time.sleep(time_to_wait)
-    st.rerun()
+        # Display table
+        display_oi_table(st.session_state['table_html'])
+    else:
+        st.info("Click 'Refresh Dashboard' to view data")
+
+st.fragment(live_dashboard, run_every=DASHBOARD["table_refresh_seconds"])(
+    symbol,
+    expiry,
+    currently_trading,
+    range_limit,
+    highlight_limit,
+    selected_intervals,
+    auto_refresh
+)
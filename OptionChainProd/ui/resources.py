@@ -0,0 +1,57 @@
+"""
+Cached resources and payloads for the Streamlit dashboard.
+
+Streamlit re-executes the dashboard script on every rerun, including the
+countdown reruns. The database, calculator and connector are built once per
+server process here, and dashboard payloads are views on the shared
+per-snapshot results of processing.result_cache.
+"""
+import logging
+
+import streamlit as st
+
+from data_collection.connector import DataCollectionConnector
+from database.db_manager import DatabaseManager
+from processing.calculator import OptionMetricsCalculator
+from processing.result_cache import get_result_cache
+
+logger = logging.getLogger(__name__)
+
+@st.cache_resource(show_spinner=False)
+def get_components():
+    """
+    Get the process-wide database, calculator and connector.
+    
+    All three share one DatabaseManager, so the schema is checked once. Its
+    snapshot notifier is started, so every session learns about new snapshots,
+    also those committed by a separate collection process, without querying.
+    
+    Returns:
+        tuple: (DatabaseManager, OptionMetricsCalculator, DataCollectionConnector)
+    """
+    logger.info("Initializing dashboard components")
+    db = DatabaseManager()
+    db.notifier.start()
+    return db, OptionMetricsCalculator(db), DataCollectionConnector(db=db)
+
+def get_dashboard_payload(symbol, expiry, currently_trading, range_limit, highlight_limit):
+    """
+    Get the dashboard payload for the latest snapshot.
+    
+    The OI changes and table of a snapshot are computed once for all
+    sessions; each payload only filters that table to the viewer's range and
+    highlight. The latest timestamp comes from the snapshot notifier, or
+    from one indexed MAX query if it is not watching.
+    
+    Args:
+        symbol (str): Symbol name
+        expiry (str): Expiry date
+        currently_trading (float): Current trading value
+        range_limit (float): Range limit for filtering
+        highlight_limit (float): Highlight limit
+    
+    Returns:
+        dict: Processed data for dashboard, as from process_latest_data
+    """
+    _, calculator, _ = get_components()
+    return get_result_cache(calculator).view(symbol, expiry, currently_trading, range_limit, highlight_limit)
@@ -0,0 +1,106 @@
+"""
+Column-wise HTML rendering of the OI change table.
+
+Cell text and CSS classes are computed per column with NumPy and pandas
+operations, and the table is assembled with a single join, instead of
+formatting cell by cell over DataFrame.iterrows().
+"""
+import numpy as np
+import pandas as pd
+
+# CSS class per sign of an OI change: (decrease, increase)
+CHANGE_CLASSES = {
+    True: ('cell-dark-green', 'cell-red'),  # CE: decrease is bullish, increase bearish
+    False: ('cell-dark-red', 'cell-green'),  # PE: decrease is bearish, increase bullish
+}
+
+def _as_numbers(values):
+    """Column values as float64, with NaN for anything that is not a number (e.g. "N/A")."""
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+def _with_commas(ints):
+    """Format int64 values with thousands separators."""
+    return np.array(list(map('{:,}'.format, ints.tolist())), dtype=object)
+
+def change_cells(values, is_ce=True):
+    """
+    Format a column of OI changes as colored cells.
+    
+    Args:
+        values (array-like): OI changes; missing values and "N/A" render as N/A
+        is_ce (bool): Color by the CE (True) or PE (False) interpretation
+    
+    Returns:
+        numpy.ndarray: Cell HTML per value (object dtype)
+    """
+    numbers = _as_numbers(values)
+    valid = ~np.isnan(numbers)
+    ints = np.trunc(np.where(valid, numbers, 0)).astype(np.int64)
+    
+    decrease, increase = CHANGE_CLASSES[is_ce]
+    classes = np.where(ints < 0, decrease, np.where(ints > 0, increase, '')).astype(object)
+    text = np.where(ints > 0, '+', '').astype(object) + _with_commas(ints)
+    
+    cells = '<div class="' + classes + '">' + text + '</div>'
+    return np.where(valid, cells, 'N/A')
+
+def oi_cells(values):
+    """Format a column of OI values with thousands separators; missing values are blank."""
+    numbers = _as_numbers(values)
+    valid = ~np.isnan(numbers)
+    ints = np.trunc(np.where(valid, numbers, 0)).astype(np.int64)
+    return np.where(valid, _with_commas(ints), '')
+
+def column_cells(name, values):
+    """
+    Format one display column.
+    
+    Args:
+        name (str): Display column name, e.g. 'Strike', 'CE 5min' or 'PE OI'
+        values (pandas.Series): Column values
+    
+    Returns:
+        numpy.ndarray: Cell content per row (object dtype)
+    """
+    if name.startswith('CE ') and name != 'CE OI':
+        return change_cells(values, is_ce=True)
+    if name.startswith('PE ') and name != 'PE OI':
+        return change_cells(values, is_ce=False)
+    if name == 'Strike':
+        return np.array(list(map('{:,.0f}'.format, values.tolist())), dtype=object)
+    if name in ['CE OI', 'PE OI']:
+        return oi_cells(values)
+    return np.array(list(map(str, values.tolist())), dtype=object)
+
+def render_oi_table(df):
+    """
+    Render the OI change table as HTML.
+    
+    Args:
+        df (pandas.DataFrame): Table from create_oi_change_table; a boolean
+            'highlight' column marks rows to highlight and is not displayed
+    
+    Returns:
+        str: HTML table inside a scrollable container
+    """
+    display_cols = [col for col in df.columns if col != 'highlight']
+    
+    header = "".join(f"<th>{col}</th>" for col in display_cols)
+    
+    if 'highlight' in df.columns:
+        highlight = df['highlight'].fillna(False).astype(bool).to_numpy()
+    else:
+        highlight = np.zeros(len(df), dtype=bool)
+    
+    # One row of the grid per table row: opening tag, cells, closing tag
+    grid = np.empty((len(df), len(display_cols) + 2), dtype=object)
+    grid[:, 0] = np.where(highlight, "<tr class='highlight'>", "<tr class=''>")
+    for i, col in enumerate(display_cols):
+        grid[:, i + 1] = '<td>' + column_cells(col, df[col]) + '</td>'
+    grid[:, -1] = '</tr>'
+    
+    return "".join([
+        "<div class='table-container'><table class='dataframe'>",
+        "<thead><tr>", header, "</tr></thead>",
+        "<tbody>", *grid.ravel().tolist(), "</tbody></table></div>",
+    ])
@@ -4,9 +4,12 @@ Helper utilities for the NIFTY Options Dashboard.
 import logging
 import os
 from datetime import datetime, time
+import pandas as pd
 from config.settings import LOGGING, DATA_COLLECTION
 import pytz
 
+IST = pytz.timezone('Asia/Kolkata')
+
 def setup_logging():
     """Configure the logging system."""
     log_folder = "logs"
@@ -28,6 +31,23 @@ def setup_logging():
     
     return logging.getLogger(__name__)
 
+def to_ist(value):
+    """
+    Convert a timestamp to a timezone-aware IST pandas Timestamp.
+    
+    Naive values (including the strings stored in the database) are taken to be IST.
+    
+    Args:
+        value (datetime or str): Timestamp to convert
+        
+    Returns:
+        pandas.Timestamp: IST timestamp
+    """
+    ts = pd.Timestamp(value)
+    if ts.tz is None:
+        return IST.localize(ts)
+    return ts.tz_convert(IST)
+
 def is_trading_hours():
     """
     Check if current time is within trading hours.
@@ -49,6 +69,37 @@ def is_trading_hours():
     # Check if current time is within trading hours
     return trading_start <= now <= trading_end
 
+def collection_interval_seconds():
+    """
+    Get the configured collection interval.
+    
+    Returns:
+        int: DATA_COLLECTION["interval_seconds"] in high-frequency mode,
+            otherwise interval_minutes in seconds
+    """
+    return DATA_COLLECTION.get("interval_seconds") or DATA_COLLECTION["interval_minutes"] * 60
+
+def next_interval_boundary(now, interval_seconds):
+    """
+    Get the first wall-clock interval boundary at or after a time.
+    
+    Boundaries are multiples of the interval counted from midnight IST, so a
+    5-minute interval fires at :00, :05, :10 and so on.
+    
+    Args:
+        now (datetime): Current time (naive values are taken to be IST)
+        interval_seconds (float): Interval length in seconds
+    
+    Returns:
+        pandas.Timestamp: Next boundary in IST
+    """
+    now = to_ist(now)
+    midnight = IST.localize(datetime.combine(now.date(), time(0, 0)))
+    elapsed = (now - midnight).total_seconds()
+    
+    intervals = -(-elapsed // interval_seconds)  # ceiling division
+    return to_ist(midnight + pd.Timedelta(seconds=intervals * interval_seconds))
+
 def time_until_next_collection(interval_minutes=None):
     """
     Calculate seconds until next data collection.
@@ -58,22 +109,10 @@ def time_until_next_collection(interval_minutes=None):
             If None, use the value from settings.
     
     Returns:
-        int: Seconds until next collection
+        float: Seconds until next collection (0 exactly on a boundary)
     """
     if interval_minutes is None:
         interval_minutes = DATA_COLLECTION["interval_minutes"]
-        
-    now = datetime.now()
-    
-    # Calculate next collection time
-    minutes_to_add = interval_minutes - (now.minute % interval_minutes)
-    if minutes_to_add == interval_minutes and now.second == 0 and now.microsecond == 0:
-        minutes_to_add = 0
-        
-    next_collection = now.replace(
-        second=0, 
-        microsecond=0
-    ) + pd.Timedelta(minutes=minutes_to_add)
     
-    # Return seconds until next collection
-    return (next_collection - now).total_seconds()
+    now = datetime.now(IST)
+    return (next_interval_boundary(now, interval_minutes * 60) - now).total_seconds()
@@ -0,0 +1,142 @@
+"""
+Lightweight in-process metrics for NIFTY Options Dashboard.
+"""
+import threading
+from collections import deque
+
+import numpy as np
+
+class LatencyRecorder:
+    """
+    Records durations over a sliding window and reports percentiles.
+    """
+    
+    def __init__(self, window=1000):
+        """
+        Initialize the recorder.
+        
+        Args:
+            window (int): Number of most recent samples kept for percentiles
+        """
+        self._samples = deque(maxlen=window)
+        self._count = 0
+        self._total = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, seconds):
+        """Record one duration in seconds."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+            self._total += seconds
+    
+    def snapshot(self):
+        """
+        Summarize the recorded durations.
+        
+        Returns:
+            dict: count, mean, last, p50, p95, p99 and max (seconds); the
+                percentiles cover the sliding window, count and mean all samples
+        """
+        with self._lock:
+            samples = np.array(self._samples, dtype='float64')
+            count, total = self._count, self._total
+        
+        if count == 0:
+            return {'count': 0}
+        
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {
+            'count': count,
+            'mean': total / count,
+            'last': float(samples[-1]),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'max': float(samples.max()),
+        }
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram over all samples, for export to a monitoring system.
+    """
+    
+    def __init__(self, buckets):
+        """
+        Initialize the histogram.
+        
+        Args:
+            buckets (list): Upper bounds of the buckets in seconds
+        """
+        self.buckets = sorted(buckets)
+        self._counts = np.zeros(len(self.buckets) + 1, dtype='int64')
+        self._total = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds):
+        """Record one duration in seconds."""
+        index = int(np.searchsorted(self.buckets, seconds, side='left'))
+        with self._lock:
+            self._counts[index] += 1
+            self._total += seconds
+    
+    def snapshot(self):
+        """
+        Summarize the histogram.
+        
+        Returns:
+            dict: count, sum and buckets, a list of (upper bound, cumulative
+                count) pairs ending with (inf, count)
+        """
+        with self._lock:
+            cumulative = np.cumsum(self._counts)
+            total = self._total
+        
+        bounds = self.buckets + [float('inf')]
+        return {
+            'count': int(cumulative[-1]),
+            'sum': total,
+            'buckets': [(bound, int(count)) for bound, count in zip(bounds, cumulative)],
+        }
+    
+    def to_prometheus(self, name, help_text, labels=None):
+        """
+        Render the histogram in the Prometheus text exposition format.
+        
+        Args:
+            name (str): Metric name
+            help_text (str): Metric description
+            labels (dict, optional): Extra labels for every sample
+        
+        Returns:
+            str: Exposition text
+        """
+        summary = self.snapshot()
+        base = ''.join(f'{key}="{value}",' for key, value in (labels or {}).items())
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for bound, count in summary['buckets']:
+            le = '+Inf' if bound == float('inf') else f"{bound:g}"
+            lines.append(f'{name}_bucket{{{base}le="{le}"}} {count}')
+        suffix = f"{{{base.rstrip(',')}}}" if base else ''
+        lines.append(f"{name}_sum{suffix} {summary['sum']:.6f}")
+        lines.append(f"{name}_count{suffix} {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+def format_latency(summary, unit='ms'):
+    """
+    Format a LatencyRecorder snapshot for logging.
+    
+    Args:
+        summary (dict): Output of LatencyRecorder.snapshot()
+        unit (str): 'ms' or 's'
+    
+    Returns:
+        str: Human readable summary
+    """
+    if not summary.get('count'):
+        return "no samples"
+    
+    scale = 1000 if unit == 'ms' else 1
+    return (f"n={summary['count']} p50={summary['p50'] * scale:.1f}{unit} "
+            f"p95={summary['p95'] * scale:.1f}{unit} p99={summary['p99'] * scale:.1f}{unit} "
+            f"max={summary['max'] * scale:.1f}{unit}")
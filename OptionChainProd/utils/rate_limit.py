@@ -0,0 +1,182 @@
+"""
+Client-side rate limiting for TrueData API requests.
+"""
+import time
+import logging
+import threading
+from collections import deque
+
+import numpy as np
+
+from config.settings import RATE_LIMIT
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Classic token bucket: up to `capacity` requests at once, refilled at `rate` per second.
+    """
+    
+    def __init__(self, rate, capacity):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate (float): Tokens added per second
+            capacity (float): Bucket size (largest burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def acquire(self, timeout=None, rate=None):
+        """
+        Take one token, waiting for it if necessary.
+        
+        Args:
+            timeout (float, optional): Longest wait in seconds. If None, wait indefinitely.
+            rate (float, optional): Refill rate to use from now on
+        
+        Returns:
+            bool: True if a token was taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if rate is not None:
+                    self.rate = rate
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                
+                wait = (1 - self._tokens) / self.rate
+            
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+class AdaptiveThrottle:
+    """
+    Slows collection down when the API gets slow or starts failing.
+    
+    The slow-down factor doubles (up to max_factor) when the p95 latency or
+    the error rate over the recent window crosses its threshold, and halves
+    again after a full healthy window. Factors are powers of two, so slowed
+    intervals still land on the base interval's wall-clock boundaries.
+    """
+    
+    def __init__(self, latency_threshold=None, error_rate_threshold=None, window=None, max_factor=None):
+        """
+        Initialize the throttle. Unset options use RATE_LIMIT from settings.
+        
+        Args:
+            latency_threshold (float, optional): p95 response time (s) that triggers a slow-down
+            error_rate_threshold (float, optional): Error fraction that triggers a slow-down
+            window (int, optional): Requests per evaluation window
+            max_factor (int, optional): Largest slow-down factor
+        """
+        self.latency_threshold = latency_threshold or RATE_LIMIT["latency_threshold_seconds"]
+        self.error_rate_threshold = error_rate_threshold or RATE_LIMIT["error_rate_threshold"]
+        self.window = window or RATE_LIMIT["window"]
+        self.max_factor = max_factor or RATE_LIMIT["max_slowdown"]
+        self.factor = 1
+        
+        self._latencies = deque(maxlen=self.window)
+        self._errors = deque(maxlen=self.window)
+        self._lock = threading.Lock()
+    
+    def record(self, latency, ok):
+        """
+        Record the outcome of one request.
+        
+        Args:
+            latency (float): Response time in seconds
+            ok (bool): False for errors, timeouts and rate-limit responses
+        """
+        with self._lock:
+            self._latencies.append(latency)
+            self._errors.append(not ok)
+            
+            # Judge a slow-down early, a recovery only on a full window
+            if len(self._latencies) < min(5, self.window):
+                return
+            
+            p95 = float(np.percentile(self._latencies, 95))
+            error_rate = sum(self._errors) / len(self._errors)
+            unhealthy = p95 > self.latency_threshold or error_rate > self.error_rate_threshold
+            
+            if unhealthy and self.factor < self.max_factor:
+                self.factor *= 2
+                logger.warning(f"API degraded (p95 {p95:.2f}s, errors {error_rate:.0%}); "
+                               f"slowing collection {self.factor}x")
+            elif not unhealthy and self.factor > 1 and len(self._latencies) == self.window:
+                self.factor //= 2
+                logger.info(f"API recovered; collection slow-down now {self.factor}x")
+            else:
+                return
+            
+            # Measure the new rate from scratch
+            self._latencies.clear()
+            self._errors.clear()
+
+class RateLimiter:
+    """
+    Token bucket tuned to the vendor's limits, slowed down by an adaptive throttle.
+    """
+    
+    def __init__(self, rate=None, burst=None, throttle=None):
+        """
+        Initialize the limiter. Unset options use RATE_LIMIT from settings.
+        
+        Args:
+            rate (float, optional): Requests per second
+            burst (int, optional): Largest burst
+            throttle (AdaptiveThrottle, optional): Slow-down controller
+        """
+        self.base_rate = rate or RATE_LIMIT["requests_per_second"]
+        self.bucket = TokenBucket(self.base_rate, burst or RATE_LIMIT["burst"])
+        self.throttle = throttle or AdaptiveThrottle()
+    
+    def acquire(self, timeout=None):
+        """
+        Wait for permission to send one request.
+        
+        Args:
+            timeout (float, optional): Longest wait in seconds. If None, use RATE_LIMIT["acquire_timeout"].
+        
+        Returns:
+            bool: True if the request may go ahead
+        """
+        if timeout is None:
+            timeout = RATE_LIMIT["acquire_timeout"]
+        return self.bucket.acquire(timeout, rate=self.base_rate / self.throttle.factor)
+    
+    def record(self, latency, ok):
+        """Record a request outcome for the adaptive throttle."""
+        self.throttle.record(latency, ok)
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """
+    Get the process-wide API rate limiter.
+    
+    Returns:
+        RateLimiter: Shared limiter
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
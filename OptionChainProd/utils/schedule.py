@@ -0,0 +1,206 @@
+"""
+Market calendar and wall-clock-aligned collection scheduler.
+"""
+import time as time_module
+import logging
+import threading
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+
+from config.settings import DATA_COLLECTION
+from utils.helpers import IST, to_ist, next_interval_boundary, collection_interval_seconds
+from utils.metrics import LatencyRecorder, format_latency
+
+logger = logging.getLogger(__name__)
+
+# Longest single sleep, so wall-clock adjustments (NTP, suspend) are picked up
+MAX_SLEEP_SECONDS = 60
+
+def _parse_time(value):
+    """Parse an HH:MM string."""
+    hour, minute = map(int, value.split(':'))
+    return time(hour, minute)
+
+class MarketCalendar:
+    """
+    Trading sessions: weekdays between the configured open and close, except holidays.
+    """
+    
+    def __init__(self, trading_hours=None, holidays=None):
+        """
+        Initialize the calendar.
+        
+        Args:
+            trading_hours (dict, optional): {"start": "HH:MM", "end": "HH:MM"}.
+                If None, use DATA_COLLECTION["trading_hours"].
+            holidays (iterable, optional): Dates or YYYY-MM-DD strings.
+                If None, use DATA_COLLECTION["holidays"].
+        """
+        trading_hours = trading_hours or DATA_COLLECTION["trading_hours"]
+        self.open_time = _parse_time(trading_hours["start"])
+        self.close_time = _parse_time(trading_hours["end"])
+        
+        if holidays is None:
+            holidays = DATA_COLLECTION.get("holidays", [])
+        self.holidays = {pd.Timestamp(day).date() for day in holidays}
+    
+    def is_trading_day(self, day):
+        """Check whether the market trades on a date."""
+        return day.weekday() < 5 and day not in self.holidays
+    
+    def session(self, day):
+        """
+        Get a day's trading session.
+        
+        Returns:
+            tuple: (open, close) as IST pandas Timestamps
+        """
+        return (
+            to_ist(datetime.combine(day, self.open_time)),
+            to_ist(datetime.combine(day, self.close_time))
+        )
+    
+    def is_open(self, now=None):
+        """Check whether the market is open (open and close inclusive)."""
+        now = to_ist(now if now is not None else datetime.now(IST))
+        if not self.is_trading_day(now.date()):
+            return False
+        session_open, session_close = self.session(now.date())
+        return session_open <= now <= session_close
+    
+    def next_open(self, now=None):
+        """
+        Get the next session open at or after a time.
+        
+        Returns:
+            pandas.Timestamp: Session open in IST
+        """
+        now = to_ist(now if now is not None else datetime.now(IST))
+        day = now.date()
+        
+        # Holidays are sparse, so a few weeks always reach a trading day
+        for _ in range(30):
+            if self.is_trading_day(day):
+                session_open = self.session(day)[0]
+                if session_open >= now:
+                    return session_open
+            day += timedelta(days=1)
+        
+        raise ValueError(f"No trading day within 30 days of {now}")
+
+class CollectionScheduler:
+    """
+    Fires a job on wall-clock interval boundaries during market hours.
+    
+    The next fire time is computed from the clock, not from when the last run
+    ended, so fetch and save time never accumulate as drift. Outside market
+    hours the scheduler sleeps until the exact next session open. The delay
+    between each boundary and the job actually starting is recorded as
+    lateness.
+    """
+    
+    def __init__(self, interval_seconds=None, calendar=None, throttle=None):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            interval_seconds (float, optional): Collection interval. If None,
+                use collection_interval_seconds().
+            calendar (MarketCalendar, optional): Trading calendar
+            throttle (AdaptiveThrottle, optional): While it reports a slow-down
+                factor, the interval is stretched by that factor
+        """
+        self.interval_seconds = interval_seconds or collection_interval_seconds()
+        self.calendar = calendar or MarketCalendar()
+        self.throttle = throttle
+        self.lateness = LatencyRecorder()
+        self.skipped = 0
+        self._stop = threading.Event()
+    
+    @property
+    def effective_interval(self):
+        """Interval in seconds including any adaptive slow-down."""
+        factor = self.throttle.factor if self.throttle is not None else 1
+        return self.interval_seconds * factor
+    
+    def next_fire_time(self, now=None):
+        """
+        Get the next collection time at or after a time.
+        
+        Args:
+            now (datetime, optional): Reference time. If None, use the current time.
+        
+        Returns:
+            pandas.Timestamp: Next fire time in IST
+        """
+        now = to_ist(now if now is not None else datetime.now(IST))
+        
+        if self.calendar.is_trading_day(now.date()):
+            session_open, session_close = self.calendar.session(now.date())
+            if now <= session_open:
+                return session_open
+            
+            boundary = next_interval_boundary(now, self.effective_interval)
+            if boundary <= session_close:
+                return boundary
+        
+        return self.calendar.next_open(now + timedelta(microseconds=1))
+    
+    def _sleep_until(self, moment):
+        """
+        Sleep until a wall-clock time.
+        
+        Returns:
+            bool: False if stop() was called while sleeping
+        """
+        while True:
+            remaining = moment.timestamp() - time_module.time()
+            if remaining <= 0:
+                return True
+            if self._stop.wait(min(remaining, MAX_SLEEP_SECONDS)):
+                return False
+    
+    def run(self, job):
+        """
+        Run a job on every boundary until stop() is called.
+        
+        Args:
+            job (callable): Called with the scheduled fire time (IST pandas Timestamp)
+        """
+        fire_time = self.next_fire_time()
+        
+        while not self._stop.is_set():
+            if fire_time - to_ist(datetime.now(IST)) > timedelta(seconds=self.effective_interval):
+                logger.info(f"Market closed. Next collection at {fire_time.strftime('%Y-%m-%d %H:%M:%S')}")
+            
+            if not self._sleep_until(fire_time):
+                break
+            
+            self.lateness.record(time_module.time() - fire_time.timestamp())
+            job(fire_time)
+            
+            # Boundaries the job overran are skipped, not run back to back
+            now = to_ist(datetime.now(IST))
+            next_fire = self.next_fire_time(max(now, fire_time + timedelta(microseconds=1)))
+            missed = int((next_fire - fire_time).total_seconds() // self.effective_interval) - 1
+            if missed > 0 and self.calendar.is_open(now):
+                self.skipped += missed
+                logger.warning(f"Collection overran {missed} interval(s); skipping to {next_fire.strftime('%H:%M:%S')}")
+            
+            fire_time = next_fire
+            logger.info(f"Next collection at {fire_time.strftime('%H:%M:%S')} "
+                        f"(lateness {format_latency(self.lateness.snapshot())})")
+    
+    def stop(self):
+        """Stop the scheduler; an in-progress sleep returns immediately."""
+        self._stop.set()
+    
+    def metrics(self):
+        """
+        Scheduling metrics.
+        
+        Returns:
+            dict: lateness summary (seconds) and skipped interval count
+        """
+        return {'lateness': self.lateness.snapshot(), 'skipped': self.skipped}
@@ -0,0 +1,148 @@
+"""
+Single-flight call coalescing.
+
+Concurrent calls for the same key share one execution and its result, and a
+result stays reusable for a freshness window after it completes.
+"""
+import time
+import threading
+
+class _Call:
+    """One execution of a keyed call, awaited by every caller that joined it."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished = None
+    
+    def wait(self, timeout=None):
+        """
+        Wait for the call to finish.
+        
+        Args:
+            timeout (float, optional): Longest wait in seconds. If None, wait until done.
+        
+        Returns:
+            The call's result
+        
+        Raises:
+            TimeoutError: If the call is still running after timeout
+            Exception: Whatever the call raised
+        """
+        if not self.done.wait(timeout):
+            raise TimeoutError("Timed out waiting for an in-flight call")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class SingleFlight:
+    """
+    Coalesces calls with the same key into one in-flight execution.
+    
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it runs wait for it and get the same result, and so do callers
+    arriving within fresh_for seconds after it finished successfully.
+    """
+    
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls = {}
+        self._done = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'shared_in_flight': 0, 'shared_fresh': 0}
+    
+    def begin(self, key, fresh_for=0):
+        """
+        Join the call for a key, or become its leader.
+        
+        A leader must call finish() with the same call object, also when it
+        fails, or every caller that joined will wait forever.
+        
+        Args:
+            key: Hashable call key
+            fresh_for (float): Reuse a result that finished less than this many seconds ago
+        
+        Returns:
+            tuple: (call, leader); if leader is False, call.wait() gives the result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats['shared_in_flight'] += 1
+                return call, False
+            
+            call = self._done.get(key)
+            if call is not None and fresh_for > 0 and time.monotonic() - call.finished < fresh_for:
+                self.stats['shared_fresh'] += 1
+                return call, False
+            
+            call = _Call()
+            self._calls[key] = call
+            self.stats['calls'] += 1
+            return call, True
+    
+    def finish(self, key, call, result=None, error=None, keep=True):
+        """
+        Publish a leader's outcome and wake every caller waiting for it.
+        
+        Args:
+            key: Call key
+            call (_Call): Call returned by begin()
+            result: The call's result
+            error (Exception, optional): What the call raised; never kept for reuse
+            keep (bool): Let later callers reuse the result within their freshness window
+        """
+        call.result = result
+        call.error = error
+        call.finished = time.monotonic()
+        
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            if keep and error is None:
+                self._done[key] = call
+            else:
+                # A failed refresh must not leave an older result looking fresh
+                self._done.pop(key, None)
+        
+        call.done.set()
+    
+    def do(self, key, func, fresh_for=0, keep=None):
+        """
+        Run func once for all concurrent callers with the same key.
+        
+        Args:
+            key: Hashable call key
+            func (callable): Called with no arguments by the leader
+            fresh_for (float): Reuse a result that finished less than this many seconds ago
+            keep (callable, optional): Predicate on the result; results it rejects
+                (e.g. failures) are shared with waiting callers but not reused later
+        
+        Returns:
+            tuple: (result, shared); shared is True if another caller's execution was used
+        """
+        call, leader = self.begin(key, fresh_for)
+        if not leader:
+            return call.wait(), True
+        
+        try:
+            result = func()
+        except BaseException as e:
+            # Even on KeyboardInterrupt, so that waiting callers are released
+            self.finish(key, call, error=e)
+            raise
+        
+        self.finish(key, call, result, keep=keep is None or bool(keep(result)))
+        return result, False
+    
+    def age(self, key):
+        """
+        Seconds since the last reusable result for a key finished.
+        
+        Returns:
+            float or None: None if there is no such result
+        """
+        with self._lock:
+            call = self._done.get(key)
+            return None if call is None else time.monotonic() - call.finished